@@ -1,15 +1,19 @@
 # app/crud/org.py
 from app.models.org import User
-from app.utils import hash_password
+from app.core.security import get_password_hash
+from app.db import get_org_session
 
 def create_org_user(org_db_name: str, email: str, password: str, role: str):
     db = get_org_session(org_db_name)
-    user = User(
-        email=email,
-        hashed_password=hash_password(password),
-        role=role
-    )
-    db.add(user)
-    db.commit()
-    db.close()
-    return user
+    try:
+        user = User(
+            email=email,
+            hashed_password=get_password_hash(password),
+            role=role
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+    finally:
+        db.close()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 import string
 import random
@@ -9,15 +10,18 @@ from app.models.user import User, UserRole
 from app.schemas.user import UserOut   # <-- import UserOut schema
 from app.models.user import User       # <-- import User model
 from app.api.v1.endpoints.deps import get_current_user ,require_roles
-from app.models.database import get_db
+from app.core.principal_cache import Principal, principal_cache
+from app.models.database import get_async_db, get_read_db
 from app.models.system import Organization  # main DB model
 from app.db import get_org_session           # dynamic org DB session
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import verify_password, create_access_token
+from app.services.password_service import password_hasher
 from app.core.config import settings
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 from app.services.notification_service import NotificationService
+from app.services.email_outbox import outbox_sender
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -26,8 +30,12 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 
 # FastAPI: app/api/v1/endpoints/auth.py
 @router.get("/me", response_model=UserOut)  # UserOut is a Pydantic schema
-def read_current_user(current_user: User = Depends(get_current_user)):
-    return UserOut.from_orm(current_user)
+async def read_current_user(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    # The principal only carries auth fields; the profile needs the full row
+    user = (await db.execute(select(User).where(User.id == current_user.id))).scalars().first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UserOut.from_orm(user)
 
 def generate_temp_password(length: int = 10) -> str:
     chars = string.ascii_letters + string.digits + string.punctuation
@@ -37,10 +45,10 @@ def generate_temp_password(length: int = 10) -> str:
 # Register a new user
 # ---------------------------
 @router.post("/register", response_model=dict)
-def register(
+async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["system_admin", "org_admin"]))
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_roles(["system_admin", "org_admin"]))
 ):
     """
     Register a new user in the system.
@@ -49,7 +57,7 @@ def register(
     """
     
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == user_data.email))).scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -67,17 +75,13 @@ def register(
     org_id = current_user.organization_id if current_user.role == UserRole.ORG_ADMIN else user_data.org_id
     org_id_str = str(org_id) if org_id is not None else None
 
-
-    # Hash password
-    hashed_password = get_password_hash(user_data.password)
-
     # Split name into first and last
     first_name, *last_name_parts = user_data.name.split(" ")
     last_name = " ".join(last_name_parts) if last_name_parts else ""
     temp_password = generate_temp_password()
 
-# Hash the temporary password
-    hashed_password = get_password_hash(temp_password)
+    # Hash the temporary password (only this hash is stored; user_data.password is never used)
+    hashed_password = await password_hasher.hash(temp_password)
     # Create new user
     new_user = User(
         first_name=first_name,
@@ -91,13 +95,17 @@ def register(
     )
 
     db.add(new_user)
-    db.commit()
+    # Queued in the same transaction as the user; sent by the outbox sender, not this request
     NotificationService.send_temporary_password(
+    db,
     email=new_user.email,
     temp_password=temp_password,
     first_name=new_user.first_name
     )
-    db.refresh(new_user)
+    await db.commit()
+    principal_cache.invalidate(new_user.id)
+    outbox_sender.wake()
+    await db.refresh(new_user)
     new_user.role = UserRole(new_user.role)
 
 
@@ -108,15 +116,28 @@ def register(
 # Login
 # ---------------------------
 @router.post("/login", response_model=dict)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_credentials.email).first()
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == user_credentials.email))).scalars().first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await password_hasher.verify_and_update(user_credentials.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # Stored hash is deprecated or under the configured cost; upgrade it transparently
+        user.hashed_password = new_hash
+        await db.commit()
 
     # Create JWT token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    # role/org/epoch are only trusted when TRUST_TOKEN_CLAIMS is on; see deps.get_current_user
     token = create_access_token(
-        data={"sub": user.id},
+        data={
+            "sub": user.id,
+            "role": getattr(user.role, "value", user.role),
+            "org": str(user.organization_id) if user.organization_id else None,
+            "epoch": user.token_epoch or 0,
+        },
         expires_delta=access_token_expires
     )
 
@@ -141,7 +162,10 @@ def org_login(org_name: str, email: str, password: str):
         raise HTTPException(404, "Organization not found")
     
     db = get_org_session(org.org_db_name)
-    user = db.query(User).filter(User.email == email).first()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+    finally:
+        db.close()  # return the connection to the tenant's pooled engine
     if not user or not verify_password(password, user.hashed_password):
         raise HTTPException(401, "Invalid credentials")
 
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.api.v1.endpoints.deps import get_tenant_db, get_tenant_read_db, require_roles
+from app.schemas.change_log import ChangeConsumerCommit, ChangeConsumerOut, ChangeLogPage
+from app.services.change_log import commit_offset, consumer_offset, read_changes, relay_user_changes
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+CONSUMER_NAME = Path(..., regex=r"^[A-Za-z0-9_.-]{1,64}$", description="e.g. search-indexer")
+
+
+# ---- Read the organization's change log after an offset ----
+@router.get("/", response_model=ChangeLogPage)
+async def get_changes(
+    after: int = Query(0, ge=0, description="seq of the last entry already processed"),
+    limit: int = Query(settings.CHANGE_LOG_PAGE_SIZE, ge=1, le=settings.CHANGE_LOG_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    await relay_user_changes(current_user.tenant_id)
+    items, next_offset, has_more = await read_changes(db, current_user.organization_id, after, limit)
+    return {"items": items, "next_offset": next_offset, "has_more": has_more}
+
+
+# ---- Named consumers: read from the saved offset, commit once processed ----
+@router.get("/consumers/{name}", response_model=ChangeLogPage)
+async def get_consumer_changes(
+    name: str = CONSUMER_NAME,
+    limit: int = Query(settings.CHANGE_LOG_PAGE_SIZE, ge=1, le=settings.CHANGE_LOG_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    await relay_user_changes(current_user.tenant_id)
+    after = await consumer_offset(db, current_user.organization_id, name)
+    items, next_offset, has_more = await read_changes(db, current_user.organization_id, after, limit)
+    return {"items": items, "next_offset": next_offset, "has_more": has_more}
+
+
+@router.put("/consumers/{name}", response_model=ChangeConsumerOut)
+async def commit_consumer_offset(
+    payload: ChangeConsumerCommit,
+    name: str = CONSUMER_NAME,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    return {"name": name, "offset": await commit_offset(db, current_user.organization_id, name, payload.offset)}
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.principal_cache import Principal
+from app.api.v1.endpoints.deps import get_current_user, get_tenant_db, require_roles, require_tenant
+from app.models.knowledge_article import KnowledgeArticle
+from app.schemas.chatbot import ChatbotQuery, ChatbotResponse, KnowledgeArticleCreate, KnowledgeArticleOut, ReindexResult
+
+router = APIRouter(prefix="/chatbot", tags=["Chatbot"])
+
+
+# ---- Ask the chatbot (answers from the organization's own data) ----
+@router.post("/query", response_model=ChatbotResponse)
+async def chatbot_query(
+    query: ChatbotQuery,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    if not current_user.organization_id:
+        raise HTTPException(status_code=400, detail="User does not belong to an organization")
+    user_context = {"id": current_user.id, "role": current_user.role, "organization_id": require_tenant(current_user)}
+    from app.services.chatbot_service import ChatbotService  # embeddings and vector index load on first use
+    return await ChatbotService().get_response(query.message, user_context, db=db, top_k=query.top_k)
+
+
+# ---- Knowledge articles the chatbot can cite ----
+@router.post("/articles", response_model=KnowledgeArticleOut)
+async def create_article(
+    article: KnowledgeArticleCreate,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    new_article = KnowledgeArticle(**article.dict(), organization_id=current_user.organization_id)
+    db.add(new_article)
+    await db.commit()
+    await db.refresh(new_article)
+    return KnowledgeArticleOut.from_orm(new_article)
+
+
+@router.delete("/articles/{article_id}")
+async def delete_article(
+    article_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    article = (await db.execute(select(KnowledgeArticle).where(
+        KnowledgeArticle.id == article_id,
+        KnowledgeArticle.organization_id == current_user.organization_id
+    ))).scalars().first()
+
+    if not article:
+        raise HTTPException(status_code=404, detail="Article not found")
+
+    await db.delete(article)
+    await db.commit()
+    return {"message": "Article deleted"}
+
+
+# ---- Rebuild / repair the organization's vector index ----
+@router.post("/reindex", response_model=ReindexResult)
+async def reindex(
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    from app.services.retrieval import sync_org_index
+    return await sync_org_index(db, require_tenant(current_user))
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
 
-from app.models.database import get_db
+from app.db import tenant_sessionmaker
 from app.models.complaint import Complaint
-from app.schemas.complaint import ComplaintCreate, ComplaintUpdate, ComplaintOut
-from app.models.user import User
-from app.api.v1.endpoints.deps import require_roles, get_current_user
-from app.services.AI_service import AIService
+from app.schemas.complaint import ComplaintCreate, ComplaintUpdate, ComplaintOut, ComplaintPage, ComplaintSearchPage, ComplaintClassifyBatchResult
+from app.core.principal_cache import Principal
+from app.core.responses import ORJSONResponse
+from app.api.v1.endpoints.deps import require_roles, require_tenant, get_current_user, get_tenant_db, get_tenant_read_db
+from app.services.complaint_service import COMPLAINT_OUT_PROJECTION, classify_unclassified, filter_complaints
+from app.services.export_service import COMPLAINT_EXPORT_COLUMNS, export_response, export_select
+from app.services.search_service import search_rows
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_paginate
 
 router = APIRouter(prefix="/complaints", tags=["Complaints"])
 
@@ -16,17 +22,18 @@ router = APIRouter(prefix="/complaints", tags=["Complaints"])
 @router.get("/classify/{complaint_id}")
 async def classify_complaint_endpoint(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["org_admin", "employee"]))
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
 ):
-    complaint = db.query(Complaint).filter(
+    complaint = (await db.execute(select(Complaint).where(
         Complaint.id == complaint_id,
         Complaint.organization_id == current_user.organization_id
-    ).first()
+    ))).scalars().first()
 
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
 
+    from app.services.AI_service import AIService  # loads the classifier's numpy stack on first use
     ai_service = AIService()
     classification = await ai_service.classify_complaint(complaint.description)
 
@@ -34,18 +41,27 @@ async def classify_complaint_endpoint(
     complaint.priority = "high" if classification == "technical" else "normal"
     complaint.classification = classification
 
-    db.commit()
-    db.refresh(complaint)
+    await db.commit()
+    await db.refresh(complaint)
 
     return ComplaintOut.from_orm(complaint)
 
 
+# ---- Batch AI Classification (every unclassified complaint of the org) ----
+@router.post("/classify-batch", response_model=ComplaintClassifyBatchResult)
+async def classify_complaints_batch(
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    return await classify_unclassified(db, current_user.organization_id)
+
+
 # ---- Create Complaint ----
 @router.post("/", response_model=ComplaintOut)
-def create_complaint(
+async def create_complaint(
     complaint: ComplaintCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["org_admin", "employee"]))
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
 ):
     new_complaint = Complaint(
         **complaint.dict(),
@@ -53,34 +69,87 @@ def create_complaint(
         created_by=current_user.id
     )
     db.add(new_complaint)
-    db.commit()
-    db.refresh(new_complaint)
+    await db.commit()
+    await db.refresh(new_complaint)
     return ComplaintOut.from_orm(new_complaint)
 
 
-# ---- Read All Complaints ----
-@router.get("/", response_model=List[ComplaintOut])
-def get_complaints(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["org_admin", "employee"]))
+# ---- Read Complaints (one page) ----
+@router.get("/", response_model=ComplaintPage)
+async def get_complaints(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
 ):
-    complaints = db.query(Complaint).filter(
-        Complaint.organization_id == current_user.organization_id
-    ).all()
-    return [ComplaintOut.from_orm(c) for c in complaints]
+    query = filter_complaints(
+        current_user.organization_id,
+        status=status,
+        priority=priority,
+        assigned_to_id=assigned_to_id,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    rows, next_cursor = await keyset_paginate(db, COMPLAINT_OUT_PROJECTION.select(query), Complaint, cursor, limit, as_rows=True)
+    # Returning the response directly skips response_model validation of trusted rows
+    return ORJSONResponse({"items": COMPLAINT_OUT_PROJECTION.dicts(rows), "next_cursor": next_cursor})
+
+
+# ---- Full-text search over title / description, best match first ----
+@router.get("/search", response_model=ComplaintSearchPage)
+async def search_complaints(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    organization_id = require_tenant(current_user)  # the FTS match is scoped by the integer id
+    rows, next_offset = await search_rows(db, Complaint, organization_id, q, limit, offset, projection=COMPLAINT_OUT_PROJECTION)
+    return ORJSONResponse({"items": COMPLAINT_OUT_PROJECTION.dicts(rows), "next_offset": next_offset})
+
+
+# ---- Export Complaints (streamed CSV / NDJSON) ----
+@router.get("/export")
+async def export_complaints(
+    format: str = Query("csv", description="csv or ndjson"),
+    compress: bool = Query(False, description="gzip the download"),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    query = filter_complaints(
+        current_user.organization_id,
+        status=status,
+        priority=priority,
+        assigned_to_id=assigned_to_id,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    statement = export_select(query, Complaint, COMPLAINT_EXPORT_COLUMNS)
+    sessions = await tenant_sessionmaker(require_tenant(current_user), read_only=True)
+    return export_response(statement, COMPLAINT_EXPORT_COLUMNS, format, compress, "complaints", sessions)
 
 
 # ---- Read Complaint by ID ----
 @router.get("/{complaint_id}", response_model=ComplaintOut)
-def get_complaint(
+async def get_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["org_admin", "employee", "customer"]))
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee", "customer"]))
 ):
-    complaint = db.query(Complaint).filter(
+    complaint = (await db.execute(select(Complaint).where(
         Complaint.id == complaint_id,
         Complaint.organization_id == current_user.organization_id
-    ).first()
+    ))).scalars().first()
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
     return ComplaintOut.from_orm(complaint)
@@ -88,41 +157,41 @@ def get_complaint(
 
 # ---- Update Complaint ----
 @router.put("/{complaint_id}", response_model=ComplaintOut)
-def update_complaint(
+async def update_complaint(
     complaint_id: int,
     complaint_data: ComplaintUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["org_admin", "employee"]))
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
 ):
-    complaint = db.query(Complaint).filter(
+    complaint = (await db.execute(select(Complaint).where(
         Complaint.id == complaint_id,
         Complaint.organization_id == current_user.organization_id
-    ).first()
+    ))).scalars().first()
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
 
     for key, value in complaint_data.dict(exclude_unset=True).items():
         setattr(complaint, key, value)
 
-    db.commit()
-    db.refresh(complaint)
+    await db.commit()
+    await db.refresh(complaint)
     return ComplaintOut.from_orm(complaint)
 
 
 # ---- Delete Complaint ----
 @router.delete("/{complaint_id}")
-def delete_complaint(
+async def delete_complaint(
     complaint_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(["org_admin"]))
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
 ):
-    complaint = db.query(Complaint).filter(
+    complaint = (await db.execute(select(Complaint).where(
         Complaint.id == complaint_id,
         Complaint.organization_id == current_user.organization_id
-    ).first()
+    ))).scalars().first()
     if not complaint:
         raise HTTPException(status_code=404, detail="Complaint not found")
 
-    db.delete(complaint)
-    db.commit()
+    await db.delete(complaint)
+    await db.commit()
     return {"message": "Complaint deleted"}
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from app.core.principal_cache import Principal
+from app.api.v1.endpoints.deps import get_current_user, require_tenant
+from app.db import tenant_sessionmaker
+from app.models.database import AsyncReadSessionLocal
+from app.schemas.dashboard import DashboardStats
+from app.services.analytical_service import generate_dashboard_stats
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+# ---- Dashboard counts for the current user's organization (all orgs for system_admin) ----
+@router.get("/stats", response_model=DashboardStats)
+async def get_dashboard_stats(
+    current_user: Principal = Depends(get_current_user)
+):
+    if current_user.role == "system_admin":
+        sessions = AsyncReadSessionLocal
+    else:
+        sessions = await tenant_sessionmaker(require_tenant(current_user), read_only=True)
+    async with sessions() as db:
+        return await generate_dashboard_stats(db, current_user)
@@ -1,11 +1,15 @@
 from typing import List
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError
 from uuid import UUID
 from app.core.security import verify_token
-from app.models.database import get_db
+from app.core.entitlements import TIER_BITS, feature_bit, org_tiers
+from app.core.principal_cache import Principal, principal_cache
+from app.db import tenant_sessionmaker
+from app.models.database import get_read_db
 from app.models.user import User, UserRole
 
 from jose import JWTError, jwt
@@ -16,20 +20,59 @@ from app.core.config import settings
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
+
+
+async def _principal_from_claims(user_id: str, payload: dict, db: AsyncSession):
+    """
+    Trusted-claims mode: build the principal from the signed token, checked only against
+    the user's revocation epoch (cached for TOKEN_EPOCH_TTL_SECONDS).
+    Returns None when the token predates claims and the caller must fall back to the DB.
+    """
+    if "role" not in payload or "epoch" not in payload:
+        return None
+    revoked_before = principal_cache.revoked_before(user_id)
+    if revoked_before is None:
+        row = (await db.execute(select(User.token_epoch).where(User.id == user_id))).first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        revoked_before = row.token_epoch or 0
+        principal_cache.put_epoch(user_id, revoked_before)
+    if payload["epoch"] < revoked_before:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+    return Principal(
+        id=user_id,
+        role=payload["role"],
+        organization_id=payload.get("org"),
+        token_epoch=payload["epoch"],
+    )
+
+
 # Dependency: get current user
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)) -> Principal:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    user_id = str(user_id)
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    principal = await _principal_from_claims(user_id, payload, db) if settings.TRUST_TOKEN_CLAIMS else None
+    if principal is None:
+        principal = principal_cache.get(user_id)
+    if principal is None:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        principal = Principal.from_user(user)
+        principal_cache.put(principal)
+
+    if payload.get("epoch", principal.token_epoch) < principal.token_epoch:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+    if not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return principal
 
 
 # Dependency: role-based authorization
@@ -38,7 +81,7 @@ def require_roles(allowed_roles: List[UserRole]):
     Returns a dependency that ensures the current user has one of the allowed roles.
     """
 
-    def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -47,3 +90,54 @@ def require_roles(allowed_roles: List[UserRole]):
         return current_user
 
     return role_checker
+
+
+# Dependency: subscription entitlement
+def require_feature(feature: str):
+    """
+    Returns a dependency that ensures the current user's organization tier includes the
+    feature. The tier comes from the entitlement cache, so this doesn't query per request.
+    """
+    bit = feature_bit(feature)  # unknown feature names fail when the route is declared
+
+    async def feature_checker(current_user: Principal = Depends(get_current_user)):
+        tier = await org_tiers.resolve(current_user.organization_id)
+        if not TIER_BITS.get(tier, 0) & bit:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Your subscription does not include this feature",
+            )
+        return current_user
+
+    return feature_checker
+
+
+# Tenant of the current user
+def require_tenant(current_user: Principal) -> int:
+    """
+    The caller's integer organization id; 403 for callers without one (system admins,
+    users created with a UUID organization id).
+    """
+    if current_user.tenant_id is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User does not belong to an organization")
+    return current_user.tenant_id
+
+
+# Dependency: session on the current user's tenant shard
+async def get_tenant_db(current_user: Principal = Depends(get_current_user)):
+    """
+    Session on the database holding the current user's organization (see app/db.py), for
+    endpoints that write leads or complaints.
+    """
+    sessions = await tenant_sessionmaker(require_tenant(current_user))
+    async with sessions() as db:
+        yield db
+
+
+async def get_tenant_read_db(current_user: Principal = Depends(get_current_user)):
+    """
+    Read-only counterpart of get_tenant_db; on the main database it uses the read pool.
+    """
+    sessions = await tenant_sessionmaker(require_tenant(current_user), read_only=True)
+    async with sessions() as db:
+        yield db
@@ -1,29 +1,97 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.responses import ORJSONResponse
 from app.models.lead import Lead
-from app.schemas.lead import LeadCreate, LeadResponse
-from app.api.v1.endpoints.deps import get_current_user
-from app.models.database import get_db
-from app.core.Tenant import tenant_filter
+from app.schemas.lead import (
+    LeadCreate, LeadResponse, LeadPage, LeadSearchPage, LeadImportReport, LeadScoringResult,
+    LeadDedupeResult, LeadMergeSuggestionPage, LeadMergeSuggestionResolved,
+    LeadGenerationRequest, LeadGenerationResponse,
+)
+from app.api.v1.endpoints.deps import get_current_user, get_tenant_db, get_tenant_read_db, require_feature, require_roles, require_tenant
+from app.db import tenant_sessionmaker
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_paginate
+from app.services.lead_service import LEAD_RESPONSE_PROJECTION, filter_leads
+from app.services.export_service import LEAD_EXPORT_COLUMNS, export_response, export_select
+from app.services.search_service import search_rows
+from app.services.lead_import import IMPORT_FORMATS, detect_format, import_leads, iter_csv_records, iter_ndjson_records
 
 
+# Scoring, dedupe and SerpAPI (numpy, httpx) are imported by the endpoints that use them,
+# so a worker starts without loading them.
+
 router = APIRouter(prefix="/leads", tags=["Leads"])
 
 # ---------------------------
-# Get all leads for current user's organization
+# Get one page of leads for current user's organization
 # ---------------------------
 # app/api/v1/endpoints/leads.py
-@router.get("/", response_model=List[LeadResponse])
-def get_leads(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    query = tenant_filter(db.query(Lead), Lead, current_user)
-    leads = query.all()
-    return leads
+@router.get("/", response_model=LeadPage)
+async def get_leads(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    assigned_to_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    query = filter_leads(
+        current_user.organization_id,
+        status=status,
+        assigned_to_id=assigned_to_id,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    rows, next_cursor = await keyset_paginate(db, LEAD_RESPONSE_PROJECTION.select(query), Lead, cursor, limit, as_rows=True)
+    # Returning the response directly skips response_model validation of trusted rows
+    return ORJSONResponse({"items": LEAD_RESPONSE_PROJECTION.dicts(rows), "next_cursor": next_cursor})
+
+# ---------------------------
+# Full-text search over name / email / phone, best match first
+# ---------------------------
+@router.get("/search", response_model=LeadSearchPage)
+async def search_leads(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    organization_id = require_tenant(current_user)  # the FTS match is scoped by the integer id
+    rows, next_offset = await search_rows(db, Lead, organization_id, q, limit, offset, projection=LEAD_RESPONSE_PROJECTION)
+    return ORJSONResponse({"items": LEAD_RESPONSE_PROJECTION.dicts(rows), "next_offset": next_offset})
+
+# ---------------------------
+# Stream every matching lead as CSV / NDJSON
+# ---------------------------
+@router.get("/export")
+async def export_leads(
+    format: str = Query("csv", description="csv or ndjson"),
+    compress: bool = Query(False, description="gzip the download"),
+    status: Optional[str] = None,
+    assigned_to_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    query = filter_leads(
+        current_user.organization_id,
+        status=status,
+        assigned_to_id=assigned_to_id,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    statement = export_select(query, Lead, LEAD_EXPORT_COLUMNS)
+    sessions = await tenant_sessionmaker(require_tenant(current_user), read_only=True)
+    return export_response(statement, LEAD_EXPORT_COLUMNS, format, compress, "leads", sessions)
 
 @router.post("/", response_model=LeadResponse)
-def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_lead(lead_data: LeadCreate, db: AsyncSession = Depends(get_tenant_db), current_user: Principal = Depends(get_current_user)):
     new_lead = Lead(
         name=lead_data.name,
         email=lead_data.email,
@@ -32,6 +100,99 @@ def create_lead(lead_data: LeadCreate, db: Session = Depends(get_db), current_us
         created_by=current_user.id
     )
     db.add(new_lead)
-    db.commit()
-    db.refresh(new_lead)
-    return new_lead
\ No newline at end of file
+    await db.commit()
+    await db.refresh(new_lead)
+    return new_lead
+
+
+# ---------------------------
+# Bulk import leads from a CSV or NDJSON upload
+# ---------------------------
+@router.post("/import", response_model=LeadImportReport)
+async def import_leads_file(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson; guessed from the file name when omitted"),
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    if format is None:
+        format = detect_format(file.filename, file.content_type)
+    elif format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(IMPORT_FORMATS)}")
+
+    records = iter_csv_records(file.file) if format == "csv" else iter_ndjson_records(file.file)
+    return await import_leads(db, current_user.organization_id, records)
+
+
+# ---------------------------
+# Score the organization's leads (only those changed since the last run unless full=true)
+# ---------------------------
+@router.post("/score", response_model=LeadScoringResult)
+async def score_leads(
+    full: bool = Query(False, description="rescore every lead, not just those changed since the last run"),
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    from app.services.lead_scoring import run_lead_scoring
+    return await run_lead_scoring(db, current_user.organization_id, full=full)
+
+
+# ---------------------------
+# Generate prospect leads from web search (SerpAPI), many query/location pairs at once
+# ---------------------------
+@router.post("/generate", response_model=LeadGenerationResponse)
+async def generate_leads(
+    payload: LeadGenerationRequest,
+    current_user: Principal = Depends(require_feature("ai_scoring"))
+):
+    from app.services.serp_service import SerpAPIService
+    results = await SerpAPIService().generate_leads_batch(
+        current_user, [(lookup.query, lookup.location) for lookup in payload.lookups]
+    )
+    return {"results": results}
+
+
+# ---------------------------
+# Find likely duplicate leads (only leads changed since the last run unless full=true)
+# ---------------------------
+@router.post("/dedupe", response_model=LeadDedupeResult)
+async def dedupe_leads(
+    full: bool = Query(False, description="re-sign every lead, not just those changed since the last run"),
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    from app.services.lead_dedupe import run_lead_dedupe
+    return await run_lead_dedupe(db, current_user.organization_id, full=full)
+
+
+@router.get("/duplicates", response_model=LeadMergeSuggestionPage)
+async def get_duplicate_suggestions(
+    status: str = Query("open", description="open, merged or dismissed"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_tenant_read_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    from app.services.lead_dedupe import list_suggestions
+    items, next_offset = await list_suggestions(db, current_user.organization_id, status, limit, offset)
+    return {"items": items, "next_offset": next_offset}
+
+
+@router.post("/duplicates/{suggestion_id}/merge", response_model=LeadMergeSuggestionResolved)
+async def merge_duplicate(
+    suggestion_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin"]))
+):
+    from app.services.lead_dedupe import resolve_suggestion
+    return await resolve_suggestion(db, current_user.organization_id, suggestion_id, "merge")
+
+
+@router.post("/duplicates/{suggestion_id}/dismiss", response_model=LeadMergeSuggestionResolved)
+async def dismiss_duplicate(
+    suggestion_id: int,
+    db: AsyncSession = Depends(get_tenant_db),
+    current_user: Principal = Depends(require_roles(["org_admin", "employee"]))
+):
+    from app.services.lead_dedupe import resolve_suggestion
+    return await resolve_suggestion(db, current_user.organization_id, suggestion_id, "dismiss")
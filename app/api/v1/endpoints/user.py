@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.security import get_password_hash
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.password_service import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate, UserRead, UserUpdate
-from app.models.database import get_db
+from app.models.database import get_async_db
+from app.core.principal_cache import principal_cache
 from passlib.context import CryptContext
 import uuid
 
@@ -13,9 +15,9 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 @router.post("/", response_model=UserRead)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Hash password
-    hashed_pwd = get_password_hash(user.password)
+    hashed_pwd = await password_hasher.hash(user.password)
 
     # Convert organization_id to string or generate new UUID
     try:
@@ -36,25 +38,30 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.put("/{user_id}", response_model=UserRead)
-def update_user(user_id: str, user: UserUpdate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.id == user_id).first()
+async def update_user(user_id: str, user: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     update_data = user.dict(exclude_unset=True)
     
     # Hash password if it is being updated
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await password_hasher.hash(update_data.pop("password"))
+
+    # Tokens carry role/org claims, so changing them (or the password) revokes issued tokens
+    if update_data.keys() & {"role", "organization_id", "is_active", "hashed_password"}:
+        db_user.token_epoch = (db_user.token_epoch or 0) + 1
 
     for key, value in update_data.items():
         setattr(db_user, key, value)
     
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    principal_cache.invalidate(db_user.id, token_epoch=db_user.token_epoch)
+    await db.refresh(db_user)
     return db_user
 
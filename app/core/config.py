@@ -1,8 +1,9 @@
+from typing import List
 from pydantic import BaseSettings
 
 
 class Settings(BaseSettings):
-    DATABASE_URL: str = "sqlite:///./crm.db"
+    DATABASE_URL: str = "sqlite:///./smart_crm.db"   # the app, scripts and alembic all use this database
     SECRET_KEY: str = "Magic"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -14,6 +15,137 @@ class Settings(BaseSettings):
     SMTP_USER: str = "Daniyal@irp.edu.pk"
     SMTP_PASSWORD: str = "kkttumhiklscooqu"
     EMAIL_FROM: str = "no-reply@smartcrm.com"
+    SMTP_USE_TLS: bool = True         # turn off for a local stand-in such as `python -m aiosmtpd -n`
+    SMTP_TIMEOUT: int = 30
+    SMTP_IDLE_SECONDS: int = 60       # reopen a pooled connection that sat idle this long
+
+    # Email outbox (app/services/email_outbox.py)
+    EMAIL_OUTBOX_ENABLED: bool = True
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_BACKOFF_SECONDS: int = 30    # doubled on every failed attempt
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300     # a claimed batch is retried if its sender dies
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 7      # sent and failed rows are deleted after this long
+    EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # SQLite storage profile and connection pools (app/models/database.py)
+    SQLITE_WAL: bool = True                # readers proceed while a write is in flight
+    SQLITE_SYNCHRONOUS: str = "NORMAL"     # with WAL, durable across app crashes; FULL also survives power loss
+    SQLITE_MMAP_SIZE: int = 268435456      # bytes of the database file read through mmap
+    SQLITE_CACHE_SIZE_KIB: int = 65536     # page cache per connection
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000     # wait this long for the write lock before "database is locked"
+    SQLITE_TEMP_STORE: str = "MEMORY"      # sorts and temp indexes
+    DB_WRITE_POOL_SIZE: int = 2            # SQLite serializes writers anyway
+    DB_WRITE_POOL_MAX_OVERFLOW: int = 2
+    DB_READ_POOL_SIZE: int = 8             # query-only connections for GET endpoints (get_read_db)
+    DB_READ_POOL_MAX_OVERFLOW: int = 8
+
+    # Per-organization database engines (app/db.py)
+    TENANT_ENGINE_MAX: int = 64            # open engines kept before the least recently used is disposed
+    TENANT_ENGINE_IDLE_SECONDS: int = 300  # engines unused this long are disposed
+    TENANT_ENGINE_EVICT_INTERVAL_SECONDS: int = 60  # how often idle engines are looked for
+    TENANT_POOL_SIZE: int = 2
+    TENANT_POOL_MAX_OVERFLOW: int = 3
+    TENANT_POOL_TIMEOUT: int = 10
+
+    # Tenant shards (app/db.py, app/services/tenant_migration.py)
+    SHARD_DIRECTORY_TTL_SECONDS: int = 5        # other workers may route by a stale mapping this long
+    SHARD_DIRECTORY_MAX_ENTRIES: int = 10000
+    SHARD_POOL_SIZE: int = 4                    # per shard database
+    SHARD_POOL_MAX_OVERFLOW: int = 4
+    TENANT_MIGRATION_BATCH_SIZE: int = 2000     # rows compared and copied per transaction
+    TENANT_MIGRATION_CUTOVER_ROWS: int = 500    # catch up until a pass changes fewer rows, then cut over
+
+    # Authenticated-principal cache (app/core/principal_cache.py)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Build the principal from the token's signed role/org claims instead of the users
+    # table. Revocation still needs the user's token_epoch, which each worker re-reads at
+    # most this often, so a revoked token is refused by every worker within that long.
+    TRUST_TOKEN_CLAIMS: bool = False
+    TOKEN_EPOCH_TTL_SECONDS: int = 5
+
+    # Subscription entitlements (app/core/entitlements.py)
+    ENTITLEMENT_CACHE_TTL_SECONDS: int = 300    # organization tiers; upgrades invalidate this process at once
+    ENTITLEMENT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing (app/services/password_service.py)
+    PASSWORD_SCHEMES: List[str] = ["bcrypt"]  # first is used for new hashes, the rest are rehashed on login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_TARGET_MS: int = 0      # >0: calibrate bcrypt rounds at startup to roughly this cost
+    PASSWORD_HASH_WORKERS: int = 4        # concurrent hash/verify operations
+    PASSWORD_HASH_MAX_QUEUE: int = 256    # waiting operations before callers get 503
+
+    # Rate limiting (app/middleware/rate_limiter.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"    # "memory" (per process), "sqlite" (shared by local workers) or "redis"
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_MAX_KEYS: int = 100000     # memory backend only
+
+    # Metrics and SQL instrumentation (app/core/metrics.py), served on /metrics
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_MS: float = 200                # statements slower than this are logged and counted
+    REPEATED_STATEMENT_THRESHOLD: int = 5     # one statement this many times in a request is flagged as N+1
+
+    # Bulk lead import (app/services/lead_import.py)
+    LEAD_IMPORT_CHUNK_SIZE: int = 1000            # rows validated, deduped and inserted per transaction
+    LEAD_IMPORT_MAX_REPORTED_ERRORS: int = 1000   # row errors returned in the report; the rest are only counted
+
+    # Streaming exports (app/services/export_service.py)
+    EXPORT_BATCH_SIZE: int = 1000   # rows fetched from the cursor and written per chunk
+
+    # Complaint classifier (app/services/complaint_classifier.py)
+    COMPLAINT_CLASSIFIER_PATH: str = "./complaint_classifier.npz"  # written by train_complaint_classifier.py
+    COMPLAINT_CLASSIFY_CHUNK_SIZE: int = 1000   # complaints scored and updated per transaction
+
+    # Lead scoring (app/services/lead_scoring.py)
+    LEAD_SCORING_CHUNK_SIZE: int = 5000   # leads scored and updated per transaction
+
+    # Retrieval for the chatbot (app/services/embeddings.py, vector_index.py, retrieval.py)
+    EMBEDDING_MODEL: str = "hashing"            # name registered in app/services/embeddings.py
+    EMBEDDING_DIM: int = 384
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 50000    # embeddings kept in memory, keyed by content hash
+    VECTOR_INDEX_DIR: str = "./vector_indexes"  # one memory-mapped index directory per organization
+    VECTOR_INDEX_MAX_OPEN: int = 32             # open indexes kept before the least recently used is closed
+    VECTOR_INDEX_LIST_FACTOR: float = 2.0       # inverted lists per sqrt(vectors) when the index is trained
+    VECTOR_INDEX_NPROBE: int = 32               # inverted lists scanned per query; see benchmarks/bench_vector_index.py
+    VECTOR_INDEX_TRAIN_MIN: int = 20000         # below this many vectors, search is exact brute force
+    RETRIEVAL_TOP_K: int = 5
+    RETRIEVAL_INLINE_CATCHUP_MAX: int = 200     # change-log entries a query replays itself; more are replayed in the background
+    RETRIEVAL_BUILD_RETRY_AFTER: int = 10       # seconds, Retry-After of the 503 while an index is being built
+    ARTICLE_CHUNK_WORDS: int = 120              # knowledge articles are indexed in chunks of this many words
+
+    # Fuzzy duplicate-lead detection (app/services/lead_dedupe.py)
+    DEDUPE_NUM_PERM: int = 64               # MinHash values per lead signature
+    DEDUPE_BANDS: int = 16                  # LSH bands of DEDUPE_NUM_PERM / DEDUPE_BANDS values; 16 x 4 makes
+                                            # ~99% of pairs at similarity 0.7 candidates, ~2.5% at 0.2
+    DEDUPE_SIMILARITY_THRESHOLD: float = 0.5  # estimated Jaccard similarity needed for a merge suggestion
+    DEDUPE_NAME_ONLY_WEIGHT: float = 0.6    # similarity multiplier for pairs sharing no email or phone
+    DEDUPE_MAX_BUCKET_SIZE: int = 200       # larger buckets (very common values) produce no candidates
+    DEDUPE_CHUNK_SIZE: int = 5000           # leads signed and matched per transaction
+
+    # SerpAPI lead generation (app/services/serp_service.py)
+    SERPAPI_API_KEY: str = ""
+    SERPAPI_BASE_URL: str = "https://serpapi.com/search"   # point at a local stub in tests and benchmarks
+    SERPAPI_TIMEOUT_SECONDS: float = 15
+    SERPAPI_MAX_CONNECTIONS: int = 20       # shared client's pool; also the cap on concurrent lookups
+    SERPAPI_CACHE_TTL_SECONDS: int = 3600   # identical (query, location) lookups are served from memory
+    SERPAPI_CACHE_MAX_ENTRIES: int = 5000
+    SERPAPI_TENANT_CONCURRENCY: int = 4     # lookups one organization can have in flight
+    SERPAPI_TENANT_DAILY_QUOTA: int = 500   # paid lookups per organization per UTC day; cache hits are free
+    SERPAPI_BATCH_MAX: int = 50             # query/location pairs per batch call
+
+    # Change-data-capture log (app/models/change_log.py, app/services/change_log.py)
+    CHANGE_LOG_PAGE_SIZE: int = 500
+    CHANGE_LOG_MAX_PAGE_SIZE: int = 5000
+    CHANGE_LOG_RETENTION_DAYS: int = 30     # prune_change_log.py keeps entries this long, and any a consumer hasn't committed
+    CHANGE_LOG_PRUNE_BATCH_SIZE: int = 5000
+
+    # Startup schema check (app/core/schema.py): refuse to start unless the database is at
+    # the alembic head. Tables are never created at startup.
+    SCHEMA_CHECK_ENABLED: bool = True
 
     # App settings
     APP_NAME: str = "Smart CRM"
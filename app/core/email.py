@@ -1,18 +1,72 @@
 # app/core/email.py
 import smtplib
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings  # your config file for email credentials
 
-def send_email(to_email: str, subject: str, body: str):
+def build_message(to_email: str, subject: str, body: str) -> MIMEMultipart:
     msg = MIMEMultipart()
     msg['From'] = settings.EMAIL_FROM
     msg['To'] = to_email
     msg['Subject'] = subject
 
     msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+class SMTPConnection:
+    """
+    A long-lived SMTP session reused across messages.
+
+    STARTTLS and login happen once per connection instead of once per message. A
+    connection idle for longer than `idle_seconds` is closed and reopened on the next
+    send, so the server-side timeout is never relied on.
+    """
+
+    def __init__(self, idle_seconds: float = settings.SMTP_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._server = None
+        self._last_used = 0.0
 
-    with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-        server.starttls()
-        server.login(settings.SMTP_USER, settings.SMTP_PASS)
-        server.send_message(msg)
+    def _open(self):
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT)
+        if settings.SMTP_USE_TLS:
+            server.starttls()
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        self._server = server
+
+    def send(self, msg: MIMEMultipart):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+        if self._server is None:
+            self._open()
+        try:
+            self._server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped a pooled connection; reconnect once and retry
+            self._server = None
+            self._open()
+            self._server.send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+def send_email(to_email: str, subject: str, body: str):
+    """
+    Send one message synchronously on a fresh connection. Request handlers should
+    enqueue through app.services.email_outbox instead.
+    """
+    connection = SMTPConnection()
+    try:
+        connection.send(build_message(to_email, subject, body))
+    finally:
+        connection.close()
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Mapping, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.database import AsyncReadSessionLocal
+from app.models.organization import Organization, SubscriptionTier
+
+# Features each subscription tier includes
+TIER_FEATURES: Dict[SubscriptionTier, tuple] = {
+    SubscriptionTier.FREE: ("basic_dashboard", "limited_leads"),
+    SubscriptionTier.BASIC: ("basic_dashboard", "limited_leads", "ai_scoring"),
+    SubscriptionTier.PREMIUM: ("basic_dashboard", "limited_leads", "ai_scoring", "priority_support"),
+}
+
+FEATURES = tuple(dict.fromkeys(name for names in TIER_FEATURES.values() for name in names))
+FEATURE_BITS = {name: 1 << bit for bit, name in enumerate(FEATURES)}
+
+
+def feature_bit(feature: str) -> int:
+    """
+    Bit for a feature name; unknown names raise, so a typo fails where it is declared
+    instead of silently denying access.
+    """
+    try:
+        return FEATURE_BITS[feature]
+    except KeyError:
+        raise ValueError(f"Unknown feature {feature!r}") from None
+
+
+def compile_tiers(matrix: Mapping[SubscriptionTier, Iterable[str]]) -> Dict[SubscriptionTier, int]:
+    bits = {}
+    for tier, features in matrix.items():
+        bits[tier] = 0
+        for feature in features:
+            bits[tier] |= feature_bit(feature)
+    return bits
+
+
+TIER_BITS = compile_tiers(TIER_FEATURES)
+
+
+def tier_allows(tier: Optional[SubscriptionTier], feature: str) -> bool:
+    return bool(TIER_BITS.get(tier, 0) & feature_bit(feature))
+
+
+class OrgTierCache:
+    """
+    In-process TTL + LRU cache of organization id -> subscription tier.
+
+    Entitlement checks and the rate limiter resolve tiers here, so the hot path doesn't
+    query organizations; `invalidate` after a tier change makes this process see it at once
+    (other workers within the TTL).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.ENTITLEMENT_CACHE_TTL_SECONDS,
+        max_entries: int = settings.ENTITLEMENT_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # org id -> (tier, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, organization_id: str) -> tuple:
+        """
+        (found, tier); tier is None for an organization that doesn't exist.
+        """
+        with self._lock:
+            entry = self._entries.get(organization_id)
+            if entry is None:
+                return False, None
+            tier, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[organization_id]
+                return False, None
+            self._entries.move_to_end(organization_id)
+            return True, tier
+
+    def put(self, organization_id, tier: Optional[SubscriptionTier]):
+        organization_id = str(organization_id)
+        with self._lock:
+            self._entries[organization_id] = (tier, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(organization_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, organization_id):
+        with self._lock:
+            self._entries.pop(str(organization_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def resolve(self, organization_id) -> Optional[SubscriptionTier]:
+        """
+        The organization's tier, loaded once per TTL. None without an organization.
+        """
+        if organization_id is None:
+            return None
+        organization_id = str(organization_id)
+        found, tier = self.get(organization_id)
+        if found:
+            return tier
+        async with AsyncReadSessionLocal() as db:
+            tier = (await db.execute(
+                select(Organization.subscription_tier).where(Organization.id == organization_id)
+            )).scalar()
+        self.put(organization_id, tier)
+        return tier
+
+
+org_tiers = OrgTierCache()
@@ -0,0 +1,253 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for values, total in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_labels = self.labels + ("le",)
+        self._bounds = tuple("%g" % bound for bound in self.buckets) + ("+Inf",)
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [per-bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for values, series in sorted(self._series.items()):
+                cumulative = 0
+                for index, bound in enumerate(self._bounds):
+                    cumulative = series[-1] if bound == "+Inf" else cumulative + series[index]
+                    lines.append(f"{self.name}_bucket{_labels(self._bucket_labels, values + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, values)} {series[-2]:g}")
+                lines.append(f"{self.name}_count{_labels(self.labels, values)} {series[-1]}")
+        return lines
+
+
+class Collected:
+    """
+    A gauge or counter kept by some other component (e.g. a cache's own hit counts) and
+    read from it when /metrics is rendered. `collect` returns (label values, value) pairs.
+    """
+
+    def __init__(self, name: str, documentation: str, kind: str, labels: Sequence[str], collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labels = tuple(labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in sorted(self.collect()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {value:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format on /metrics.
+    Each worker process keeps its own; scrape every worker (or sum them) for totals.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collected(self, name: str, documentation: str, kind: str, labels: Sequence[str], collect) -> Collected:
+        metric = Collected(name, documentation, kind, labels, collect)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUEST_SECONDS = metrics.histogram(
+    "http_request_duration_seconds", "Request latency by route.", ("method", "route", "status"),
+)
+REQUEST_QUERIES = metrics.histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = metrics.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("method", "route"),
+)
+SLOW_QUERIES = metrics.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.", ("route",),
+)
+REPEATED_STATEMENTS = metrics.counter(
+    "db_repeated_statement_requests_total",
+    "Requests that ran one statement at least REPEATED_STATEMENT_THRESHOLD times (likely N+1).",
+    ("method", "route"),
+)
+
+
+class RequestStats:
+    """
+    SQL activity of the request being served, filled in by the engine hooks.
+    """
+
+    __slots__ = ("scope", "queries", "db_seconds", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Dict[str, int] = {}  # fingerprint -> executions
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope)
+
+
+# Set by MetricsMiddleware; the engine hooks see it through SQLAlchemy's async greenlets
+# and FastAPI's threadpool alike, since both run in the request's context.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def route_label(scope) -> str:
+    """
+    The matched route's path template, so /leads/1 and /leads/2 are one series. Unmatched
+    paths share a single label to keep the number of series bounded.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBERED = re.compile(r"\$\d+|%\([^)]*\)s|:\w+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """
+    A statement with its parameter placeholders normalized and IN lists collapsed, so the
+    same query with different values (or list lengths) counts as one.
+    """
+    statement = _NUMBERED.sub("?", statement)
+    statement = _IN_LIST.sub("(?)", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        key = fingerprint(statement)
+        stats.statements[key] = stats.statements.get(key, 0) + 1
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "none"
+        SLOW_QUERIES.inc(route)
+        logger.warning("Slow query (%.0f ms) in %s: %s", elapsed * 1000, route, fingerprint(statement)[:500])
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def instrument_engines():
+    """
+    Time every statement on every engine (API, scripts and tenant engines alike). Idempotent.
+    """
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def record_request(method: str, stats: RequestStats, status_code: int, elapsed: float):
+    route = stats.route
+    REQUEST_SECONDS.observe(elapsed, method, route, str(status_code))
+    REQUEST_QUERIES.observe(stats.queries, method, route)
+    REQUEST_DB_SECONDS.observe(stats.db_seconds, method, route)
+
+    repeated = [(count, key) for key, count in stats.statements.items() if count >= settings.REPEATED_STATEMENT_THRESHOLD]
+    if repeated:
+        REPEATED_STATEMENTS.inc(method, route)
+        count, key = max(repeated)
+        logger.warning(
+            "%s %s ran one statement %d times (%d queries in total), likely N+1: %s",
+            method, route, count, stats.queries, key[:500],
+        )
@@ -0,0 +1,24 @@
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D+")
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Case- and whitespace-insensitive form of an email address, used as a dedupe key.
+    """
+    if not email:
+        return None
+    email = email.strip().lower()
+    return email or None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Digits-only form of a phone number, so "+1 (555) 010-2030" and "15550102030" match.
+    """
+    if not phone:
+        return None
+    digits = _NON_DIGITS.sub("", phone)
+    return digits or None
@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: Any) -> str:
+    """
+    Encode the (created_at, id) position of the last row of a page into an opaque token.
+    """
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], Any]:
+    """
+    Decode a token produced by `encode_cursor`. Raises 400 if it was tampered with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at) if created_at is not None else None, row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def apply_keyset(query, model, cursor: Optional[str], limit: int):
+    """
+    Order `query` (an ORM Query or a select) newest first and seek past `cursor` on (created_at, id).
+
+    Unlike OFFSET paging the database never walks the rows of earlier pages, so the cost of
+    a page does not depend on how deep into the table it is. One extra row is requested so
+    the caller can tell whether another page exists.
+
+    Rows whose created_at is NULL are left out: they come after all the others, paged by id
+    through `apply_undated_keyset`. Folding them into this seek with an OR would stop the
+    database from seeking on created_at.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < row_id),
+            )
+        )
+    else:
+        query = query.filter(model.created_at.isnot(None))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def apply_undated_keyset(query, model, after_id: Optional[Any], limit: int):
+    """
+    The rows of `query` whose created_at is NULL, highest id first, below `after_id` if given.
+    """
+    query = query.filter(model.created_at.is_(None))
+    if after_id is not None:
+        query = query.filter(model.id < after_id)
+    return query.order_by(model.id.desc()).limit(limit + 1)
+
+
+async def keyset_paginate(
+    db: AsyncSession, query, model, cursor: Optional[str], limit: int, as_rows: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Return one page of the select `query` and the cursor for the page after it (None on the last page).
+
+    With `as_rows` the page is the select's row tuples rather than entities; the select must
+    include `created_at` and `id` columns for the cursor.
+    """
+    async def fetch(statement) -> List[Any]:
+        result = await db.execute(statement)
+        return result.all() if as_rows else result.scalars().all()
+
+    created_at, row_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    if not cursor or created_at is not None:
+        rows = await fetch(apply_keyset(query, model, cursor, limit))
+    if len(rows) <= limit:
+        # Past the last dated row: continue into the undated ones
+        after_id = row_id if cursor and created_at is None else None
+        rows += await fetch(apply_undated_keyset(query, model, after_id, limit - len(rows)))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller as seen by route dependencies.
+
+    Carries only what authorization needs, so it can be cached or rebuilt from token
+    claims without loading the full `User` row.
+    """
+    id: str
+    role: str
+    organization_id: Optional[str]
+    is_active: bool = True
+    token_epoch: int = 0
+    # organization_id as the integer tenant id that routes and scopes tenant data; None
+    # without an organization or for one that isn't an integer (users created with a UUID)
+    tenant_id: Optional[int] = field(init=False, default=None, compare=False)
+
+    def __post_init__(self):
+        try:
+            tenant_id = int(self.organization_id) if self.organization_id not in (None, "") else None
+        except (TypeError, ValueError):
+            tenant_id = None
+        object.__setattr__(self, "tenant_id", tenant_id)
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=str(user.id),
+            role=getattr(user.role, "value", user.role),
+            organization_id=str(user.organization_id) if user.organization_id is not None else None,
+            is_active=bool(user.is_active),
+            token_epoch=user.token_epoch or 0,
+        )
+
+
+class PrincipalCache:
+    """
+    In-process TTL + LRU cache of principals keyed by user id.
+
+    Also keeps each user's revocation epoch (users.token_epoch) for the trusted-claims mode,
+    which rejects tokens issued before a role/org/password change. Epochs expire after
+    TOKEN_EPOCH_TTL_SECONDS and are read again from the database, since a revocation made
+    by another worker only reaches this process that way.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        max_entries: int = settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+        epoch_ttl_seconds: float = settings.TOKEN_EPOCH_TTL_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.epoch_ttl_seconds = epoch_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # id -> (principal, expires_at)
+        self._epochs: "OrderedDict[str, tuple]" = OrderedDict()   # id -> (token_epoch, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: Principal):
+        with self._lock:
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._put_epoch(principal.id, principal.token_epoch)
+
+    def _put_epoch(self, user_id: str, token_epoch: int):
+        entry = self._epochs.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            token_epoch = max(token_epoch, entry[0])  # epochs only grow; keep a newer local revocation
+        self._epochs[user_id] = (token_epoch, time.monotonic() + self.epoch_ttl_seconds)
+        self._epochs.move_to_end(user_id)
+        while len(self._epochs) > self.max_entries:
+            self._epochs.popitem(last=False)
+
+    def put_epoch(self, user_id, token_epoch: int):
+        """
+        Remember the user's token_epoch as just read from the database.
+        """
+        with self._lock:
+            self._put_epoch(str(user_id), token_epoch)
+
+    def invalidate(self, user_id, token_epoch: Optional[int] = None):
+        """
+        Drop a cached principal after a write to its user. Passing the user's new
+        `token_epoch` also revokes every token issued under an older epoch, at once in this
+        process and within TOKEN_EPOCH_TTL_SECONDS in the others.
+        """
+        user_id = str(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            if token_epoch is not None:
+                self._put_epoch(user_id, token_epoch)
+
+    def revoked_before(self, user_id: str) -> Optional[int]:
+        """
+        Tokens carrying an epoch lower than this are no longer valid for the user. None when
+        the epoch isn't cached (or is too old to trust): read users.token_epoch.
+        """
+        with self._lock:
+            entry = self._epochs.get(user_id)
+            if entry is None or entry[1] <= time.monotonic():
+                return None
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epochs.clear()
+
+
+principal_cache = PrincipalCache()
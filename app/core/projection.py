@@ -0,0 +1,41 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy import literal, null
+from sqlalchemy.sql import ColumnElement
+
+
+class Projection:
+    """
+    The columns a response schema needs, labelled with its field names.
+
+    List endpoints select these instead of whole entities and render the row tuples straight
+    to dicts for `ORJSONResponse`, skipping ORM identity-map work and pydantic validation:
+    the rows come from our own typed columns, so they already match the schema. Fields with
+    no column of the same name need an override expression, or a default in the schema.
+    """
+
+    def __init__(self, schema, model, **overrides: ColumnElement):
+        self.schema = schema
+        self.fields: List[str] = []
+        self.columns: List[ColumnElement] = []
+        for name, field in schema.__fields__.items():
+            if name in overrides:
+                expression = overrides[name]
+            elif name in model.__table__.c:
+                expression = getattr(model, name)
+            elif not field.required:
+                expression = null() if field.default is None else literal(field.default)
+            else:
+                raise ValueError(f"{schema.__name__}.{name} has no column on {model.__name__}")
+            self.fields.append(name)
+            self.columns.append(expression.label(name))
+
+    def select(self, query):
+        """
+        Narrow an entity select (with its filters) to the projected columns.
+        """
+        return query.with_only_columns(*self.columns)
+
+    def dicts(self, rows: Iterable) -> List[Dict]:
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
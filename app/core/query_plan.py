@@ -0,0 +1,45 @@
+import re
+from typing import List, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+# "SCAN leads" / "SCAN leads USING COVERING INDEX ..." both read every row of the table;
+# only "SEARCH ..." steps are bounded by an index lookup. Two SCAN steps are bounded too: a
+# virtual table scanned through its own index with constraints ("SCAN leads_fts VIRTUAL
+# TABLE INDEX 0:M5", an FTS5 MATCH), and a subquery's rows ("SCAN anon_1" after
+# "CO-ROUTINE anon_1" or "MATERIALIZE anon_1"), which its own steps account for.
+_FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW)(\S+)")
+_VIRTUAL_INDEX = re.compile(r"VIRTUAL TABLE INDEX \d+:\S")
+_SUBQUERY = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\S+)")
+
+
+def explain_query_plan(db: Session, query) -> List[str]:
+    """
+    Run SQLite's EXPLAIN QUERY PLAN on an ORM query or select and return the plan step details.
+    """
+    connection = db.connection()
+    statement = getattr(query, "statement", query)
+    compiled = statement.compile(dialect=connection.dialect)
+    params = compiled.construct_params()
+    return explain_statement(connection, str(compiled), tuple(params[name] for name in compiled.positiontup))
+
+
+def explain_statement(connection, statement: str, parameters: Sequence) -> List[str]:
+    """
+    EXPLAIN QUERY PLAN of SQL as the driver received it (e.g. recorded by a cursor hook).
+    """
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters)).fetchall()
+    return [row[-1] for row in rows]
+
+
+def full_table_scans(plan: List[str]) -> List[Tuple[str, str]]:
+    """
+    Return (table, plan step) for every step of `plan` that scans a whole table.
+    """
+    subqueries = {match.group(1) for match in map(_SUBQUERY.match, plan) if match}
+    scans = []
+    for step in plan:
+        match = _FULL_SCAN.match(step)
+        if match and match.group(1) not in subqueries and not _VIRTUAL_INDEX.search(step):
+            scans.append((match.group(1), step))
+    return scans
@@ -0,0 +1,28 @@
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value):
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, which serializes dicts of datetimes, enums and
+    numpy values natively and several times faster than json.dumps. The app's default
+    response class.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -0,0 +1,89 @@
+import ast
+import os
+from functools import lru_cache
+from typing import FrozenSet, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "migrations", "versions")
+
+
+def _revision_ids(value) -> Sequence[str]:
+    if value is None:
+        return ()
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+def _read_revision(path: str):
+    """
+    (revision, down revisions) of one migration script, from its module-level assignments.
+    """
+    found = {}
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            targets, value = [node.target.id], node.value
+        elif isinstance(node, ast.Assign):
+            targets, value = [t.id for t in node.targets if isinstance(t, ast.Name)], node.value
+        else:
+            continue
+        for name in targets:
+            if name in ("revision", "down_revision"):
+                found[name] = ast.literal_eval(value)
+    return found.get("revision"), _revision_ids(found.get("down_revision"))
+
+
+@lru_cache(maxsize=None)
+def head_revisions(versions_dir: str = VERSIONS_DIR) -> FrozenSet[str]:
+    """
+    The head revision(s) of the migration scripts: revisions no other script revises.
+
+    The scripts are parsed rather than loaded through alembic's ScriptDirectory, which would
+    import alembic and every migration module and cost more than the check saves.
+    """
+    revisions, revised = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        revision, down_revisions = _read_revision(os.path.join(versions_dir, name))
+        if revision:
+            revisions.add(revision)
+            revised.update(down_revisions)
+    return frozenset(revisions - revised)
+
+
+def current_revisions(engine: Engine) -> Optional[FrozenSet[str]]:
+    """
+    The revision(s) stamped in the database's alembic_version table, or None if it has none.
+    """
+    with engine.connect() as conn:
+        try:
+            rows = conn.execute(text("SELECT version_num FROM alembic_version")).scalars().all()
+        except (OperationalError, ProgrammingError):
+            return None
+    return frozenset(rows)
+
+
+def check_schema(engine: Engine):
+    """
+    Fail fast unless the database is at the migration head. Nothing is created or altered:
+    the schema is owned by `alembic upgrade head`, run once per deploy rather than
+    inspected by every worker as it starts.
+    """
+    heads = head_revisions()
+    current = current_revisions(engine)
+    if current == heads:
+        return
+    if not current:
+        raise RuntimeError(
+            f"database {engine.url} has no alembic revision (expected {', '.join(sorted(heads))}); "
+            "run `alembic upgrade head` (or `python -m app.init_db`) for a new database, or "
+            "`alembic stamp 2f8b6d4e9a17` first for one created before the app had migrations"
+        )
+    raise RuntimeError(
+        f"database {engine.url} is at revision {', '.join(sorted(current))} but the migrations' head is "
+        f"{', '.join(sorted(heads))}; run `alembic upgrade head` (or deploy the code matching the database)"
+    )
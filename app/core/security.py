@@ -6,8 +6,14 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing. Hashes below the configured bcrypt cost (or from a scheme that is
+# no longer first in PASSWORD_SCHEMES) are flagged by needs_update and rehashed on login.
+pwd_context = CryptContext(
+    schemes=settings.PASSWORD_SCHEMES,
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def get_password_hash(password: str) -> str:
     """
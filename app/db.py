@@ -1,12 +1,393 @@
 # app/db.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.database import AsyncReadSessionLocal, AsyncSessionLocal, apply_storage_profile
+from app.models.tenant_shard import TenantShard
+
+logger = logging.getLogger(__name__)
+
+
+class TenantEngineRegistry:
+    """
+    Process-wide cache of per-organization engines, keyed by `Organization.org_db_name`.
+
+    Engines are reused across requests instead of being built per session. The registry
+    holds at most `max_engines` of them in LRU order and disposes the pool of any engine
+    that is evicted or has been idle for `idle_seconds`, so thousands of tenant databases
+    never translate into thousands of open files.
+    """
+
+    def __init__(
+        self,
+        max_engines: int = settings.TENANT_ENGINE_MAX,
+        idle_seconds: float = settings.TENANT_ENGINE_IDLE_SECONDS,
+        pool_size: int = settings.TENANT_POOL_SIZE,
+        max_overflow: int = settings.TENANT_POOL_MAX_OVERFLOW,
+        pool_timeout: int = settings.TENANT_POOL_TIMEOUT,
+        url_template: str = "sqlite:///./{name}.db",
+    ):
+        self.max_engines = max_engines
+        self.idle_seconds = idle_seconds
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.url_template = url_template
+
+        # name -> [engine, sessionmaker, last_used]; least recently used first
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _create_engine(self, name: str) -> Engine:
+        engine = create_engine(
+            self.url_template.format(name=name),
+            connect_args={"check_same_thread": False},
+            poolclass=QueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+        )
+        apply_storage_profile(engine)
+        return engine
+
+    def _create_sessionmaker(self, engine):
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _dispose(self, engine):
+        engine.dispose()
+
+    def _checkout(self, name: str) -> list:
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(name)
+            else:
+                self.misses += 1
+                engine = self._create_engine(name)
+                entry = [engine, self._create_sessionmaker(engine), now]
+                self._entries[name] = entry
+            entry[2] = now
+            evicted.extend(self._pop_expired(now))
+        # Closing pooled connections can block; never do it while holding the lock
+        for engine in evicted:
+            self._dispose(engine)
+        return entry
+
+    def _pop_expired(self, now: float) -> list:
+        """
+        Pop engines over the size bound or past the idle timeout. Caller holds the lock.
+        """
+        evicted = []
+        while self._entries:
+            name, (engine, _, last_used) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_engines and now - last_used < self.idle_seconds:
+                break
+            del self._entries[name]
+            self.evictions += 1
+            evicted.append(engine)
+        return evicted
+
+    def get_engine(self, name: str) -> Engine:
+        return self._checkout(name)[0]
+
+    def get_session(self, name: str):
+        return self._checkout(name)[1]()
+
+    def get_sessionmaker(self, name: str):
+        return self._checkout(name)[1]
+
+    def evict_idle(self) -> int:
+        """
+        Dispose every engine idle for longer than `idle_seconds`. Returns how many were evicted.
+        """
+        with self._lock:
+            evicted = self._pop_expired(time.monotonic())
+        for engine in evicted:
+            self._dispose(engine)
+        return len(evicted)
+
+    def dispose(self, name: Optional[str] = None):
+        """
+        Dispose one tenant's engine, or every engine when `name` is None.
+        """
+        with self._lock:
+            if name is None:
+                engines = [entry[0] for entry in self._entries.values()]
+                self._entries.clear()
+            else:
+                entry = self._entries.pop(name, None)
+                engines = [entry[0]] if entry else []
+        for engine in engines:
+            self._dispose(engine)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "open_engines": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class AsyncTenantEngineRegistry(TenantEngineRegistry):
+    """
+    The same registry for the API: aiosqlite engines with AsyncSession factories, used for
+    the shard databases the shard directory routes organizations to.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("url_template", "sqlite+aiosqlite:///./{name}.db")
+        super().__init__(**kwargs)
+        self._disposing = set()
+
+    def _create_engine(self, name: str):
+        engine = create_async_engine(
+            self.url_template.format(name=name),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+        )
+        apply_storage_profile(engine.sync_engine)
+        return engine
+
+    def _create_sessionmaker(self, engine):
+        return sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+    def _dispose(self, engine):
+        # Async engines close their connections on the event loop; keep a reference to the
+        # task until it is done
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(engine.dispose())
+            return
+        task = loop.create_task(engine.dispose())
+        self._disposing.add(task)
+        task.add_done_callback(self._disposing.discard)
+
+    async def aclose(self):
+        """
+        Dispose every engine and wait for their connections to close (app shutdown).
+        """
+        with self._lock:
+            engines = [entry[0] for entry in self._entries.values()]
+            self._entries.clear()
+        for engine in engines:
+            await engine.dispose()
+        if self._disposing:
+            await asyncio.gather(*self._disposing, return_exceptions=True)
+
+
+tenant_engines = TenantEngineRegistry()
+shard_engines = AsyncTenantEngineRegistry(
+    pool_size=settings.SHARD_POOL_SIZE, max_overflow=settings.SHARD_POOL_MAX_OVERFLOW,
+)
+
+
+class IdleEngineEvictor:
+    """
+    Background task disposing the engines of both registries once they have been idle for
+    `idle_seconds`. A checkout only evicts when some other engine is used, so without it a
+    worker that stops seeing traffic keeps its last tenants' pools and files open.
+    """
+
+    def __init__(self, interval_seconds: float = settings.TENANT_ENGINE_EVICT_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                # Closing sqlite connections blocks; the async registry schedules its own
+                # disposal on the event loop
+                await asyncio.to_thread(tenant_engines.evict_idle)
+                shard_engines.evict_idle()
+            except Exception:
+                logger.exception("Evicting idle tenant engines failed")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+idle_engine_evictor = IdleEngineEvictor()
+
+ENGINE_REGISTRIES = {"tenant": tenant_engines, "shard": shard_engines}
+
+
+def _registry_stat(key: str):
+    return lambda: [((name,), registry.stats()[key]) for name, registry in ENGINE_REGISTRIES.items()]
+
+
+metrics.collected("db_tenant_engines_open", "Engines open in each tenant engine registry.", "gauge", ("registry",), _registry_stat("open_engines"))
+metrics.collected("db_tenant_engine_hits_total", "Engine lookups served by an open engine.", "counter", ("registry",), _registry_stat("hits"))
+metrics.collected("db_tenant_engine_misses_total", "Engine lookups that created an engine.", "counter", ("registry",), _registry_stat("misses"))
+metrics.collected("db_tenant_engine_evictions_total", "Engines disposed for being idle or over TENANT_ENGINE_MAX.", "counter", ("registry",), _registry_stat("evictions"))
+
+DEFAULT_SHARD = "default"  # the main database
+
+
+class ShardDirectory:
+    """
+    In-process TTL + LRU cache of organization id -> (shard, frozen), read from the
+    tenant_shards table. A move invalidates the process running it at once; other workers
+    follow within the TTL, which is why a cutover freezes writes for at least that long.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.SHARD_DIRECTORY_TTL_SECONDS,
+        max_entries: int = settings.SHARD_DIRECTORY_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # org id -> (shard, frozen, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, organization_id: str) -> Optional[Tuple[str, bool]]:
+        with self._lock:
+            entry = self._entries.get(organization_id)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._entries[organization_id]
+                return None
+            self._entries.move_to_end(organization_id)
+            return entry[0], entry[1]
+
+    def put(self, organization_id, shard: str, frozen: bool = False):
+        organization_id = str(organization_id)
+        with self._lock:
+            self._entries[organization_id] = (shard, frozen, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(organization_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, organization_id):
+        with self._lock:
+            self._entries.pop(str(organization_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    async def resolve(self, organization_id) -> Tuple[str, bool]:
+        """
+        (shard, frozen) of the organization; DEFAULT_SHARD without a directory row or without
+        an organization (system admins).
+        """
+        if organization_id is None:
+            return DEFAULT_SHARD, False
+        organization_id = str(organization_id)
+        cached = self.get(organization_id)
+        if cached is not None:
+            return cached
+        async with AsyncReadSessionLocal() as db:
+            row = (await db.execute(
+                select(TenantShard.shard, TenantShard.frozen).where(TenantShard.organization_id == organization_id)
+            )).first()
+        shard, frozen = (row.shard, row.frozen) if row else (DEFAULT_SHARD, False)
+        self.put(organization_id, shard, frozen)
+        return shard, frozen
+
+
+shard_directory = ShardDirectory()
+
+
+# session.info key of write sessions routed by tenant_sessionmaker: (organization id, shard)
+TENANT_ROUTE_KEY = "tenant_route"
+
+
+def _tenant_moving() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Organization data is being moved; retry shortly",
+        headers={"Retry-After": str(settings.SHARD_DIRECTORY_TTL_SECONDS)},
+    )
+
+
+async def tenant_sessionmaker(organization_id, read_only: bool = False):
+    """
+    AsyncSession factory for the database holding `organization_id`'s leads and complaints.
+    `organization_id` is the integer tenant id (Principal.tenant_id), or None for the main
+    database.
+    Writes to an organization in the middle of a cutover get 503 with Retry-After; reads are
+    served from the old shard until the mapping flips.
+
+    The routing is only resolved here, so a write session also re-checks it on every commit
+    (see _check_tenant_route below): a long import or scoring run that started before a
+    cutover can't keep committing to the old shard after the move's final pass.
+    """
+    shard, frozen = await shard_directory.resolve(organization_id)
+    if frozen and not read_only:
+        raise _tenant_moving()
+    if shard == DEFAULT_SHARD:
+        sessions = AsyncReadSessionLocal if read_only else AsyncSessionLocal
+    else:
+        sessions = shard_engines.get_sessionmaker(shard)
+    if read_only or organization_id is None:
+        return sessions
+    return functools.partial(sessions, info={TENANT_ROUTE_KEY: (organization_id, shard)})
+
+
+@event.listens_for(Session, "before_commit")
+def _check_tenant_route(session):
+    """
+    Refuse the commit with 503 if the organization has been frozen or moved off the database
+    this session writes to. The move writes the directory entry into that database's own
+    tenant_shards table (the main database's is the directory itself), and the check runs
+    after the flush, inside the write transaction: SQLite lets one writer commit at a time,
+    so the freeze either committed before this check, which sees it, or waits until this
+    transaction has committed, and the move's final pass copies the rows.
+    """
+    route = session.info.get(TENANT_ROUTE_KEY)
+    if route is None:
+        return
+    organization_id, shard = route
+    session.flush()
+    row = session.execute(
+        select(TenantShard.shard, TenantShard.frozen).where(TenantShard.organization_id == organization_id)
+    ).first()
+    if row is not None and (row.frozen or row.shard != shard):
+        shard_directory.invalidate(organization_id)
+        raise _tenant_moving()
+
+
+def get_org_engine(org_db_name: str) -> Engine:
+    return tenant_engines.get_engine(org_db_name)
 
-def get_org_engine(org_db_name: str):
-    db_url = f"sqlite:///./{org_db_name}.db"
-    return create_engine(db_url, connect_args={"check_same_thread": False})
 
 def get_org_session(org_db_name: str):
-    engine = get_org_engine(org_db_name)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return tenant_engines.get_session(org_db_name)
@@ -1,7 +1,31 @@
-# init_db.py
-from models.database import Base, engine
-import models
+# init_db.py: build or update the app's database by running the migrations, the same as
+# `alembic upgrade head`. Refuses a database whose tables were created without migrations
+# (an old Base.metadata.create_all): alembic would try to create them again, and stamping
+# such a database at the head would skip the columns added since. Stamp the revision its
+# schema matches first, e.g. `alembic stamp 2f8b6d4e9a17` for one created by the app before
+# it had migrations, then run this again.
+#
+#     python -m app.init_db
+import os
 
-print("Creating tables...")
-Base.metadata.create_all(bind=engine)
-print("✅ Done!")
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.core.schema import current_revisions, head_revisions
+from app.models import Base, engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+if not current_revisions(engine):
+    existing = sorted(set(inspect(engine).get_table_names()) & set(Base.metadata.tables))
+    if existing:
+        raise SystemExit(
+            f"Database {engine.url} has tables ({', '.join(existing)}) but no alembic revision. "
+            "Stamp the revision its schema matches (`alembic stamp 2f8b6d4e9a17` for one created "
+            "before migrations), then run `alembic upgrade head`."
+        )
+
+print("Running migrations...")
+command.upgrade(Config(ALEMBIC_INI), "head")
+print(f"✅ Done! At {', '.join(sorted(head_revisions()))}")
@@ -1,12 +1,24 @@
+import sys
+
 from fastapi import FastAPI
-from app.models.database import Base, engine
-from app.api.v1.endpoints import auth, lead, complaint, user
+from fastapi.responses import PlainTextResponse
+from app.models.database import async_engine, async_read_engine, engine
+from app.api.v1.endpoints import auth, lead, complaint, user, dashboard, chatbot, changes
 from fastapi.middleware.cors import CORSMiddleware
+from app.db import idle_engine_evictor, shard_engines, tenant_engines
+from app.middleware.rate_limiter import RateLimitMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.core.metrics import instrument_engines, metrics
+from app.core.schema import check_schema
+from app.services.password_service import apply_adaptive_cost, password_hasher
+from app.services.email_outbox import outbox_sender
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# No create_all here: the schema is migrated by `alembic upgrade head` and only checked at
+# startup. The AI, SerpAPI and chatbot services are imported by the endpoints using them.
 
-app = FastAPI(title="Smart CRM MVP")
+app = FastAPI(title="Smart CRM MVP", default_response_class=ORJSONResponse)
 
 # CORS settings
 origins = [
@@ -14,6 +26,15 @@ origins = [
     "http://127.0.0.1:5173"
 ]
 
+# Added before CORS so that CORS stays outermost and 429 responses carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Outside the rate limiter so 429s are measured too
+if settings.METRICS_ENABLED:
+    instrument_engines()
+    app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -26,8 +47,68 @@ app.add_middleware(
 app.include_router(auth.router, prefix="/api/v1/endpoints")
 app.include_router(lead.router, prefix="/api/v1/endpoints/lead")
 app.include_router(complaint.router, prefix="/api/v1/endpoints/complaint")
+app.include_router(dashboard.router, prefix="/api/v1/endpoints")
+app.include_router(chatbot.router, prefix="/api/v1/endpoints")
+app.include_router(changes.router, prefix="/api/v1/endpoints")
 app.include_router(user.router)
 
+@app.on_event("startup")
+def check_database_schema():
+    if settings.SCHEMA_CHECK_ENABLED:
+        check_schema(engine)
+
+@app.on_event("startup")
+def tune_password_hashing():
+    apply_adaptive_cost()
+
+@app.on_event("startup")
+async def start_email_outbox():
+    if settings.EMAIL_OUTBOX_ENABLED:
+        outbox_sender.start()
+
+@app.on_event("startup")
+async def start_idle_engine_evictor():
+    idle_engine_evictor.start()
+
+@app.on_event("shutdown")
+async def stop_email_outbox():
+    await outbox_sender.stop()
+
+@app.on_event("shutdown")
+async def stop_idle_engine_evictor():
+    await idle_engine_evictor.stop()
+
+@app.on_event("shutdown")
+async def close_serp_client():
+    serp_service = sys.modules.get("app.services.serp_service")
+    if serp_service is not None:  # only loaded once leads were generated
+        await serp_service.serp_client.aclose()
+
+@app.on_event("shutdown")
+async def stop_index_updates():
+    retrieval = sys.modules.get("app.services.retrieval")
+    if retrieval is not None:  # only loaded once the chatbot was queried
+        await retrieval.stop_index_updates()
+
+@app.on_event("shutdown")
+def dispose_tenant_engines():
+    tenant_engines.dispose()
+    password_hasher.shutdown()
+    vector_index = sys.modules.get("app.services.vector_index")
+    if vector_index is not None:  # only loaded once the chatbot was queried
+        vector_index.vector_indexes.close()
+
+@app.on_event("shutdown")
+async def close_database_pools():
+    # Pooled aiosqlite connections each hold a worker thread that would keep the process alive
+    await async_engine.dispose()
+    await async_read_engine.dispose()
+    await shard_engines.aclose()
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/")
 def root():
     return {"message": "Smart CRM API is running 🚀"}
@@ -0,0 +1,36 @@
+import time
+
+from app.core.metrics import RequestStats, current_request, record_request
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording each request's latency, status and SQL activity per route
+    (see app/core/metrics.py). The route is read after routing, so series are keyed by path
+    template rather than by concrete URL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request.reset(token)
+            record_request(scope["method"], stats, status_code, time.perf_counter() - start)
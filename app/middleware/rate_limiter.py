@@ -1,9 +1,197 @@
+import asyncio
+import json
+import math
+import sqlite3
+import threading
 import time
-from typing import Dict
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple, Optional
+
 from fastapi import HTTPException, status
-from app.models.user import User
+from jose import JWTError, jwt
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.entitlements import org_tiers
+from app.core.principal_cache import principal_cache
 from app.models.organization import SubscriptionTier
 
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until a request would be allowed again (0 if allowed)
+
+
+def _retry_after(estimated: float, curr: int, prev: int, elapsed: float, window: int, limit: int) -> float:
+    """
+    Seconds until the weighted estimate has decayed enough to admit one more request.
+    """
+    if curr + 1 > limit:
+        return window - elapsed  # the current window alone is full
+    return max(0.0, (estimated + 1 - limit) / prev * window)
+
+
+def _sliding_window(window_start: int, curr: int, prev: int, now: float, window: int, limit: int):
+    """
+    Sliding-window counter: the previous fixed window's count, weighted by how much of it
+    still overlaps the sliding window, plus the current window's count. Needs three
+    integers per key no matter how many requests arrive.
+
+    Returns (decision, window_start, curr, prev) with the counters to store back.
+    """
+    current_start = int(now // window) * window
+    if current_start != window_start:
+        # Roll forward; anything older than one full window no longer overlaps
+        prev = curr if current_start - window_start == window else 0
+        curr = 0
+        window_start = current_start
+
+    elapsed = now - window_start
+    estimated = prev * (1 - elapsed / window) + curr
+    if estimated + 1 > limit:
+        retry_after = _retry_after(estimated, curr, prev, elapsed, window, limit)
+        return RateLimitDecision(False, limit, 0, retry_after), window_start, curr, prev
+
+    curr += 1
+    remaining = max(0, int(limit - (estimated + 1)))
+    return RateLimitDecision(True, limit, remaining, 0.0), window_start, curr, prev
+
+
+class MemoryRateLimitStore:
+    """
+    Per-process store. Keys are kept in least-recently-hit order so idle keys are evicted
+    from the front in O(1), and the total is capped at `max_keys`.
+    """
+
+    def __init__(self, max_keys: int = settings.RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._counters: "OrderedDict[str, list]" = OrderedDict()  # key -> [window_start, curr, prev]
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, window: int, limit: int, now: float) -> RateLimitDecision:
+        with self._lock:
+            window_start, curr, prev = self._counters.pop(key, (0, 0, 0))
+            decision, window_start, curr, prev = _sliding_window(window_start, curr, prev, now, window, limit)
+            self._counters[key] = [window_start, curr, prev]
+
+            # Anything not hit for two windows has no influence left on its limit
+            while self._counters:
+                oldest_key, (oldest_start, _, _) = next(iter(self._counters.items()))
+                if len(self._counters) <= self.max_keys and now - oldest_start < 2 * window:
+                    break
+                del self._counters[oldest_key]
+        return decision
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class SQLiteRateLimitStore:
+    """
+    Store shared by every worker process on the host through one local SQLite file.
+    Each hit is a single IMMEDIATE transaction, so concurrent workers serialize per hit.
+    """
+
+    EVICT_EVERY = 1000  # hits between sweeps of idle keys
+
+    def __init__(self, path: str = settings.RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                " key TEXT PRIMARY KEY, window_start INTEGER NOT NULL,"
+                " curr INTEGER NOT NULL, prev INTEGER NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _hit(self, key: str, window: int, limit: int, now: float) -> RateLimitDecision:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window_start, curr, prev FROM rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+            decision, window_start, curr, prev = _sliding_window(*(row or (0, 0, 0)), now, window, limit)
+            conn.execute(
+                "INSERT INTO rate_limits (key, window_start, curr, prev) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET window_start = excluded.window_start,"
+                " curr = excluded.curr, prev = excluded.prev",
+                (key, window_start, curr, prev),
+            )
+            self._hits += 1
+            if self._hits % self.EVICT_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE window_start < ?", (now - 2 * window,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    async def hit(self, key: str, window: int, limit: int, now: float) -> RateLimitDecision:
+        return await asyncio.to_thread(self._hit, key, window, limit, now)
+
+
+class RedisRateLimitStore:
+    """
+    Store for multi-host deployments; works against anything speaking the Redis protocol.
+    The window arithmetic runs server-side in one Lua call, so it is atomic across workers.
+    """
+
+    SCRIPT = """
+    local curr_key = KEYS[1] .. ':' .. ARGV[1]
+    local prev_key = KEYS[1] .. ':' .. (ARGV[1] - ARGV[2])
+    local curr = tonumber(redis.call('GET', curr_key) or '0')
+    local prev = tonumber(redis.call('GET', prev_key) or '0')
+    local estimated = prev * tonumber(ARGV[4]) + curr
+    if estimated + 1 > tonumber(ARGV[3]) then
+        return {0, curr, prev}
+    end
+    curr = redis.call('INCR', curr_key)
+    redis.call('EXPIRE', curr_key, 2 * tonumber(ARGV[2]))
+    return {1, curr, prev}
+    """
+
+    def __init__(self, url: str = settings.RATE_LIMIT_REDIS_URL):
+        import redis.asyncio as redis  # optional dependency, only needed for this backend
+
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def hit(self, key: str, window: int, limit: int, now: float) -> RateLimitDecision:
+        window_start = int(now // window) * window
+        elapsed = now - window_start
+        overlap = 1 - elapsed / window
+        allowed, curr, prev = await self._script(keys=[f"ratelimit:{key}"], args=[window_start, window, limit, overlap])
+        estimated = prev * overlap + curr
+        if allowed:
+            return RateLimitDecision(True, limit, max(0, int(limit - estimated)), 0.0)
+        return RateLimitDecision(False, limit, 0, _retry_after(estimated, curr, prev, elapsed, window, limit))
+
+
+def build_rate_limit_store():
+    """
+    Instantiate the store selected by RATE_LIMIT_BACKEND ("memory", "sqlite" or "redis").
+    """
+    backend = settings.RATE_LIMIT_BACKEND
+    if backend == "sqlite":
+        return SQLiteRateLimitStore()
+    if backend == "redis":
+        return RedisRateLimitStore()
+    return MemoryRateLimitStore()
+
+
 class RateLimiter:
     """
     Rate limiter service that enforces subscription-tier-based limits per user.
@@ -15,30 +203,117 @@ class RateLimiter:
         SubscriptionTier.BASIC: 50,
         SubscriptionTier.PREMIUM: 200,
     }
+    WINDOW_SECONDS = 60
 
-    def __init__(self):
-        # Store user request timestamps: {user_id: {endpoint: [timestamps]}}
-        self.requests: Dict[str, Dict[str, list]] = {}
+    def __init__(self, store=None):
+        self.store = store or build_rate_limit_store()
 
-    async def check_rate_limit(self, user: User, endpoint: str):
+    async def hit(self, subject: str, endpoint: str, tier: Optional[SubscriptionTier]) -> RateLimitDecision:
+        limit = self.TIER_LIMITS.get(tier, self.TIER_LIMITS[SubscriptionTier.FREE])
+        return await self.store.hit(f"{subject}:{endpoint}", self.WINDOW_SECONDS, limit, time.time())
+
+    async def check_rate_limit(self, subject: str, endpoint: str, tier: Optional[SubscriptionTier]):
         """
-        Raises HTTPException if user exceeds their rate limit.
+        Raises HTTPException if the subject exceeds its tier's rate limit.
         """
-        now = time.time()
-        limit = self.TIER_LIMITS.get(user.organization.subscription_tier, 10)
-        window = 60  # seconds
-
-        user_requests = self.requests.setdefault(str(user.id), {}).setdefault(endpoint, [])
-
-        # Remove timestamps older than window
-        user_requests = [t for t in user_requests if now - t < window]
-        self.requests[str(user.id)][endpoint] = user_requests
-
-        if len(user_requests) >= limit:
+        decision = await self.hit(subject, endpoint, tier)
+        if not decision.allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Max {limit} requests per minute."
+                detail=f"Rate limit exceeded. Max {decision.limit} requests per minute.",
+                headers={"Retry-After": str(math.ceil(decision.retry_after))},
             )
 
-        # Record current request
-        user_requests.append(now)
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying `RateLimiter` to every request before routing.
+
+    Authenticated callers are limited per user (tier taken from their organization);
+    anonymous callers are limited per client address at the FREE tier. Each route template
+    (e.g. `GET /leads/{lead_id}`) is one bucket, whatever ids the path carries.
+    """
+
+    EXEMPT_PATHS = {"/", "/docs", "/redoc", "/openapi.json", "/metrics"}
+    UNMATCHED = "<unmatched>"  # one bucket for every path no route serves
+
+    def __init__(
+        self,
+        app,
+        limiter: Optional[RateLimiter] = None,
+        tier_resolver: Optional[Callable[[Optional[str]], Awaitable[Optional[SubscriptionTier]]]] = None,
+    ):
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+        self.tier_resolver = tier_resolver or org_tiers.resolve
+
+    def _identify(self, scope):
+        """
+        Return (subject, organization_id) from the bearer token, or the client address.
+        """
+        for name, value in scope.get("headers", []):
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                try:
+                    payload = jwt.decode(value[7:].decode(), settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                except JWTError:
+                    break  # let the route's own auth reject it
+                user_id = str(payload.get("sub"))
+                org_id = payload.get("org")
+                if org_id is None:
+                    cached = principal_cache.get(user_id)
+                    org_id = cached.organization_id if cached else None
+                return f"user:{user_id}", org_id
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", None
+
+    def _endpoint(self, scope) -> str:
+        """
+        The route template the request will be routed to. Runs before routing, so the
+        router's routes are matched here (Starlette puts the application in the scope).
+        """
+        router = getattr(scope.get("app"), "router", None)
+        template = self.UNMATCHED
+        for route in getattr(router, "routes", ()):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+            if match == Match.PARTIAL and template == self.UNMATCHED:
+                template = route.path  # the path matches but not the method: answered with 405
+        return f"{scope['method']} {template}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        subject, org_id = self._identify(scope)
+        tier = await self.tier_resolver(org_id)
+        decision = await self.limiter.hit(subject, self._endpoint(scope), tier)
+
+        if not decision.allowed:
+            body = json.dumps({"detail": f"Rate limit exceeded. Max {decision.limit} requests per minute."}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": status.HTTP_429_TOO_MANY_REQUESTS,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(math.ceil(decision.retry_after)).encode()),
+                    (b"x-ratelimit-limit", str(decision.limit).encode()),
+                    (b"x-ratelimit-remaining", b"0"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-ratelimit-limit", str(decision.limit).encode()),
+                    (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -4,4 +4,12 @@ from .employee import Employee
 from .customer import Customer
 from .lead import Lead
 from .complaint import Complaint
+from .email_outbox import EmailOutbox
+from .org_aggregate import OrgAggregate
+from .lead_scoring_run import LeadScoringRun
+from .knowledge_article import KnowledgeArticle
+from .search_index import FTS_TABLES
+from .lead_dedupe import LeadSignature, LeadLshBucket, LeadMergeSuggestion
+from .tenant_shard import TenantShard
+from .change_log import ChangeLogEntry, ChangeConsumer
 from .database import Base, engine
\ No newline at end of file
@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import orjson
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, event, inspect
+from sqlalchemy.orm import Session
+from .database import Base
+from .lead import Lead
+from .complaint import Complaint
+from .user import User
+from .knowledge_article import KnowledgeArticle
+
+class ChangeLogEntry(Base):
+    """
+    Change-data-capture log: one entry per lead, complaint, user or knowledge article
+    inserted, updated or deleted, appended in the transaction that made the change, so an entry exists exactly
+    when its change committed. `seq` only grows (AUTOINCREMENT never reuses a value, even
+    once old entries are pruned), and SQLite commits one writer at a time, so a consumer
+    that has read up to seq N has seen every earlier change. Read through
+    app/services/change_log.py.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Consumers read one organization's entries after an offset
+        Index("ix_change_log_org_seq", "organization_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True)
+    organization_id = Column(Integer, nullable=True)  # NULL for users outside any organization
+    entity = Column(String, nullable=False)   # lead, complaint, user, article
+    row_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)       # insert, update, delete
+    changes = Column(Text, nullable=True)     # JSON: inserted column values, or updated columns' new values
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class ChangeConsumer(Base):
+    """
+    A named consumer's offset in one organization's change log: the seq of the last entry it
+    has processed. Kept in the same database as the log it points into.
+    """
+    __tablename__ = "change_consumers"
+
+    name = Column(String, primary_key=True)
+    organization_id = Column(Integer, primary_key=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+ENTITY_NAMES = {Lead: "lead", Complaint: "complaint", User: "user", KnowledgeArticle: "article"}
+
+# Left out of the diffs: secrets, and columns derived from others that are logged
+EXCLUDED_COLUMNS = {
+    Lead: frozenset({"email_normalized", "phone_normalized"}),
+    Complaint: frozenset(),
+    User: frozenset({"hashed_password"}),
+    KnowledgeArticle: frozenset(),
+}
+
+
+def organization_of(value) -> Optional[int]:
+    # users.organization_id is a string column
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def change_entry(model, op: str, row_id: int, organization_id, changes: Optional[Dict] = None) -> Dict:
+    """
+    A change_log row, for writes that bypass the session hook below (Core inserts and
+    executemany UPDATEs) and log themselves through log_changes().
+    """
+    return {
+        "organization_id": organization_of(organization_id),
+        "entity": ENTITY_NAMES[model],
+        "row_id": row_id,
+        "op": op,
+        "changes": orjson.dumps(changes).decode() if changes else None,
+    }
+
+
+def inserted_values(model, values: Dict) -> Dict:
+    """
+    The diff of an inserted row: its non-NULL values. Columns missing from `values` (a Core
+    INSERT's parameters) get their scalar defaults; callable defaults can't be known here, so
+    such writers pass those columns explicitly.
+    """
+    excluded = EXCLUDED_COLUMNS[model]
+    row = {}
+    for column in model.__table__.columns:
+        if column.name in values:
+            value = values[column.name]
+        else:
+            value = column.default.arg if column.default is not None and column.default.is_scalar else None
+        if column.name == "organization_id":
+            value = organization_of(value)  # the request's organization id may come as a string
+        if value is not None and column.name not in excluded:
+            row[column.name] = value
+    return row
+
+
+def log_changes(connection, entries: Iterable[Dict]):
+    entries = list(entries)
+    if entries:
+        connection.execute(ChangeLogEntry.__table__.insert(), entries)
+
+
+def _column_values(model, state) -> Dict:
+    excluded = EXCLUDED_COLUMNS[model]
+    return {
+        column.key: state.dict[column.key]
+        for column in model.__mapper__.column_attrs
+        if state.dict.get(column.key) is not None and column.key not in excluded
+    }
+
+
+def _changed_values(model, state) -> Dict:
+    excluded = EXCLUDED_COLUMNS[model]
+    return {
+        column.key: state.dict.get(column.key)
+        for column in model.__mapper__.column_attrs
+        if column.key not in excluded and state.attrs[column.key].history.has_changes()
+    }
+
+
+def _row_id(state) -> int:
+    # New objects only get their identity key once the flush is finalized
+    return state.identity[0] if state.key is not None else state.dict["id"]
+
+
+@event.listens_for(Session, "after_flush")
+def _log_changes(session, flush_context):
+    # Runs on the flush's connection, so the entries commit or roll back with the rows
+    entries: List[Dict] = []
+    for obj in session.new:
+        model = type(obj)
+        if model in ENTITY_NAMES:
+            state = inspect(obj)
+            entries.append(change_entry(model, "insert", _row_id(state), state.dict.get("organization_id"), _column_values(model, state)))
+    for obj in session.dirty:
+        model = type(obj)
+        if model not in ENTITY_NAMES or not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        previous_org = state.attrs.organization_id.history.deleted
+        if previous_org and organization_of(previous_org[0]) != organization_of(state.dict.get("organization_id")):
+            # Moved to another organization: gone for the old one, new to the other
+            entries.append(change_entry(model, "delete", _row_id(state), previous_org[0]))
+            entries.append(change_entry(model, "insert", _row_id(state), state.dict.get("organization_id"), _column_values(model, state)))
+            continue
+        changes = _changed_values(model, state)
+        if changes:  # e.g. nothing but a password rehash
+            entries.append(change_entry(model, "update", _row_id(state), state.dict.get("organization_id"), changes))
+    for obj in session.deleted:
+        model = type(obj)
+        if model in ENTITY_NAMES:
+            state = inspect(obj)
+            entries.append(change_entry(model, "delete", _row_id(state), state.dict.get("organization_id")))
+    entries.sort(key=lambda entry: (entry["entity"], entry["row_id"]))
+    log_changes(session.connection(), entries)
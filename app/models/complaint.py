@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .database import Base
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    __table_args__ = (
+        # Every tenant query filters on organization_id first; these back the list
+        # endpoint's keyset ordering and its status / priority / assignee filters.
+        Index("ix_complaints_org_created_id", "organization_id", "created_at", "id"),
+        Index("ix_complaints_org_status_created", "organization_id", "status", "created_at"),
+        Index("ix_complaints_org_priority_created", "organization_id", "priority", "created_at"),
+        Index("ix_complaints_org_assigned_created", "organization_id", "assigned_to_id", "created_at"),
+        # Finding a tenant's unclassified complaints for batch classification
+        Index("ix_complaints_org_classification", "organization_id", "classification"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -12,6 +22,7 @@ class Complaint(Base):
     status = Column(String, default="open")  # e.g., open, in_progress, closed
     priority = Column(String, default="medium")  # e.g., low, medium, high
     type = Column(String, nullable=True)  # e.g., billing, technical, general
+    classification = Column(String, nullable=True)  # set by the complaint classifier; NULL until classified
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # who created the complaint
     assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # optional employee assignment
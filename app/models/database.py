@@ -1,15 +1,91 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL  # change to PostgreSQL later if needed
+ASYNC_SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)  # same file, driven by aiosqlite
+
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """
+    The storage profile every SQLite connection is opened with. WAL lets readers run while
+    a write is in flight; synchronous=NORMAL is durable across application crashes under
+    WAL (only a power loss can drop the last commits). The journal mode is persistent and
+    only set by writers; read connections are additionally made query-only.
+    """
+    pragmas = [
+        f"busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"cache_size={-settings.SQLITE_CACHE_SIZE_KIB}",  # negative: KiB rather than pages
+        f"mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"temp_store={settings.SQLITE_TEMP_STORE}",
+    ]
+    if read_only:
+        pragmas.append("query_only=ON")
+    elif settings.SQLITE_WAL:
+        pragmas.insert(0, "journal_mode=WAL")
+    return pragmas
+
+
+def apply_storage_profile(engine, read_only: bool = False):
+    """
+    Run sqlite_pragmas() on every new connection of `engine` (sync, or the sync_engine of an
+    async one). No-op for other databases.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./smart_crm.db"  # change to PostgreSQL later if needed
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}  # for SQLite
 )
+apply_storage_profile(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engines used by the API routers. The sync engine above stays for scripts
+# (seed_users.py, migrations) and anything that runs outside the event loop.
+# SQLite takes one writer at a time, so the write pool is small and requests that only
+# read (GET endpoints, authentication) get a larger pool of their own; under WAL those
+# readers are never blocked by a write in flight. (aiosqlite would otherwise default to
+# NullPool and open a new connection, with its pragmas, for every session.)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_WRITE_POOL_SIZE,
+    max_overflow=settings.DB_WRITE_POOL_MAX_OVERFLOW,
+)
+apply_storage_profile(async_engine.sync_engine)
+
+async_read_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_POOL_MAX_OVERFLOW,
+)
+apply_storage_profile(async_read_engine.sync_engine, read_only=True)
+
+# expire_on_commit=False: attributes must stay readable after commit, because an
+# expired attribute would trigger implicit (blocking) IO on access.
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+AsyncReadSessionLocal = sessionmaker(
+    bind=async_read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 # Dependency for FastAPI
@@ -19,3 +95,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Async dependency for FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Async dependency for endpoints that only read; any write on it fails (query_only)
+async def get_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from .database import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # The sender polls for due messages in this order
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=True)  # cleared once sent or given up on: it may hold a temporary password
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # also the lease expiry while sending
+    claim_token = Column(String, nullable=True)  # which sender currently owns the row
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
+from datetime import datetime
+from .database import Base
+
+class KnowledgeArticle(Base):
+    __tablename__ = "knowledge_articles"
+    __table_args__ = (
+        Index("ix_knowledge_articles_org_id", "organization_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    title = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,16 +1,31 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from app.core.normalize import normalize_email, normalize_phone
 from .database import Base
 
 class Lead(Base):
     __tablename__ = "leads"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Every tenant query filters on organization_id first; these back the list
+        # endpoint's keyset ordering and its status / assignee filters.
+        Index("ix_leads_org_created_id", "organization_id", "created_at", "id"),
+        Index("ix_leads_org_status_created", "organization_id", "status", "created_at"),
+        Index("ix_leads_org_assigned_created", "organization_id", "assigned_to_id", "created_at"),
+        # Incremental lead scoring walks leads changed since its last run
+        Index("ix_leads_org_updated_id", "organization_id", "updated_at", "id"),
+        # Dedupe lookups during imports
+        Index("ix_leads_org_email_normalized", "organization_id", "email_normalized"),
+        Index("ix_leads_org_phone_normalized", "organization_id", "phone_normalized"),
+        {"extend_existing": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
+    email_normalized = Column(String, nullable=True)  # see app/core/normalize.py
+    phone_normalized = Column(String, nullable=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
     assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # optional employee assignment
     status = Column(String, default="new")  # e.g., new, contacted, converted, closed
@@ -22,4 +37,16 @@ class Lead(Base):
     # Relationships
     organization = relationship("Organization", back_populates="leads")
     assigned_to = relationship("User", back_populates="leads_assigned")
-   
+
+    @property
+    def score(self) -> int:
+        # What LeadOut exposes as `score`
+        return self.lead_score or 0
+
+
+@event.listens_for(Lead, "before_insert")
+@event.listens_for(Lead, "before_update")
+def _normalize_contact_fields(mapper, connection, target):
+    # Core bulk inserts (lead imports) bypass this and set the columns themselves
+    target.email_normalized = normalize_email(target.email)
+    target.phone_normalized = normalize_phone(target.phone)
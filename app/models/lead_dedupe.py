@@ -0,0 +1,53 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Float, LargeBinary, ForeignKey, DateTime, Index, Text, UniqueConstraint
+from datetime import datetime
+from .database import Base
+
+class LeadSignature(Base):
+    """
+    MinHash signature of a lead's normalized name / email / phone; see app/services/lead_dedupe.py.
+    """
+    __tablename__ = "lead_signatures"
+    __table_args__ = (
+        # The next incremental run starts from the newest lead signed
+        Index("ix_lead_signatures_org_updated", "organization_id", "lead_updated_at"),
+    )
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    signature = Column(LargeBinary, nullable=False)  # DEDUPE_NUM_PERM little-endian uint32 values
+    lead_updated_at = Column(DateTime, nullable=True)  # leads.updated_at the signature was computed from
+
+
+class LeadLshBucket(Base):
+    """
+    One LSH band of a lead's signature. Leads sharing a bucket are duplicate candidates.
+    """
+    __tablename__ = "lead_lsh_buckets"
+    __table_args__ = (
+        # Dropping a lead's buckets when it is re-signed
+        Index("ix_lead_lsh_buckets_lead_id", "lead_id"),
+    )
+
+    organization_id = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)  # hash of the band's values, band number folded in
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+
+
+class LeadMergeSuggestion(Base):
+    __tablename__ = "lead_merge_suggestions"
+    __table_args__ = (
+        UniqueConstraint("organization_id", "lead_id", "duplicate_id", name="uq_lead_merge_suggestions_pair"),
+        Index("ix_lead_merge_suggestions_org_status_similarity", "organization_id", "status", "similarity"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)  # the older lead, kept on merge
+    duplicate_id = Column(Integer, ForeignKey("leads.id", ondelete="SET NULL"), nullable=True)  # deleted on merge
+    # Estimated Jaccard similarity of the two signatures, times DEDUPE_NAME_ONLY_WEIGHT when
+    # the leads share no email or phone
+    similarity = Column(Float, nullable=False)
+    status = Column(String, nullable=False, default="open")  # open, merged, dismissed
+    created_at = Column(DateTime, default=datetime.utcnow)
+    resolved_at = Column(DateTime, nullable=True)
+    duplicate_snapshot = Column(Text, nullable=True)  # JSON: the merged duplicate's id, name, email, phone, status
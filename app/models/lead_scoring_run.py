@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
+from datetime import datetime
+from .database import Base
+
+class LeadScoringRun(Base):
+    __tablename__ = "lead_scoring_runs"
+    __table_args__ = (
+        # The next run looks up the latest finished run of its organization
+        Index("ix_lead_scoring_runs_org_finished", "organization_id", "finished_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
+    full = Column(Boolean, nullable=False, default=False)  # rescored every lead, not just changed ones
+    high_water_mark = Column(DateTime, nullable=True)  # newest leads.updated_at scored; the next run starts after it
+    scored = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,126 @@
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import Column, Integer, String, event, inspect
+from sqlalchemy.orm import Session
+from .database import Base
+from .lead import Lead
+from .complaint import Complaint
+
+class OrgAggregate(Base):
+    """
+    One running count per (organization, entity, dimension, value), e.g.
+    (7, "lead", "status", "new") -> 412. The "total" dimension has value "".
+    Kept in step with leads/complaints inside the writing transaction; see
+    app/services/analytical_service.py for reads and the rebuild job.
+    """
+    __tablename__ = "org_aggregates"
+
+    organization_id = Column(Integer, primary_key=True)
+    entity = Column(String, primary_key=True)      # lead, complaint
+    dimension = Column(String, primary_key=True)   # total, status, category, priority, classification
+    value = Column(String, primary_key=True)       # "" when the row's value is NULL
+    count = Column(Integer, nullable=False, default=0)
+
+
+# Counted columns per model
+TRACKED_DIMENSIONS = {
+    Lead: ("status", "category"),
+    Complaint: ("status", "priority", "classification"),
+}
+ENTITY_NAMES = {Lead: "lead", Complaint: "complaint"}
+
+AggregateKey = Tuple[int, str, str, str]
+
+
+def aggregate_keys(model, values: Dict) -> Iterable[AggregateKey]:
+    """
+    Keys a row with these column values is counted under.
+    """
+    org_id, entity = values["organization_id"], ENTITY_NAMES[model]
+    yield org_id, entity, "total", ""
+    for dimension in TRACKED_DIMENSIONS[model]:
+        value = values.get(dimension)
+        yield org_id, entity, dimension, "" if value is None else str(value)
+
+
+def _column_default(model, name):
+    default = model.__table__.c[name].default
+    return default.arg if default is not None and default.is_scalar else None
+
+
+def insert_deltas(model, rows: Iterable[Dict]) -> Counter:
+    """
+    Deltas for rows written with a Core INSERT, which bypasses the session hook below.
+    """
+    deltas = Counter()
+    names = ("organization_id",) + TRACKED_DIMENSIONS[model]
+    for row in rows:
+        values = {name: row[name] if name in row else _column_default(model, name) for name in names}
+        deltas.update(aggregate_keys(model, values))
+    return deltas
+
+
+def apply_deltas(connection, deltas: Counter):
+    """
+    Add `deltas` to the stored counts with one upsert per distinct key.
+    """
+    params = [
+        {"organization_id": org_id, "entity": entity, "dimension": dimension, "value": value, "count": delta}
+        for (org_id, entity, dimension, value), delta in deltas.items()
+        if delta
+    ]
+    if not params:
+        return
+    table = OrgAggregate.__table__
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.organization_id, table.c.entity, table.c.dimension, table.c.value],
+        set_={"count": table.c.count + statement.excluded["count"]},
+    )
+    connection.execute(statement, params)
+
+
+def _current_values(model, state) -> Dict:
+    return {name: state.dict.get(name) for name in ("organization_id",) + TRACKED_DIMENSIONS[model]}
+
+
+def _previous_values(model, state) -> Dict:
+    values = {}
+    for name in ("organization_id",) + TRACKED_DIMENSIONS[model]:
+        history = state.attrs[name].history
+        values[name] = history.deleted[0] if history.deleted else state.dict.get(name)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _track_aggregates(session, flush_context):
+    # Runs on the flush's connection, so the counts commit or roll back with the rows
+    deltas = Counter()
+    for obj in session.new:
+        if type(obj) in TRACKED_DIMENSIONS:
+            deltas.update(aggregate_keys(type(obj), _current_values(type(obj), inspect(obj))))
+    for obj in session.deleted:
+        if type(obj) in TRACKED_DIMENSIONS:
+            deltas.subtract(aggregate_keys(type(obj), _previous_values(type(obj), inspect(obj))))
+    for obj in session.dirty:
+        if type(obj) in TRACKED_DIMENSIONS and session.is_modified(obj, include_collections=False):
+            state = inspect(obj)
+            deltas.subtract(aggregate_keys(type(obj), _previous_values(type(obj), state)))
+            deltas.update(aggregate_keys(type(obj), _current_values(type(obj), state)))
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# Load the old value on assignment so an update always knows which count to decrement
+for _model, _dimensions in TRACKED_DIMENSIONS.items():
+    for _name in ("organization_id",) + _dimensions:
+        event.listen(getattr(_model, _name), "set", _keep_previous_value, active_history=True, retval=True)
@@ -1,17 +1,24 @@
 # app/models/organization.py
-from sqlalchemy import Column, Integer, String
+from enum import Enum as PyEnum
+from sqlalchemy import Column, Enum, Integer, String
 from sqlalchemy.orm import relationship
 from .database import Base
 
+class SubscriptionTier(str, PyEnum):
+    FREE = "FREE"
+    BASIC = "BASIC"
+    PREMIUM = "PREMIUM"
+
 class Organization(Base):
     __tablename__ = "organizations"
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
+    subscription_tier = Column(Enum(SubscriptionTier), default=SubscriptionTier.FREE, nullable=False, server_default="FREE")
 
     # Must match Lead.organization's back_populates
     users = relationship("User", back_populates="organization", cascade="all, delete")
     employees = relationship("Employee", back_populates="organization", cascade="all, delete")  # optional duplicate if employees are Users
     customers = relationship("Customer", back_populates="organization", cascade="all, delete")
     leads = relationship("Lead", back_populates="organization", cascade="all, delete")
-    complaints = relationship("Complaint", back_populates="organization", cascade="all, delete")
\ No newline at end of file
+    complaints = relationship("Complaint", back_populates="organization", cascade="all, delete")
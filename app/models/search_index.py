@@ -0,0 +1,47 @@
+from typing import List
+
+from sqlalchemy import DDL, event
+from .lead import Lead
+from .complaint import Complaint
+
+# SQLite FTS5 indexes over leads and complaints: table -> (FTS table, indexed columns).
+# They are external-content tables (the text lives only in the base table) kept in step by
+# triggers, so ORM writes, Core bulk inserts and raw SQL are all covered. organization_id is
+# indexed as a column of its own so the tenant filter is part of the MATCH; see
+# app/services/search_service.py.
+FTS_TABLES = {
+    "leads": ("leads_fts", ("name", "email", "phone", "phone_normalized", "organization_id")),
+    "complaints": ("complaints_fts", ("title", "description", "organization_id")),
+}
+
+
+def fts_ddl(table: str) -> List[str]:
+    """
+    CREATE statements for `table`'s FTS5 index and its sync triggers.
+    """
+    fts, columns = FTS_TABLES[table]
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{name}" for name in columns)
+    old = ", ".join(f"old.{name}" for name in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        # prefix='2 3' keeps short prefix queries ("jo*", "acm*") off a full term scan
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        # Only when indexed text changes: status/score bulk updates don't touch the index
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+# Databases built with create_all (dev, tests) get the indexes too; migrations create them otherwise
+for _model in (Lead, Complaint):
+    for _statement in fts_ddl(_model.__tablename__):
+        event.listen(_model.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        _model.__table__,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {FTS_TABLES[_model.__tablename__][0]}").execute_if(dialect="sqlite"),
+    )
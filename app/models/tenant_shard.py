@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from datetime import datetime
+from .database import Base
+
+class TenantShard(Base):
+    """
+    Shard directory: which database holds an organization's leads and complaints. It lives
+    in the main database; organizations without a row stay in the main database too. See
+    app/db.py for routing and app/services/tenant_migration.py for moving a tenant.
+    """
+    __tablename__ = "tenant_shards"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    shard = Column(String, nullable=False)  # ./<shard>.db, or "default" for the main database
+    frozen = Column(Boolean, nullable=False, default=False)  # writes refused during a move's cutover
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -22,6 +22,7 @@ class User(Base):
     first_name = Column(String, nullable=True)   
     last_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)  # 1 for active, 0 for inactive
+    token_epoch = Column(Integer, default=0, nullable=False, server_default="0")  # bump to revoke issued tokens
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
 
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+class ChangeLogEntryOut(BaseModel):
+    seq: int
+    entity: str         # lead, complaint, user, article
+    row_id: int
+    op: str             # insert, update, delete
+    changes: Optional[Dict[str, Any]] = None  # inserted values, or updated columns' new values
+    created_at: datetime
+
+class ChangeLogPage(BaseModel):
+    items: List[ChangeLogEntryOut]
+    next_offset: int    # pass as `after` (or commit as the consumer's offset) once the items are processed
+    has_more: bool
+
+class ChangeConsumerCommit(BaseModel):
+    offset: int = Field(..., ge=0)
+
+class ChangeConsumerOut(BaseModel):
+    name: str
+    offset: int
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+class ChatbotQuery(BaseModel):
+    message: str = Field(..., min_length=1, max_length=2000)
+    top_k: Optional[int] = Field(None, ge=1, le=50)
+
+class RetrievalHit(BaseModel):
+    kind: str  # lead, complaint, article
+    id: int
+    chunk: int  # article chunk number; 0 for leads and complaints
+    score: float  # cosine similarity to the query
+    title: str
+    snippet: str
+
+class ChatbotResponse(BaseModel):
+    response: str
+    sources: List[RetrievalHit]
+
+class KnowledgeArticleCreate(BaseModel):
+    title: str = Field(..., min_length=1)
+    body: str
+
+class KnowledgeArticleOut(KnowledgeArticleCreate):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class ReindexResult(BaseModel):
+    added: int
+    removed: int
+    vectors: int
+    deleted: int
+    lists: int  # inverted lists; 0 until the org has VECTOR_INDEX_TRAIN_MIN vectors
+    unindexed_tail: int
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Dict, List, Optional
 
 class ComplaintBase(BaseModel):
     lead_id: int
@@ -13,8 +14,9 @@ class ComplaintUpdate(BaseModel):
     status: str
 
 class ComplaintOut(ComplaintBase):
+    lead_id: Optional[int] = None  # complaints aren't linked to a lead in the table yet
     id: int
-    classification: str
+    classification: Optional[str] = None
     priority: str
     status: str
     created_at: datetime
@@ -22,3 +24,15 @@ class ComplaintOut(ComplaintBase):
 
     class Config:
         orm_mode = True
+
+class ComplaintPage(BaseModel):
+    items: List[ComplaintOut]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
+
+class ComplaintSearchPage(BaseModel):
+    items: List[ComplaintOut]
+    next_offset: Optional[int] = None  # pass back as ?offset= for the next page; None on the last one
+
+class ComplaintClassifyBatchResult(BaseModel):
+    classified: int
+    by_classification: Dict[str, int]
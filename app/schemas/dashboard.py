@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Dict
+
+class LeadStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_category: Dict[str, int]
+
+class ComplaintStats(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_classification: Dict[str, int]
+
+class DashboardStats(BaseModel):
+    total_leads: int
+    leads: LeadStats
+    complaints: ComplaintStats
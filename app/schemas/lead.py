@@ -2,7 +2,8 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 class LeadBase(BaseModel):
     name: str
@@ -28,3 +29,87 @@ class LeadOut(LeadBase):
 class LeadResponse(LeadOut):
     organization_name: str | None = None  # Example extra field
     lead_source: str | None = None        # Example extra field
+
+class LeadPage(BaseModel):
+    items: List[LeadResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
+
+class LeadSearchPage(BaseModel):
+    items: List[LeadResponse]
+    next_offset: Optional[int] = None  # pass back as ?offset= for the next page; None on the last one
+
+class LeadImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+class LeadImportReport(BaseModel):
+    rows: int
+    inserted: int
+    duplicates: int
+    failed: int
+    errors: List[LeadImportError]
+    errors_truncated: bool = False  # more rows were rejected than are listed
+
+class LeadScoringResult(BaseModel):
+    scored: int
+    full: bool  # every lead was rescored, not only those changed since the last run
+    high_water_mark: Optional[datetime] = None
+    by_category: Dict[str, int]
+
+class LeadDedupeResult(BaseModel):
+    processed: int  # leads (re)signed in this run
+    compared: int   # candidate pairs whose signatures were compared
+    suggested: int  # new merge suggestions
+    full: bool
+
+class LeadSummary(BaseModel):
+    id: int
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    status: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+class LeadMergeSuggestionOut(BaseModel):
+    id: int
+    similarity: float
+    status: str
+    created_at: datetime
+    lead: LeadSummary       # kept on merge
+    duplicate: LeadSummary  # deleted on merge; merged suggestions show it as it was
+
+class LeadMergeSuggestionPage(BaseModel):
+    items: List[LeadMergeSuggestionOut]
+    next_offset: Optional[int] = None
+
+class LeadMergeSuggestionResolved(BaseModel):
+    id: int
+    status: str
+    resolved_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class LeadGenerationLookup(BaseModel):
+    query: str = Field(..., min_length=1, max_length=200)
+    location: str = Field(..., min_length=1, max_length=200)
+
+class LeadGenerationRequest(BaseModel):
+    lookups: List[LeadGenerationLookup] = Field(..., min_items=1)
+
+class GeneratedLead(BaseModel):
+    name: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+
+class LeadGenerationResult(BaseModel):
+    query: str
+    location: str
+    leads: List[GeneratedLead]
+    cached: bool            # served without a new SerpAPI request
+    error: Optional[str] = None
+
+class LeadGenerationResponse(BaseModel):
+    results: List[LeadGenerationResult]  # in request order
@@ -1,6 +1,10 @@
-import random
+from datetime import datetime
+from types import SimpleNamespace
 from typing import Dict
 
+from app.services.complaint_classifier import classify_texts
+from app.services.lead_scoring import build_features, score_features
+
 class AIService:
     """
     AI Service placeholder for scoring leads and classifying complaints.
@@ -9,26 +13,20 @@ class AIService:
 
     async def score_lead(self, lead_data: Dict) -> float:
         """
-        Returns a lead score between 0-100.
-        You can replace this with an actual ML model prediction.
+        Returns a lead score between 0-100 from the lead scoring model
+        (see app/services/lead_scoring.py).
         """
-        # Example: simple heuristic or random score
-        name_length = len(lead_data.get("name", ""))
-        score = min(100, max(0, name_length * 5 + random.randint(0, 20)))
-        return float(score)
+        now = datetime.utcnow()
+        lead = SimpleNamespace(**{
+            "email": None, "phone": None, "status": None, "assigned_to_id": None,
+            "created_at": now, "updated_at": None, **lead_data,
+        })
+        scores, _ = score_features(build_features([lead], now))
+        return float(scores[0])
 
     async def classify_complaint(self, complaint_text: str) -> str:
         """
-        Returns a complaint classification.
-        You can integrate a text classification model here.
+        Returns a complaint classification from the local classifier
+        (see app/services/complaint_classifier.py).
         """
-        # Example: simple keyword-based classification
-        complaint_text_lower = complaint_text.lower()
-        if "billing" in complaint_text_lower:
-            return "billing_issue"
-        elif "service" in complaint_text_lower:
-            return "service_issue"
-        elif "technical" in complaint_text_lower:
-            return "technical_issue"
-        else:
-            return "unclassified"
+        return classify_texts([complaint_text])[0]
@@ -1,6 +1,110 @@
-async def generate_dashboard_stats(db: Session, current_user: User):
+from collections import Counter, defaultdict
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.principal_cache import Principal
+from app.db import DEFAULT_SHARD, shard_engines
+from app.models.org_aggregate import ENTITY_NAMES, TRACKED_DIMENSIONS, OrgAggregate, apply_deltas
+from app.models.tenant_shard import TenantShard
+
+
+def _empty_stats() -> Dict:
+    return {
+        entity: {"total": 0, **{f"by_{dimension}": {} for dimension in TRACKED_DIMENSIONS[model]}}
+        for model, entity in ENTITY_NAMES.items()
+    }
+
+
+# Organization ids per IN (...) filter, kept under SQLite's default bound-parameter limit
+_IN_BATCH = 500
+
+
+def _counts_query():
+    return select(
+        OrgAggregate.entity, OrgAggregate.dimension, OrgAggregate.value, func.sum(OrgAggregate.count)
+    ).group_by(OrgAggregate.entity, OrgAggregate.dimension, OrgAggregate.value)
+
+
+async def _all_organization_counts(db: AsyncSession) -> Counter:
+    """
+    (entity, dimension, value) -> count over every organization. `db` is on the main
+    database; tenants the shard directory places on a shard are counted there, and only there,
+    so rows a move hasn't cleaned up from its source yet aren't counted twice.
+    """
+    sharded = select(TenantShard.organization_id).where(TenantShard.shard != DEFAULT_SHARD)
+    counts = Counter()
+    for entity, dimension, value, count in await db.execute(
+        _counts_query().where(OrgAggregate.organization_id.notin_(sharded))
+    ):
+        counts[(entity, dimension, value)] += count or 0
+
+    placement = defaultdict(list)
+    for organization_id, shard in await db.execute(select(TenantShard.organization_id, TenantShard.shard).where(
+        TenantShard.shard != DEFAULT_SHARD
+    )):
+        placement[shard].append(organization_id)
+    for shard, organization_ids in sorted(placement.items()):
+        async with shard_engines.get_sessionmaker(shard)() as shard_db:
+            for start in range(0, len(organization_ids), _IN_BATCH):
+                batch = organization_ids[start:start + _IN_BATCH]
+                for entity, dimension, value, count in await shard_db.execute(
+                    _counts_query().where(OrgAggregate.organization_id.in_(batch))
+                ):
+                    counts[(entity, dimension, value)] += count or 0
+    return counts
+
+
+async def generate_dashboard_stats(db: AsyncSession, current_user: Principal):
+    """
+    Dashboard counts read from `org_aggregates` instead of counting leads and complaints,
+    so the cost doesn't depend on how many rows an organization has.
+
+    `db` is on the caller's tenant database; for a system admin it is the main database,
+    and the counts add up every organization, those on shards included.
+    """
     if current_user.role == "system_admin":
-        total_leads = db.query(Lead).count()
+        counts = await _all_organization_counts(db)
     else:
-        total_leads = db.query(Lead).filter(Lead.organization_id == current_user.organization_id).count()
-    return {"total_leads": total_leads}
+        counts = Counter()
+        for entity, dimension, value, count in await db.execute(
+            _counts_query().where(OrgAggregate.organization_id == current_user.tenant_id)
+        ):
+            counts[(entity, dimension, value)] += count or 0
+
+    stats = _empty_stats()
+    for (entity, dimension, value), count in counts.items():
+        if not count:
+            continue
+        if dimension == "total":
+            stats[entity]["total"] = count
+        else:
+            stats[entity][f"by_{dimension}"][value or "unset"] = count
+    return {"total_leads": stats["lead"]["total"], "leads": stats["lead"], "complaints": stats["complaint"]}
+
+
+def rebuild_org_aggregates(connection, organization_id: Optional[int] = None) -> int:
+    """
+    Repair job: recount `org_aggregates` from the lead and complaint tables, for one
+    organization or all of them. Run it inside a transaction (e.g. `engine.begin()`).
+    Returns how many aggregate rows were written.
+    """
+    clear = delete(OrgAggregate)
+    if organization_id is not None:
+        clear = clear.where(OrgAggregate.organization_id == organization_id)
+    connection.execute(clear)
+
+    counts = Counter()
+    for model, entity in ENTITY_NAMES.items():
+        for dimension in ("total",) + TRACKED_DIMENSIONS[model]:
+            column = getattr(model, dimension) if dimension != "total" else None
+            columns = [model.organization_id] + ([column] if column is not None else [])
+            query = select(*columns, func.count()).group_by(*columns)
+            if organization_id is not None:
+                query = query.where(model.organization_id == organization_id)
+            for row in connection.execute(query):
+                value = "" if column is None or row[1] is None else str(row[1])
+                counts[(row[0], entity, dimension, value)] = row[-1]
+    apply_deltas(connection, counts)
+    return len(counts)
@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import DEFAULT_SHARD, shard_directory, tenant_sessionmaker
+from app.models.change_log import ChangeConsumer, ChangeLogEntry
+from app.models.database import AsyncReadSessionLocal, AsyncSessionLocal
+
+# Entries are always read in seq order from the organization's own database (see app/db.py).
+# Lead, complaint and article changes are logged where the tenant lives; user changes are
+# logged in the main database, where users live. For a tenant on a shard of its own,
+# relay_user_changes() copies those into the shard's log before it is read, so the shard's
+# log holds all of the tenant's changes: each source's entries keep their relative order,
+# and a user change is numbered when it is relayed rather than when it was made.
+
+# Consumer name of the relay's offset into the main database's log, kept in both databases:
+# the shard's row decides what has been copied, the main database's holds back pruning.
+RELAY_CONSUMER = "main_relay"
+
+
+async def read_changes(db: AsyncSession, organization_id, after: int, limit: int) -> Tuple[List[Dict], int, bool]:
+    """
+    Up to `limit` of the organization's change-log entries with seq > `after`, oldest first.
+    Returns (entries, the offset to continue from, whether more entries are waiting).
+    """
+    rows = (await db.execute(
+        select(
+            ChangeLogEntry.seq, ChangeLogEntry.entity, ChangeLogEntry.row_id, ChangeLogEntry.op,
+            ChangeLogEntry.changes, ChangeLogEntry.created_at,
+        )
+        .where(ChangeLogEntry.organization_id == organization_id, ChangeLogEntry.seq > after)
+        .order_by(ChangeLogEntry.seq)
+        .limit(limit + 1)
+    )).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [
+        {"seq": row.seq, "entity": row.entity, "row_id": row.row_id, "op": row.op,
+         "changes": orjson.loads(row.changes) if row.changes else None, "created_at": row.created_at}
+        for row in rows
+    ]
+    return items, rows[-1].seq if rows else after, has_more
+
+
+async def consumer_offset(db: AsyncSession, organization_id, name: str) -> int:
+    """
+    The seq the consumer last committed for the organization; 0 for a new consumer.
+    """
+    offset = (await db.execute(
+        select(ChangeConsumer.last_seq).where(ChangeConsumer.name == name, ChangeConsumer.organization_id == organization_id)
+    )).scalar()
+    return offset or 0
+
+
+async def commit_offset(db: AsyncSession, organization_id, name: str, offset: int) -> int:
+    """
+    Save the consumer's offset after it processed every entry up to `offset`. Moving it back
+    replays entries still in the log; moving it past the newest entry is refused.
+    """
+    latest = (await db.execute(select(func.max(ChangeLogEntry.seq)))).scalar() or 0
+    if offset > latest:
+        raise HTTPException(status_code=400, detail=f"offset {offset} is past the newest change ({latest})")
+    consumer = await db.get(ChangeConsumer, (name, int(organization_id)))
+    if consumer is None:
+        db.add(ChangeConsumer(name=name, organization_id=int(organization_id), last_seq=offset))
+    else:
+        consumer.last_seq = offset
+    await db.commit()
+    return offset
+
+
+async def _advance_relay(db: AsyncSession, organization_id: int, offset: int, relayed_to: int) -> bool:
+    # Compare-and-set, so two workers relaying at once don't both copy the same entries
+    if offset:
+        moved = await db.execute(
+            update(ChangeConsumer.__table__)
+            .where(
+                ChangeConsumer.name == RELAY_CONSUMER, ChangeConsumer.organization_id == organization_id,
+                ChangeConsumer.last_seq == offset,
+            )
+            .values(last_seq=relayed_to)
+        )
+        return moved.rowcount == 1
+    try:
+        await db.execute(insert(ChangeConsumer.__table__).values(
+            name=RELAY_CONSUMER, organization_id=organization_id, last_seq=relayed_to,
+        ))
+    except IntegrityError:
+        return False
+    return True
+
+
+async def relay_user_changes(organization_id: int, batch_size: int = settings.CHANGE_LOG_MAX_PAGE_SIZE) -> int:
+    """
+    Copy the organization's user entries that the main database logged since the last relay
+    into the log of the shard it lives on, each exactly once. Nothing to do for tenants in the
+    main database, and skipped while a move is freezing the tenant's writes. Returns the number
+    of entries copied.
+    """
+    shard, frozen = await shard_directory.resolve(organization_id)
+    if shard == DEFAULT_SHARD or frozen:
+        return 0
+    sessions = await tenant_sessionmaker(organization_id)
+    relayed, relayed_to = 0, 0
+    while True:
+        async with sessions() as shard_db:
+            offset = await consumer_offset(shard_db, organization_id, RELAY_CONSUMER)
+            async with AsyncReadSessionLocal() as main_db:
+                rows = (await main_db.execute(
+                    select(
+                        ChangeLogEntry.seq, ChangeLogEntry.row_id, ChangeLogEntry.op, ChangeLogEntry.changes,
+                        ChangeLogEntry.created_at,
+                    )
+                    .where(
+                        ChangeLogEntry.organization_id == organization_id, ChangeLogEntry.entity == "user",
+                        ChangeLogEntry.seq > offset,
+                    )
+                    .order_by(ChangeLogEntry.seq)
+                    .limit(batch_size)
+                )).all()
+            if not rows or not await _advance_relay(shard_db, organization_id, offset, rows[-1].seq):
+                break
+            await shard_db.execute(insert(ChangeLogEntry.__table__), [
+                {"organization_id": organization_id, "entity": "user", "row_id": row.row_id, "op": row.op,
+                 "changes": row.changes, "created_at": row.created_at}
+                for row in rows
+            ])
+            await shard_db.commit()
+        relayed, relayed_to = relayed + len(rows), rows[-1].seq
+        if len(rows) < batch_size:
+            break
+    if relayed_to:
+        # Best effort: a main-database offset that lags the shard's only keeps entries longer
+        async with AsyncSessionLocal() as main_db:
+            consumer = await main_db.get(ChangeConsumer, (RELAY_CONSUMER, organization_id))
+            if consumer is None:
+                main_db.add(ChangeConsumer(name=RELAY_CONSUMER, organization_id=organization_id, last_seq=relayed_to))
+            elif consumer.last_seq < relayed_to:
+                consumer.last_seq = relayed_to
+            try:
+                await main_db.commit()
+            except IntegrityError:
+                await main_db.rollback()
+    return relayed
+
+
+def prune_changes(connection, older_than: datetime, batch_size: int) -> int:
+    """
+    Delete entries created before `older_than` that every consumer of their organization has
+    committed past, `batch_size` at a time. Organizations without consumers keep only the
+    retention window. Returns the number of entries deleted.
+    """
+    log = ChangeLogEntry.__table__
+    committed = (
+        select(func.min(ChangeConsumer.last_seq))
+        .where(ChangeConsumer.organization_id == log.c.organization_id)
+        .scalar_subquery()
+    )
+    prunable = select(log.c.seq).where(log.c.created_at < older_than, log.c.seq <= func.coalesce(committed, log.c.seq))
+    removed = 0
+    while True:
+        with connection.begin():
+            seqs = connection.execute(prunable.order_by(log.c.seq).limit(batch_size)).scalars().all()
+            if not seqs:
+                return removed
+            removed += connection.execute(delete(log).where(log.c.seq.in_(seqs))).rowcount
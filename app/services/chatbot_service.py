@@ -1,24 +1,38 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.retrieval import retrieve
 
 class ChatbotService:
     """
-    Chatbot service placeholder.
-    Can be extended to integrate:
-      - OpenAI GPT / Claude / other LLM APIs
-      - RAG (Retrieval-Augmented Generation) with embeddings + vector DB
-      - Local NLP models
+    Retrieval-backed chatbot: answers from the organization's own leads, complaints and
+    knowledge articles, found through its local vector index (app/services/retrieval.py).
+    An LLM can later be put behind `compose`, using the same retrieved sources as context.
     """
 
-    async def get_response(self, message: str, user_context: Dict[str, Any]) -> str:
+    async def get_response(
+        self,
+        message: str,
+        user_context: Dict[str, Any],
+        db: Optional[AsyncSession] = None,
+        top_k: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
-        Returns a chatbot response based on the input message and user context.
+        Returns {"response": text, "sources": retrieval hits} for the message.
         """
-        # Example: simple echo response
-        user_name = user_context.get("name", "User")
-        response = f"Hello {user_name}, you said: '{message}'"
+        organization_id = user_context.get("organization_id")
+        sources = await retrieve(db, organization_id, message, top_k) if db is not None and organization_id else []
+        return {"response": self.compose(message, user_context, sources), "sources": sources}
 
-        # Placeholder for RAG / LLM call:
-        # e.g., call external API:
-        # response = await call_llm_api(message, context=user_context)
-
-        return response
+    def compose(self, message: str, user_context: Dict[str, Any], sources: List[Dict]) -> str:
+        user_name = user_context.get("name", "User")
+        if not sources:
+            return f"Sorry {user_name}, I couldn't find anything in your CRM related to '{message}'."
+        lines = [f"Here's what I found, {user_name}:"]
+        for source in sources:
+            line = f"- {source['kind'].capitalize()} #{source['id']}: {source['title']}"
+            if source["snippet"]:
+                line += f" ({source['snippet'][:160]})"
+            lines.append(line)
+        return "\n".join(lines)
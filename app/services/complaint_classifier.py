@@ -0,0 +1,216 @@
+import re
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+UNCLASSIFIED = "unclassified"
+
+# Rules the classifier starts from when no trained model has been saved yet; the same
+# keywords the original if/elif chain in AIService used.
+SEED_KEYWORDS = {
+    "billing_issue": ["billing", "bill", "invoice", "charge", "charged", "refund", "payment"],
+    "service_issue": ["service", "support", "staff", "rude", "waiting", "delay"],
+    "technical_issue": ["technical", "error", "bug", "crash", "login", "broken", "outage"],
+}
+
+
+@lru_cache(maxsize=65536)
+def _hash_token(token: str, n_features: int) -> int:
+    # crc32 rather than hash(): str hashes are salted per process
+    return zlib.crc32(token.encode()) % n_features
+
+
+class HashingTfidf:
+    """
+    Unigram + bigram features hashed into a fixed number of columns (no vocabulary to store),
+    weighted 1 + log(tf) * idf and L2-normalised per document.
+
+    A batch comes back as CSR arrays (indptr, indices, data) rather than a dense matrix:
+    a dense 1000 x 2**18 batch would not fit in memory.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, idf: Optional[np.ndarray] = None):
+        self.n_features = n_features
+        self.idf = idf if idf is not None else np.ones(n_features, dtype=np.float32)
+
+    def _tokens(self, text: str) -> List[str]:
+        words = _TOKEN.findall((text or "").lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _bucket(self, token: str) -> int:
+        return _hash_token(token, self.n_features)
+
+    def _counts(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            buckets, tf = np.unique(
+                np.fromiter((self._bucket(t) for t in self._tokens(text)), dtype=np.int64), return_counts=True
+            )
+            indices.append(buckets)
+            counts.append(tf)
+            indptr.append(indptr[-1] + len(buckets))
+        return (
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+            np.concatenate(counts).astype(np.float32) if counts else np.zeros(0, dtype=np.float32),
+        )
+
+    def fit_idf(self, texts: Sequence[str]):
+        indptr, indices, _ = self._counts(texts)
+        document_frequency = np.bincount(indices, minlength=self.n_features)
+        self.idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def transform(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        indptr, indices, tf = self._counts(texts)
+        data = (1 + np.log(tf)) * self.idf[indices]
+        lengths = np.diff(indptr)
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(texts)))
+        data = data / np.maximum(norms, 1e-12)[rows]
+        return indptr, indices, data.astype(np.float32)
+
+
+def _csr_dot(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    (CSR batch) @ weights in one gather and one segmented sum.
+    """
+    lengths = np.diff(indptr)
+    out = np.zeros((len(lengths), weights.shape[1]), dtype=np.float32)
+    nonempty = lengths > 0
+    if nonempty.any():
+        # Rows are contiguous in CSR, so each row's sum starts at its indptr offset
+        out[nonempty] = np.add.reduceat(weights[indices] * data[:, None], indptr[:-1][nonempty], axis=0)
+    return out
+
+
+class ComplaintClassifier:
+    """
+    Multinomial logistic regression over hashed TF-IDF features. `predict` scores a whole
+    batch of descriptions with a single sparse matrix product.
+    """
+
+    def __init__(self, labels: List[str], weights: np.ndarray, bias: np.ndarray, vectorizer: HashingTfidf):
+        self.labels = labels
+        self.weights = weights
+        self.bias = bias
+        self.vectorizer = vectorizer
+
+    @classmethod
+    def from_keywords(cls, keywords: Dict[str, List[str]] = SEED_KEYWORDS, n_features: int = 2 ** 18):
+        """
+        Untrained starting point: one positive weight per keyword, and "unclassified" for
+        text that matches none of them.
+        """
+        vectorizer = HashingTfidf(n_features)
+        labels = list(keywords) + [UNCLASSIFIED]
+        weights = np.zeros((n_features, len(labels)), dtype=np.float32)
+        for column, words in enumerate(keywords.values()):
+            for word in words:
+                weights[vectorizer._bucket(word), column] = 1.0
+        bias = np.zeros(len(labels), dtype=np.float32)
+        bias[-1] = 1e-3  # wins only when no keyword scored
+        return cls(labels, weights, bias, vectorizer)
+
+    @classmethod
+    def train(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        n_features: int = 2 ** 18,
+        epochs: int = 20,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        batch_size: int = 256,
+        seed: int = 0,
+    ) -> "ComplaintClassifier":
+        """
+        Fit IDF weights and a softmax model with mini-batch gradient descent.
+        """
+        vectorizer = HashingTfidf(n_features).fit_idf(texts)
+        classes = sorted(set(labels))
+        targets = np.array([classes.index(label) for label in labels])
+        weights = np.zeros((n_features, len(classes)), dtype=np.float32)
+        bias = np.zeros(len(classes), dtype=np.float32)
+        model = cls(classes, weights, bias, vectorizer)
+
+        rng = np.random.default_rng(seed)
+        texts = list(texts)
+        for _ in range(epochs):
+            order = rng.permutation(len(texts))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                indptr, indices, data = vectorizer.transform([texts[i] for i in batch])
+                probabilities = model._softmax(_csr_dot(indptr, indices, data, weights) + bias)
+                probabilities[np.arange(len(batch)), targets[batch]] -= 1  # dLoss/dlogits
+                probabilities /= len(batch)
+
+                rows = np.repeat(np.arange(len(batch)), np.diff(indptr))
+                for column in range(len(classes)):
+                    gradient = np.bincount(indices, weights=data * probabilities[rows, column], minlength=n_features)
+                    weights[:, column] -= learning_rate * (gradient.astype(np.float32) + l2 * weights[:, column])
+                bias -= learning_rate * probabilities.sum(axis=0)
+        return model
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        indptr, indices, data = self.vectorizer.transform(texts)
+        return self._softmax(_csr_dot(indptr, indices, data, self.weights) + self.bias)
+
+    def predict(self, texts: Sequence[str]) -> List[str]:
+        if not texts:
+            return []
+        best = self.predict_proba(texts).argmax(axis=1)
+        return [self.labels[i] for i in best]
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            labels=np.array(self.labels),
+            weights=self.weights,
+            bias=self.bias,
+            idf=self.vectorizer.idf,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ComplaintClassifier":
+        with np.load(path) as saved:
+            idf = saved["idf"]
+            return cls(
+                [str(label) for label in saved["labels"]],
+                saved["weights"],
+                saved["bias"],
+                HashingTfidf(len(idf), idf),
+            )
+
+
+_classifier: Optional[ComplaintClassifier] = None
+
+
+def get_classifier() -> ComplaintClassifier:
+    """
+    The saved model at COMPLAINT_CLASSIFIER_PATH, or the keyword seed model if none has
+    been trained yet. Loaded once per process.
+    """
+    global _classifier
+    if _classifier is None:
+        try:
+            _classifier = ComplaintClassifier.load(settings.COMPLAINT_CLASSIFIER_PATH)
+        except FileNotFoundError:
+            _classifier = ComplaintClassifier.from_keywords()
+    return _classifier
+
+
+def classify_texts(texts: Iterable[str]) -> List[str]:
+    return get_classifier().predict(list(texts))
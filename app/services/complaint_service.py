@@ -0,0 +1,97 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.projection import Projection
+from app.models.complaint import Complaint
+from app.models.change_log import change_entry, log_changes
+from app.models.org_aggregate import apply_deltas
+from app.schemas.complaint import ComplaintOut
+
+# Columns the list and search endpoints return, rendered without building Complaint entities
+COMPLAINT_OUT_PROJECTION = Projection(ComplaintOut, Complaint)
+
+
+def filter_complaints(
+    organization_id,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """
+    Build the tenant-scoped complaints select used by the list endpoint.
+    """
+    query = select(Complaint).where(Complaint.organization_id == organization_id)
+    if status is not None:
+        query = query.where(Complaint.status == status)
+    if priority is not None:
+        query = query.where(Complaint.priority == priority)
+    if assigned_to_id is not None:
+        query = query.where(Complaint.assigned_to_id == assigned_to_id)
+    if created_after is not None:
+        query = query.where(Complaint.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Complaint.created_at < created_before)
+    return query
+
+
+async def classify_unclassified(db: AsyncSession, organization_id, chunk_size: Optional[int] = None) -> Dict:
+    """
+    Classify every complaint of the organization that has no classification yet.
+
+    Works through them in id order, chunk_size at a time: one batched predict in a worker
+    thread, one executemany UPDATE and one commit per chunk. Complaints the model can't place
+    (UNCLASSIFIED) are left as they are, so a run with a better-trained model picks them up
+    again; so are complaints an earlier run labelled UNCLASSIFIED.
+    """
+    from app.services.complaint_classifier import UNCLASSIFIED, classify_texts  # numpy: loaded on first use
+
+    chunk_size = chunk_size or settings.COMPLAINT_CLASSIFY_CHUNK_SIZE
+    table = Complaint.__table__
+    write = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(classification=bindparam("_classification"))
+    )
+    totals = Counter()
+    # One pass per filter, so each seeks (organization_id, classification, id) in id order
+    for pending in (Complaint.classification.is_(None), Complaint.classification == UNCLASSIFIED):
+        last_id = 0
+        while True:
+            rows = (await db.execute(
+                select(Complaint.id, Complaint.description, Complaint.classification)
+                .where(Complaint.organization_id == organization_id, pending, Complaint.id > last_id)
+                .order_by(Complaint.id)
+                .limit(chunk_size)
+            )).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            labels = await asyncio.to_thread(classify_texts, [row.description or "" for row in rows])
+            classified = [(row, label) for row, label in zip(rows, labels) if label != UNCLASSIFIED]
+            if not classified:
+                continue
+            await db.execute(write, [{"_id": row.id, "_classification": label} for row, label in classified])
+
+            # Bulk UPDATEs skip the session's aggregate and change-log hooks
+            chunk = Counter(label for _, label in classified)
+            deltas = Counter()
+            for row, label in classified:
+                deltas[(organization_id, "complaint", "classification", row.classification or "")] -= 1
+                deltas[(organization_id, "complaint", "classification", label)] += 1
+            changes = [
+                change_entry(Complaint, "update", row.id, organization_id, {"classification": label})
+                for row, label in classified
+            ]
+            await db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+            await db.run_sync(lambda session: log_changes(session.connection(), changes))
+            await db.commit()
+            totals.update(chunk)
+
+    return {"classified": sum(totals.values()), "by_classification": dict(totals)}
@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.models.complaint import Complaint
+from app.models.knowledge_article import KnowledgeArticle
+from app.models.lead import Lead
+
+# Document kinds sharing one vector index per organization
+KIND_LEAD, KIND_COMPLAINT, KIND_ARTICLE = 0, 1, 2
+
+DOCUMENT_MODELS = {KIND_LEAD: Lead, KIND_COMPLAINT: Complaint, KIND_ARTICLE: KnowledgeArticle}
+
+# Their entity names in the change log (app/models/change_log.py), which drives index updates
+LOGGED_KINDS = {"lead": KIND_LEAD, "complaint": KIND_COMPLAINT, "article": KIND_ARTICLE}
+
+# Only stable, user-written text is embedded, so logged updates to status, category, scores
+# or classification leave the index alone.
+TEXT_COLUMNS = {
+    KIND_LEAD: ("name", "email", "phone"),
+    KIND_COMPLAINT: ("title", "description"),
+    KIND_ARTICLE: ("title", "body"),
+}
+
+MAX_CHUNKS = 0xFFFF  # chunk numbers get 16 bits of the index key
+
+
+def document_chunks(kind: int, row) -> List[str]:
+    """
+    The text(s) a lead, complaint or article is indexed under. Articles are split into
+    ARTICLE_CHUNK_WORDS-word chunks, each prefixed with the title.
+    """
+    if kind == KIND_LEAD:
+        return [" ".join(part for part in (row.name, row.email, row.phone) if part)]
+    if kind == KIND_COMPLAINT:
+        return [" ".join(part for part in (row.title, row.description) if part)]
+    words = (row.body or "").split()
+    size = settings.ARTICLE_CHUNK_WORDS
+    chunks = [" ".join(words[start:start + size]) for start in range(0, len(words), size)] or [""]
+    return [f"{row.title}\n{chunk}" for chunk in chunks[:MAX_CHUNKS]]
+
+
+def changes_document(kind: int, op: str, changes: Optional[Dict]) -> bool:
+    """
+    Whether a change-log entry can change what the document is indexed under.
+    """
+    return op != "update" or not changes or any(name in changes for name in TEXT_COLUMNS[kind])
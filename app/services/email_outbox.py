@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+
+from app.core.config import settings
+from app.core.email import SMTPConnection, build_message
+from app.models.database import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = timedelta(days=1)
+
+_PURGE_BATCH = 1000
+
+
+def enqueue_email(db, to_email: str, subject: str, body: str) -> EmailOutbox:
+    """
+    Queue an email in the caller's session. It is only visible to the sender (and so only
+    sent) once the caller's transaction commits, and is never lost if the request fails
+    after committing.
+    """
+    message = EmailOutbox(to_email=to_email, subject=subject, body=body)
+    db.add(message)
+    return message
+
+
+class OutboxSender:
+    """
+    Background task that drains `email_outbox` over one pooled SMTP connection.
+
+    Each pass claims up to `batch_size` due rows under a random claim token, so several
+    workers can run a sender against the same database without double-sending. A claim is
+    a lease: if its sender dies the rows become due again after EMAIL_OUTBOX_LEASE_SECONDS.
+    Claiming counts as an attempt, so a message whose sends keep killing the sender also
+    runs out of attempts. Failed sends are retried with exponential backoff until
+    EMAIL_OUTBOX_MAX_ATTEMPTS. A sent or abandoned message's body is cleared (welcome emails
+    carry temporary passwords), and the rows are deleted after EMAIL_OUTBOX_RETENTION_DAYS.
+    """
+
+    def __init__(
+        self,
+        session_factory=AsyncSessionLocal,
+        connection: Optional[SMTPConnection] = None,
+        batch_size: int = settings.EMAIL_OUTBOX_BATCH_SIZE,
+        poll_seconds: float = settings.EMAIL_OUTBOX_POLL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.connection = connection or SMTPConnection()
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._next_purge = 0.0
+
+    def wake(self):
+        """
+        Ask the sender to poll now instead of waiting out the poll interval.
+        """
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _claim(self) -> List[EmailOutbox]:
+        now = datetime.utcnow()
+        token = uuid.uuid4().hex
+        max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        async with self.session_factory() as db:
+            # Leases that ran out on their last attempt: the sender died on it every time
+            abandoned = await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.status == "sending", EmailOutbox.next_attempt_at <= now,
+                       EmailOutbox.attempts >= max_attempts)
+                .values(status="failed", body=None, claim_token=None,
+                        last_error=func.coalesce(EmailOutbox.last_error, "Sender stopped during the last attempt"))
+                .execution_options(synchronize_session=False)
+            )
+            if abandoned.rowcount:
+                self.failed += abandoned.rowcount
+                logger.error("Giving up on %s outbox emails whose last attempt never finished", abandoned.rowcount)
+            due = (
+                select(EmailOutbox.id)
+                .where(EmailOutbox.status.in_(("pending", "sending")), EmailOutbox.next_attempt_at <= now,
+                       EmailOutbox.attempts < max_attempts)
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            await db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due))
+                .values(
+                    status="sending",
+                    claim_token=token,
+                    attempts=EmailOutbox.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            result = await db.execute(select(EmailOutbox).where(EmailOutbox.claim_token == token))
+            return list(result.scalars())
+
+    def _send_batch(self, messages: List[EmailOutbox]) -> List[Tuple[int, Optional[str]]]:
+        """
+        Send every claimed message on the shared connection. Runs in a worker thread. Any
+        error fails only its own message, so the rest of the batch is still sent and recorded.
+        """
+        results = []
+        for message in messages:
+            try:
+                self.connection.send(build_message(message.to_email, message.subject, message.body))
+                results.append((message.id, None))
+            except Exception as exc:
+                # Start the next message on a clean connection
+                self.connection.close()
+                results.append((message.id, f"{type(exc).__name__}: {exc}"[:500]))
+        return results
+
+    async def _record(self, messages: List[EmailOutbox], results: List[Tuple[int, Optional[str]]]):
+        """
+        Store each message's outcome. Every update is guarded by the claim token, so a sender
+        whose lease ran out (and whose rows another sender has since claimed) changes nothing.
+        """
+        now = datetime.utcnow()
+        claimed = {message.id: message for message in messages}
+        token = messages[0].claim_token
+        sent_ids = [message_id for message_id, error in results if error is None]
+        async with self.session_factory() as db:
+            if sent_ids:
+                result = await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id.in_(sent_ids), EmailOutbox.claim_token == token)
+                    .values(status="sent", sent_at=now, body=None, claim_token=None, last_error=None)
+                    .execution_options(synchronize_session=False)
+                )
+                self.sent += result.rowcount
+            for message_id, error in results:
+                if error is None:
+                    continue
+                attempt = claimed[message_id].attempts  # counted when it was claimed
+                if attempt >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    values = {"status": "failed", "body": None}
+                    logger.error("Giving up on outbox email %s after %s attempts: %s", message_id, attempt, error)
+                else:
+                    delay = timedelta(seconds=settings.EMAIL_OUTBOX_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                    values = {"status": "pending", "next_attempt_at": now + min(delay, MAX_BACKOFF)}
+                result = await db.execute(
+                    update(EmailOutbox)
+                    .where(EmailOutbox.id == message_id, EmailOutbox.claim_token == token)
+                    .values(last_error=error, claim_token=None, **values)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount:
+                    if values["status"] == "failed":
+                        self.failed += 1
+                    else:
+                        self.retried += 1
+            await db.commit()
+
+    async def purge(self, older_than: Optional[datetime] = None) -> int:
+        """
+        Delete sent and failed messages created before `older_than` (default: the retention
+        period), a batch per transaction. Returns how many were deleted.
+        """
+        older_than = older_than or datetime.utcnow() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+        removed = 0
+        async with self.session_factory() as db:
+            while True:
+                ids = (await db.execute(
+                    select(EmailOutbox.id)
+                    .where(EmailOutbox.status.in_(("sent", "failed")), EmailOutbox.created_at < older_than)
+                    .limit(_PURGE_BATCH)
+                )).scalars().all()
+                if not ids:
+                    return removed
+                await db.execute(delete(EmailOutbox).where(EmailOutbox.id.in_(ids)))
+                await db.commit()
+                removed += len(ids)
+
+    async def run_once(self) -> int:
+        """
+        Claim, send and record one batch. Returns how many messages were processed.
+        """
+        messages = await self._claim()
+        if not messages:
+            return 0
+        results = await asyncio.to_thread(self._send_batch, messages)
+        await self._record(messages, results)
+        return len(messages)
+
+    async def _run(self):
+        while True:
+            try:
+                if time.monotonic() >= self._next_purge:
+                    self._next_purge = time.monotonic() + settings.EMAIL_OUTBOX_PURGE_INTERVAL_SECONDS
+                    await self.purge()
+                processed = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox pass failed")
+                processed = 0
+            if processed >= self.batch_size:
+                continue  # more is probably waiting
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.connection.close)
+
+
+outbox_sender = OutboxSender()
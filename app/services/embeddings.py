@@ -0,0 +1,140 @@
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Too common to say anything about a document; with few hash buckets they only add noise
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have i in is it its me my of on or our so "
+    "that the this to was we were what when where which who why will with you your".split()
+)
+
+
+def content_hash(text: str) -> int:
+    """
+    Stable 63-bit hash of a document's text; an unchanged hash means no re-embedding.
+    """
+    return int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], "big") >> 1
+
+
+class Embedder:
+    """
+    Turns texts into L2-normalised float32 vectors of `dim` columns.
+
+    Subclass and `register_embedder` to plug in another local model; the index stores the
+    model name and rebuilds itself if it changes.
+    """
+    name = "base"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Signed feature hashing of unigrams and bigrams (stopwords dropped, plurals folded) with
+    sublinear term frequency. Needs no training or vocabulary, and texts sharing words land
+    close together.
+    """
+    name = "hashing"
+
+    @staticmethod
+    def _words(text: str):
+        for word in _TOKEN.findall(text.lower()):
+            if word in STOPWORDS:
+                continue
+            # Fold plain plurals so "refunds" matches "refund"
+            yield word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+    def _features(self, text: str):
+        words = list(self._words(text))
+        for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(token.encode())
+            yield h % self.dim, 1.0 if h & 0x80000000 else -1.0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for column, sign in self._features(text):
+                counts[column] = counts.get(column, 0.0) + sign
+            if counts:
+                columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                vectors[row, columns] = np.sign(values) * np.log1p(np.abs(values))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+_EMBEDDERS: Dict[str, Callable[[int], Embedder]] = {"hashing": HashingEmbedder}
+
+
+def register_embedder(name: str, factory: Callable[[int], Embedder]):
+    _EMBEDDERS[name] = factory
+
+
+class EmbeddingCache:
+    """
+    In-process LRU of one embedder's vectors keyed by content hash, so a document or query
+    seen before is not embedded again.
+    """
+
+    def __init__(self, embedder: Embedder, max_entries: int = settings.EMBEDDING_CACHE_MAX_ENTRIES):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts: Sequence[str], hashes: Optional[Sequence[int]] = None) -> np.ndarray:
+        hashes = list(hashes) if hashes is not None else [content_hash(text) for text in texts]
+        out = np.empty((len(texts), self.embedder.dim), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for row, key in enumerate(hashes):
+                vector = self._entries.get(key)
+                if vector is None:
+                    missing.append(row)
+                else:
+                    self._entries.move_to_end(key)
+                    out[row] = vector
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            computed = self.embedder.embed([texts[row] for row in missing])
+            out[missing] = computed
+            with self._lock:
+                for row, vector in zip(missing, computed):
+                    self._entries[hashes[row]] = vector
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return out
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    The configured embedder (EMBEDDING_MODEL / EMBEDDING_DIM) behind the process-wide cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(_EMBEDDERS[settings.EMBEDDING_MODEL](settings.EMBEDDING_DIM))
+    return _cache
@@ -0,0 +1,449 @@
+import asyncio
+import re
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.core.normalize import normalize_email, normalize_phone
+from app.models.lead import Lead
+from app.models.lead_dedupe import LeadLshBucket, LeadMergeSuggestion, LeadSignature
+from app.services.lead_scoring import FREE_EMAIL_DOMAINS
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Dropped from names so "Acme Inc" and "ACME, Inc." and "Acme" look alike
+COMPANY_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "ltd", "limited", "co", "corp", "corporation", "company",
+    "gmbh", "plc", "sa", "srl", "bv", "ag", "pty", "the",
+})
+
+# An exact email or phone match counts as this many name trigrams
+CONTACT_WEIGHT = 2
+
+NUM_PERM = settings.DEDUPE_NUM_PERM
+BANDS = settings.DEDUPE_BANDS
+ROWS = NUM_PERM // BANDS
+
+# Stored signatures must be reproducible, so the permutations come from a fixed seed.
+# Changing it, or DEDUPE_NUM_PERM / DEDUPE_BANDS, needs a full run (full=True).
+_PRIME = np.uint64(4294967291)  # largest prime below 2**32, so a * x + b fits in uint64
+_rng = np.random.default_rng(0x6C656164)
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)
+_EMPTY = np.uint32(0xFFFFFFFF)
+
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_BAND_SALT = np.arange(BANDS, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+
+@lru_cache(maxsize=1 << 16)
+def _feature_hash(feature: str) -> int:
+    return zlib.crc32(feature.encode())
+
+
+def lead_features(name: Optional[str], email: Optional[str], phone: Optional[str]) -> Set[str]:
+    """
+    The set a lead's MinHash is taken over: character trigrams of its normalized name, plus
+    weighted tokens for its normalized email, phone and (non-free) email domain.
+    """
+    words = [word for word in _WORD.findall((name or "").lower()) if word not in COMPANY_SUFFIXES]
+    # Padded, so short names still give a few trigrams and word edges count
+    text = f" {' '.join(words)} " if words else ""
+    features = {"n:" + text[i:i + 3] for i in range(len(text) - 2)}
+    email = normalize_email(email)
+    if email:
+        features.update(f"e:{email}:{copy}" for copy in range(CONTACT_WEIGHT))
+        domain = email.rpartition("@")[2]
+        if domain and domain not in FREE_EMAIL_DOMAINS:
+            features.add("d:" + domain)
+    phone = normalize_phone(phone)
+    if phone and len(phone) >= 7:
+        # Last 10 digits, so numbers with and without a country code match
+        features.update(f"p:{phone[-10:]}:{copy}" for copy in range(CONTACT_WEIGHT))
+    return features
+
+
+def contact_keys(email: Optional[str], phone: Optional[str]) -> Set[str]:
+    """
+    A lead's normalized email and phone (last 10 digits), as compared between two leads.
+    """
+    keys = set()
+    email = normalize_email(email)
+    if email:
+        keys.add("e:" + email)
+    phone = normalize_phone(phone)
+    if phone and len(phone) >= 7:
+        keys.add("p:" + phone[-10:])
+    return keys
+
+
+def signatures(feature_sets: Sequence[Set[str]]) -> np.ndarray:
+    """
+    MinHash signatures, one (NUM_PERM,) uint32 row per feature set. All permutations of all
+    features are computed in one array operation and reduced per lead with reduceat.
+    An empty set gets an all-0xFFFFFFFF row, which `band_keys` leaves out.
+    """
+    n = len(feature_sets)
+    out = np.full((n, NUM_PERM), _EMPTY, dtype=np.uint32)
+    lengths = np.fromiter((len(features) for features in feature_sets), dtype=np.int64, count=n)
+    total = int(lengths.sum())
+    if not total:
+        return out
+    hashes = np.fromiter(
+        (_feature_hash(feature) for features in feature_sets for feature in features), dtype=np.uint64, count=total
+    )
+    permuted = (hashes[:, None] * _A + _B) % _PRIME
+    nonempty = lengths > 0
+    starts = (np.cumsum(lengths) - lengths)[nonempty]
+    out[nonempty] = np.minimum.reduceat(permuted, starts, axis=0)
+    return out
+
+
+def band_keys(sigs: np.ndarray) -> np.ndarray:
+    """
+    (n, BANDS) int64 bucket keys: an FNV-style hash of each band's ROWS values, salted with the
+    band number so equal values in different bands don't collide. Leads sharing any bucket
+    are candidates. Rows of empty signatures get key 0 in every band.
+    """
+    bands = sigs.astype(np.uint64).reshape(len(sigs), BANDS, ROWS)
+    keys = np.full((len(sigs), BANDS), _FNV_OFFSET, dtype=np.uint64)
+    for row in range(ROWS):
+        keys = (keys ^ bands[:, :, row]) * _FNV_PRIME
+    keys = (keys ^ _BAND_SALT).view(np.int64)
+    keys[(sigs == _EMPTY).all(axis=1)] = 0
+    return keys
+
+
+def candidate_pairs(keys: np.ndarray, max_bucket: int = settings.DEDUPE_MAX_BUCKET_SIZE) -> np.ndarray:
+    """
+    Unique (i, j), i < j, row pairs sharing at least one bucket, found by sorting the bucket
+    keys instead of comparing every pair. Buckets over `max_bucket` rows are skipped.
+    """
+    n = len(keys)
+    flat = keys.ravel()
+    owners = np.repeat(np.arange(n, dtype=np.int64), keys.shape[1])
+    live = flat != 0
+    flat, owners = flat[live], owners[live]
+    order = np.argsort(flat, kind="stable")
+    flat, owners = flat[order], owners[order]
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(flat)) + 1))
+    sizes = np.diff(np.concatenate((starts, [len(flat)])))
+
+    # All buckets of one size at once: a (buckets, size) member matrix, then its upper triangle.
+    # Pairs are kept as single i * n + j codes, which halves the memory np.unique sorts.
+    codes = [np.zeros(0, dtype=np.int64)]
+    for size in np.unique(sizes[(sizes > 1) & (sizes <= max_bucket)]).tolist():
+        members = owners[starts[sizes == size][:, None] + np.arange(size)]
+        left, right = np.triu_indices(size, 1)
+        first, second = members[:, left].ravel(), members[:, right].ravel()
+        codes.append(np.minimum(first, second) * n + np.maximum(first, second))
+    combined = np.unique(np.concatenate(codes))
+    pairs = np.stack(np.divmod(combined, n), axis=1)
+    return pairs[pairs[:, 0] != pairs[:, 1]]
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Estimated Jaccard similarity of paired signatures: the share of equal MinHash values.
+    """
+    return (left == right).mean(axis=1)
+
+
+def find_duplicates(sigs: np.ndarray, threshold: float = settings.DEDUPE_SIMILARITY_THRESHOLD) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    In-memory LSH over a batch of signatures: (pairs, similarities) at or above `threshold`.
+    """
+    pairs = candidate_pairs(band_keys(sigs))
+    scores = similarity(sigs[pairs[:, 0]], sigs[pairs[:, 1]])
+    keep = scores >= threshold
+    return pairs[keep], scores[keep]
+
+
+# ---- incremental runs against the database ----
+
+_IN_BATCH = 5000  # values per IN (...) lookup; well under SQLite's 32766 variable limit
+
+
+def _pack(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def _unpack(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<u4")
+
+
+def _batches(values: Sequence, size: int = _IN_BATCH):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _sign(rows: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    sigs = signatures([lead_features(row.name, row.email, row.phone) for row in rows])
+    return sigs, band_keys(sigs)
+
+
+def _insert_suggestions(connection, organization_id, pairs: List[Tuple[int, int, float]]) -> int:
+    """
+    Insert (lead_id, duplicate_id, similarity) suggestions, leaving pairs already suggested,
+    merged or dismissed as they are.
+    """
+    if not pairs:
+        return 0
+    table = LeadMergeSuggestion.__table__
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(table).on_conflict_do_nothing(
+        index_elements=[table.c.organization_id, table.c.lead_id, table.c.duplicate_id]
+    )
+    now = datetime.utcnow()
+    result = connection.execute(statement, [
+        {"organization_id": organization_id, "lead_id": lead_id, "duplicate_id": duplicate_id,
+         "similarity": round(score, 4), "status": "open", "created_at": now}
+        for lead_id, duplicate_id, score in pairs
+    ])
+    return max(result.rowcount, 0)
+
+
+async def _weigh_contacts(db: AsyncSession, pairs: List[Tuple[int, int, float]], threshold: float) -> List[Tuple[int, int, float]]:
+    """
+    Scale down the similarity of pairs sharing no email or phone by DEDUPE_NAME_ONLY_WEIGHT
+    (two "John Smith"s with nothing else in common sign alike), then drop pairs it takes
+    below the threshold.
+    """
+    contacts: Dict[int, Set[str]] = {}
+    for batch in _batches(sorted({lead_id for pair in pairs for lead_id in pair[:2]})):
+        result = await db.execute(select(Lead.id, Lead.email, Lead.phone).where(Lead.id.in_(batch)))
+        contacts.update((row.id, contact_keys(row.email, row.phone)) for row in result.all())
+    weighed = []
+    for lead_id, duplicate_id, score in pairs:
+        if not contacts.get(lead_id, set()) & contacts.get(duplicate_id, set()):
+            score *= settings.DEDUPE_NAME_ONLY_WEIGHT
+        if score >= threshold:
+            weighed.append((lead_id, duplicate_id, score))
+    return weighed
+
+
+async def _match_chunk(db: AsyncSession, organization_id, rows: Sequence, resigned: List[int]) -> Tuple[int, int]:
+    """
+    Sign one chunk of leads, match it against the organization's buckets and against itself,
+    then store its signatures and buckets. Returns (pairs compared, suggestions added).
+    """
+    threshold = settings.DEDUPE_SIMILARITY_THRESHOLD
+    max_bucket = settings.DEDUPE_MAX_BUCKET_SIZE
+    ids = np.array([row.id for row in rows], dtype=np.int64)
+    sigs, keys = await asyncio.to_thread(_sign, rows)
+
+    # A re-signed lead must not match its own previous buckets
+    for batch in _batches(resigned):
+        await db.execute(delete(LeadLshBucket).where(LeadLshBucket.lead_id.in_(batch)))
+        await db.execute(delete(LeadSignature).where(LeadSignature.lead_id.in_(batch)))
+
+    members: Dict[int, List[int]] = defaultdict(list)
+    for batch in _batches(np.unique(keys[keys != 0]).tolist()):
+        result = await db.execute(
+            select(LeadLshBucket.bucket, LeadLshBucket.lead_id)
+            .where(LeadLshBucket.organization_id == organization_id, LeadLshBucket.bucket.in_(batch))
+        )
+        for bucket, lead_id in result.all():
+            members[bucket].append(lead_id)
+
+    # Candidates among leads signed earlier: (chunk row, lead id)
+    external = set()
+    for position, row_keys in enumerate(keys.tolist()):
+        for key in row_keys:
+            group = members.get(key)
+            if group and len(group) <= max_bucket:
+                external.update((position, other) for other in group)
+
+    other_sigs: Dict[int, np.ndarray] = {}
+    for batch in _batches(sorted({other for _, other in external})):
+        result = await db.execute(
+            select(LeadSignature.lead_id, LeadSignature.signature).where(LeadSignature.lead_id.in_(batch))
+        )
+        other_sigs.update((lead_id, _unpack(blob)) for lead_id, blob in result.all())
+
+    found: List[Tuple[int, int, float]] = []
+    external = [(position, other) for position, other in external if other in other_sigs]
+    if external:
+        positions = np.array([position for position, _ in external])
+        scores = similarity(sigs[positions], np.stack([other_sigs[other] for _, other in external]))
+        for (position, other), score in zip(external, scores.tolist()):
+            if score >= threshold:
+                found.append((min(int(ids[position]), other), max(int(ids[position]), other), score))
+
+    internal = candidate_pairs(keys, max_bucket)
+    if len(internal):
+        scores = similarity(sigs[internal[:, 0]], sigs[internal[:, 1]])
+        for (left, right), score in zip(internal[scores >= threshold].tolist(), scores[scores >= threshold].tolist()):
+            found.append((int(ids[left]), int(ids[right]), score))
+    if found:
+        found = await _weigh_contacts(db, found, threshold)
+
+    signed = [
+        {"lead_id": row.id, "organization_id": organization_id, "signature": _pack(sig), "lead_updated_at": row.updated_at}
+        for row, sig in zip(rows, sigs)
+    ]
+    await db.execute(LeadSignature.__table__.insert(), signed)
+    buckets = [
+        {"organization_id": organization_id, "bucket": key, "lead_id": int(lead_id)}
+        for lead_id, row_keys in zip(ids.tolist(), keys.tolist())
+        for key in set(row_keys) if key != 0
+    ]
+    if buckets:
+        await db.execute(LeadLshBucket.__table__.insert(), buckets)
+    added = await db.run_sync(lambda session: _insert_suggestions(session.connection(), organization_id, found))
+    return len(external) + len(internal), added
+
+
+async def run_lead_dedupe(db: AsyncSession, organization_id, full: bool = False, chunk_size: Optional[int] = None) -> Dict:
+    """
+    Find likely duplicate leads of the organization and record merge suggestions.
+
+    Each lead is signed once (MinHash over its normalized name, email and phone) and its
+    signature split into LSH bands stored as buckets. A lead is only compared with leads that
+    share a bucket, so a run costs about O(new leads), not O(n^2). Incremental runs pick up
+    leads whose updated_at is at or past the newest signed one; full=True re-signs everything,
+    which is needed after changing the DEDUPE_* signature settings. Pairs sharing no email or
+    phone are weighed down (DEDUPE_NAME_ONLY_WEIGHT). Dismissed and merged pairs are never
+    suggested again.
+    """
+    chunk_size = chunk_size or settings.DEDUPE_CHUNK_SIZE
+    if full:
+        await db.execute(delete(LeadLshBucket).where(LeadLshBucket.organization_id == organization_id))
+        await db.execute(delete(LeadSignature).where(LeadSignature.organization_id == organization_id))
+        await db.commit()
+    since = (await db.execute(
+        select(func.max(LeadSignature.lead_updated_at)).where(LeadSignature.organization_id == organization_id)
+    )).scalar()
+
+    processed = compared = suggested = 0
+    position = None  # (updated_at, id) of the last lead read
+    while True:
+        query = select(Lead.id, Lead.name, Lead.email, Lead.phone, Lead.updated_at).where(
+            Lead.organization_id == organization_id, Lead.updated_at.isnot(None)
+        )
+        if since is not None:
+            query = query.where(Lead.updated_at >= since)
+        if position is not None:
+            updated_at, last_id = position
+            query = query.where(or_(Lead.updated_at > updated_at, and_(Lead.updated_at == updated_at, Lead.id > last_id)))
+        rows = (await db.execute(query.order_by(Lead.updated_at, Lead.id).limit(chunk_size))).all()
+        if not rows:
+            break
+        position = (rows[-1].updated_at, rows[-1].id)
+
+        # Leads at exactly `since` may already be signed; so are edits that didn't touch updated_at
+        existing = {}
+        if since is not None:
+            result = await db.execute(
+                select(LeadSignature.lead_id, LeadSignature.lead_updated_at)
+                .where(LeadSignature.lead_id.in_([row.id for row in rows]))
+            )
+            existing = dict(result.all())
+        rows = [row for row in rows if row.id not in existing or existing[row.id] != row.updated_at]
+        if not rows:
+            continue
+
+        chunk_compared, chunk_suggested = await _match_chunk(
+            db, organization_id, rows, [row.id for row in rows if row.id in existing]
+        )
+        await db.commit()
+        processed += len(rows)
+        compared += chunk_compared
+        suggested += chunk_suggested
+
+    return {"processed": processed, "compared": compared, "suggested": suggested, "full": full or since is None}
+
+
+# ---- reviewing suggestions ----
+
+async def list_suggestions(db: AsyncSession, organization_id, status: str, limit: int, offset: int = 0) -> Tuple[List[Dict], Optional[int]]:
+    """
+    One page of the organization's suggestions, most similar first. A merged suggestion
+    shows its duplicate as it was when merged; other suggestions whose leads were deleted
+    since are left out.
+    """
+    kept, duplicate = aliased(Lead), aliased(Lead)
+    result = await db.execute(
+        select(LeadMergeSuggestion, kept, duplicate)
+        .join(kept, kept.id == LeadMergeSuggestion.lead_id)
+        .outerjoin(duplicate, duplicate.id == LeadMergeSuggestion.duplicate_id)
+        .where(
+            LeadMergeSuggestion.organization_id == organization_id,
+            LeadMergeSuggestion.status == status,
+            or_(duplicate.id.isnot(None), LeadMergeSuggestion.duplicate_snapshot.isnot(None)),
+        )
+        .order_by(LeadMergeSuggestion.similarity.desc(), LeadMergeSuggestion.id)
+        .limit(limit + 1)
+        .offset(offset)
+    )
+    items = [
+        {"id": suggestion.id, "similarity": suggestion.similarity, "status": suggestion.status,
+         "created_at": suggestion.created_at, "lead": lead,
+         "duplicate": orjson.loads(suggestion.duplicate_snapshot) if suggestion.duplicate_snapshot else dup}
+        for suggestion, lead, dup in result.all()
+    ]
+    if len(items) > limit:
+        return items[:limit], offset + limit
+    return items, None
+
+
+# Copied from the duplicate onto the kept lead when the kept lead has no value
+_MERGED_FIELDS = ("email", "phone", "assigned_to_id", "category")
+
+
+async def resolve_suggestion(db: AsyncSession, organization_id, suggestion_id: int, action: str) -> LeadMergeSuggestion:
+    """
+    Merge (fill the kept lead's blanks from the duplicate, then delete the duplicate) or
+    dismiss one open suggestion.
+    """
+    suggestion = (await db.execute(select(LeadMergeSuggestion).where(
+        LeadMergeSuggestion.id == suggestion_id,
+        LeadMergeSuggestion.organization_id == organization_id
+    ))).scalars().first()
+    if not suggestion:
+        raise HTTPException(status_code=404, detail="Suggestion not found")
+    if suggestion.status != "open":
+        raise HTTPException(status_code=409, detail=f"Suggestion already {suggestion.status}")
+
+    if action == "merge":
+        leads = {lead.id: lead for lead in (await db.execute(select(Lead).where(
+            Lead.organization_id == organization_id,
+            Lead.id.in_([suggestion.lead_id, suggestion.duplicate_id])
+        ))).scalars()}
+        kept, duplicate = leads.get(suggestion.lead_id), leads.get(suggestion.duplicate_id)
+        if kept is None or duplicate is None:
+            raise HTTPException(status_code=404, detail="Lead no longer exists")
+        for field in _MERGED_FIELDS:
+            if getattr(kept, field) is None and getattr(duplicate, field) is not None:
+                setattr(kept, field, getattr(duplicate, field))
+        kept.lead_score = max(kept.lead_score or 0, duplicate.lead_score or 0)
+        # The duplicate row goes; the suggestion keeps what it looked like
+        suggestion.duplicate_snapshot = orjson.dumps({
+            "id": duplicate.id, "name": duplicate.name, "email": duplicate.email,
+            "phone": duplicate.phone, "status": duplicate.status,
+        }).decode()
+        suggestion.duplicate_id = None
+        await db.execute(delete(LeadLshBucket).where(LeadLshBucket.lead_id == duplicate.id))
+        await db.execute(delete(LeadSignature).where(LeadSignature.lead_id == duplicate.id))
+        await db.delete(duplicate)
+        suggestion.status = "merged"
+    else:
+        suggestion.status = "dismissed"
+    suggestion.resolved_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(suggestion)
+    return suggestion
@@ -0,0 +1,215 @@
+import asyncio
+import codecs
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.normalize import normalize_email, normalize_phone
+from app.models.lead import Lead
+from app.models.change_log import change_entry, inserted_values, log_changes
+from app.models.org_aggregate import apply_deltas, insert_deltas
+from app.schemas.lead import LeadCreate
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Values per IN (...) lookup, kept under SQLite's default bound-parameter limit
+_LOOKUP_BATCH = 500
+
+# (line number, parsed record or None, parse error or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """
+    Guess the upload format from the file name, then the content type.
+    """
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or (content_type or "").endswith(("ndjson", "jsonl")):
+        return "ndjson"
+    if name.endswith(".csv") or content_type in ("text/csv", "application/vnd.ms-excel"):
+        return "csv"
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Could not tell the file format; pass format=csv or format=ndjson",
+    )
+
+
+def iter_csv_records(binary: IO[bytes]) -> Iterator[Record]:
+    """
+    Stream rows of a CSV file with a header line, decoding incrementally.
+    """
+    text = codecs.getreader("utf-8-sig")(binary)
+    reader = csv.DictReader(text)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except (csv.Error, UnicodeDecodeError) as exc:
+            # The rest of the file can't be read reliably
+            yield reader.line_num, None, f"Unreadable CSV: {exc}"
+            return
+        if None in row:
+            yield reader.line_num, None, "Row has more fields than the header"
+            continue
+        yield reader.line_num, row, None
+
+
+def iter_ndjson_records(binary: IO[bytes]) -> Iterator[Record]:
+    """
+    Stream one JSON object per line, skipping blank lines.
+    """
+    for line_number, raw in enumerate(binary, start=1):
+        if not raw.strip():
+            continue
+        try:
+            record = json.loads(raw)
+        except (ValueError, UnicodeDecodeError) as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def _validate_chunk(records: Iterator[Record], size: int, organization_id) -> Tuple[int, List[Tuple[int, Dict]], List[Dict]]:
+    """
+    Read and validate up to `size` records. Runs in a worker thread so parsing a large
+    file doesn't hold up the event loop.
+    """
+    read = 0
+    rows, errors = [], []
+    for line, record, error in islice(records, size):
+        read += 1
+        if error is not None:
+            errors.append({"line": line, "errors": [error]})
+            continue
+        # Rows always land in the importer's organization, whatever the file says
+        record = {key: value for key, value in record.items() if key and key != "org_id"}
+        try:
+            lead = LeadCreate(**record, org_id=organization_id)
+        except ValidationError as exc:
+            errors.append({
+                "line": line,
+                "errors": [f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in exc.errors()],
+            })
+            continue
+        rows.append((line, {
+            "name": lead.name,
+            "email": lead.email,
+            "phone": lead.phone,
+            "email_normalized": normalize_email(lead.email),
+            "phone_normalized": normalize_phone(lead.phone),
+            "organization_id": organization_id,
+        }))
+    return read, rows, errors
+
+
+async def _existing_keys(db: AsyncSession, organization_id, column, values: Set[str]) -> Set[str]:
+    found = set()
+    values = list(values)
+    for start in range(0, len(values), _LOOKUP_BATCH):
+        batch = values[start:start + _LOOKUP_BATCH]
+        result = await db.execute(
+            select(column).where(Lead.organization_id == organization_id, column.in_(batch))
+        )
+        found.update(result.scalars())
+    return found
+
+
+async def _dedupe(db: AsyncSession, organization_id, rows: List[Tuple[int, Dict]]) -> Tuple[List[Dict], List[int]]:
+    """
+    Drop rows whose normalized email or phone is already in the org or earlier in the chunk.
+    Earlier chunks are committed by then, so the database check covers them too.
+    """
+    emails = {row["email_normalized"] for _, row in rows if row["email_normalized"]}
+    phones = {row["phone_normalized"] for _, row in rows if row["phone_normalized"]}
+    seen_emails = await _existing_keys(db, organization_id, Lead.email_normalized, emails)
+    seen_phones = await _existing_keys(db, organization_id, Lead.phone_normalized, phones)
+
+    fresh, duplicates = [], []
+    for line, row in rows:
+        email, phone = row["email_normalized"], row["phone_normalized"]
+        if (email and email in seen_emails) or (phone and phone in seen_phones):
+            duplicates.append(line)
+            continue
+        if email:
+            seen_emails.add(email)
+        if phone:
+            seen_phones.add(phone)
+        fresh.append(row)
+    return fresh, duplicates
+
+
+async def _insert_leads(db: AsyncSession, rows: List[Dict]) -> List[int]:
+    """
+    Insert `rows` with one executemany INSERT and return their ids, in the rows' order.
+
+    On SQLite the ids are read back as the last len(rows) values: an INTEGER PRIMARY KEY
+    without AUTOINCREMENT gets max(id) + 1, and the transaction holds the write lock from
+    the first row on, so the batch's ids are consecutive. (INSERT ... RETURNING in
+    parameter order would be run one row at a time there.) Other databases return the ids
+    from the INSERT itself, which they can batch.
+    """
+    table = Lead.__table__
+    if db.bind.dialect.name != "sqlite":
+        return (await db.execute(table.insert().returning(table.c.id, sort_by_parameter_order=True), rows)).scalars().all()
+    await db.execute(table.insert(), rows)
+    last = (await db.execute(select(func.max(table.c.id)))).scalar_one()
+    return list(range(last - len(rows) + 1, last + 1))
+
+
+async def import_leads(db: AsyncSession, organization_id, records: Iterator[Record], chunk_size: Optional[int] = None) -> Dict:
+    """
+    Validate, dedupe and insert leads from `records` one chunk at a time.
+
+    Each chunk is a single executemany INSERT in its own transaction, so memory stays bounded
+    by the chunk size and a failure part-way through keeps the chunks already committed.
+    Returns counts plus the first LEAD_IMPORT_MAX_REPORTED_ERRORS row errors.
+    """
+    chunk_size = chunk_size or settings.LEAD_IMPORT_CHUNK_SIZE
+    max_errors = settings.LEAD_IMPORT_MAX_REPORTED_ERRORS
+    report = {"rows": 0, "inserted": 0, "duplicates": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def report_errors(errors: List[Dict]):
+        room = max_errors - len(report["errors"])
+        report["errors"].extend(errors[:room])
+        if len(errors) > room:
+            report["errors_truncated"] = True
+
+    while True:
+        read, rows, errors = await asyncio.to_thread(_validate_chunk, records, chunk_size, organization_id)
+        if not read:
+            break
+        report["rows"] += read
+        report["failed"] += len(errors)
+
+        fresh, duplicates = await _dedupe(db, organization_id, rows)
+        report["duplicates"] += len(duplicates)
+        errors.extend({"line": line, "errors": ["Duplicate email or phone"]} for line in duplicates)
+        report_errors(sorted(errors, key=lambda error: error["line"]))
+        if fresh:
+            now = datetime.utcnow()  # explicit, so the change log records the stored timestamps
+            for row in fresh:
+                row["created_at"] = row["updated_at"] = now
+            ids = await _insert_leads(db, fresh)
+            # Core inserts skip the session's aggregate and change-log hooks, so record them here
+            deltas = insert_deltas(Lead, fresh)
+            changes = [
+                change_entry(Lead, "insert", lead_id, organization_id, inserted_values(Lead, {"id": lead_id, **row}))
+                for lead_id, row in zip(ids, fresh)
+            ]
+            await db.run_sync(lambda session: apply_deltas(session.connection(), deltas))
+            await db.run_sync(lambda session: log_changes(session.connection(), changes))
+        await db.commit()
+        report["inserted"] += len(fresh)
+    return report
@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func, select
+from app.core.projection import Projection
+from app.models.lead import Lead
+from app.schemas.lead import LeadResponse
+
+# Columns the list and search endpoints return, rendered without building Lead entities
+LEAD_RESPONSE_PROJECTION = Projection(LeadResponse, Lead, score=func.coalesce(Lead.lead_score, 0))
+
+
+def filter_leads(
+    organization_id,
+    status: Optional[str] = None,
+    assigned_to_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+):
+    """
+    Build the tenant-scoped leads select used by the list endpoint.
+    """
+    query = select(Lead).where(Lead.organization_id == organization_id)
+    if status is not None:
+        query = query.where(Lead.status == status)
+    if assigned_to_id is not None:
+        query = query.where(Lead.assigned_to_id == assigned_to_id)
+    if created_after is not None:
+        query = query.where(Lead.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(Lead.created_at < created_before)
+    return query
@@ -1,12 +1,12 @@
 # app/services/notification_service.py
-from app.core.email import send_email
-import smtplib
-from email.mime.text import MIMEText
-from app.core.config import settings
+from app.services.email_outbox import enqueue_email
 
 class NotificationService:
     @staticmethod
-    def send_temporary_password(email: str, temp_password: str, first_name: str):
+    def send_temporary_password(db, email: str, temp_password: str, first_name: str):
+        """
+        Queue the welcome email in `db`; it goes out after the caller commits.
+        """
         subject = "Your Temporary Password for Smart CRM"
         body = f"""
 Hi {first_name},
@@ -20,4 +20,4 @@ Please login and change your password immediately.
 Regards,
 Smart CRM Team
 """
-        send_email(email, subject, body)
+        return enqueue_email(db, email, subject, body)
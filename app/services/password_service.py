@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import pwd_context
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification in a bounded worker pool behind an async API.
+
+    bcrypt/argon2 are deliberately slow and release the GIL while they work, so a small
+    thread pool keeps the event loop free during a login storm. At most `max_workers`
+    operations run at once. Once `max_queue` are waiting, callers get 503 instead of
+    queueing without bound.
+    """
+
+    def __init__(
+        self,
+        context: CryptContext = pwd_context,
+        max_workers: int = settings.PASSWORD_HASH_WORKERS,
+        max_queue: int = settings.PASSWORD_HASH_MAX_QUEUE,
+    ):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0  # submitted and not finished (running + queued)
+        self.peak_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            queued = max(0, self._pending - self.max_workers)
+            if queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent sign-ins, please retry shortly",
+                )
+            self._pending += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self._pending - self.max_workers)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, if its hash is deprecated or under the configured cost,
+        return a fresh hash for the caller to persist (otherwise None).
+        """
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if new_hash is not None:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "in_flight": min(self._pending, self.max_workers),
+                "queue_depth": max(0, self._pending - self.max_workers),
+                "peak_queue_depth": self.peak_queue_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+def calibrate_bcrypt_rounds(target_ms: int, minimum: int = 10, maximum: int = 16) -> int:
+    """
+    Pick the highest bcrypt cost whose hash takes no longer than `target_ms` on this host.
+    Each extra round doubles the work, so one timing at the minimum is enough to extrapolate.
+    """
+    start = time.perf_counter()
+    CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=minimum).hash("calibration")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    rounds = minimum
+    while rounds < maximum and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+def apply_adaptive_cost(context: CryptContext = pwd_context) -> int:
+    """
+    Re-tune `context` to PASSWORD_HASH_TARGET_MS. Existing cheaper hashes then report
+    needs_update and are upgraded on the user's next login.
+    """
+    rounds = settings.BCRYPT_ROUNDS
+    if settings.PASSWORD_HASH_TARGET_MS > 0:
+        rounds = max(rounds, calibrate_bcrypt_rounds(settings.PASSWORD_HASH_TARGET_MS))
+        context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+    return rounds
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,260 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import tenant_sessionmaker
+from app.models.change_log import ChangeLogEntry
+from app.services.change_log import commit_offset, read_changes
+from app.services.document_changes import (  # noqa: F401  (re-exported)
+    DOCUMENT_MODELS, KIND_ARTICLE, KIND_COMPLAINT, KIND_LEAD, LOGGED_KINDS, TEXT_COLUMNS, changes_document,
+    document_chunks,
+)
+from app.services.embeddings import content_hash, get_embedding_cache
+from app.services.vector_index import VectorIndex, decode_key, encode_key, vector_indexes
+
+logger = logging.getLogger(__name__)
+
+KIND_NAMES = {KIND_LEAD: "lead", KIND_COMPLAINT: "complaint", KIND_ARTICLE: "article"}
+
+SYNC_CHUNK_SIZE = 1000
+
+INDEX_CONSUMER = "vector_index"  # change-log consumer name of the per-organization indexes
+
+_index_builds: Dict[int, asyncio.Task] = {}  # organization id -> background build or catch-up
+
+
+def _index_for(organization_id) -> VectorIndex:
+    embedder = get_embedding_cache().embedder
+    return vector_indexes.get(organization_id, embedder.dim, embedder.name)
+
+
+def apply_documents(index: VectorIndex, kind: int, documents: Dict[int, Optional[List[str]]]) -> Tuple[int, int]:
+    """
+    Bring the index in line with `documents` (row id -> chunk texts, or None if deleted),
+    embedding only chunks whose content hash changed. Returns (added, removed).
+    """
+    keys, hashes, texts = [], [], []
+    for row_id, chunks in documents.items():
+        for number, chunk in enumerate(chunks or []):
+            keys.append(encode_key(kind, row_id, number))
+            hashes.append(content_hash(chunk))
+            texts.append(chunk)
+    cache = get_embedding_cache()
+    return index.update_documents(
+        kind,
+        list(documents),
+        keys,
+        hashes,
+        lambda positions: cache.embed([texts[p] for p in positions], [hashes[p] for p in positions]),
+    )
+
+
+async def _load_documents(db: AsyncSession, organization_id, kind: int, row_ids: Sequence[int]) -> Dict[int, Optional[List[str]]]:
+    model = DOCUMENT_MODELS[kind]
+    columns = [model.id] + [getattr(model, name) for name in TEXT_COLUMNS[kind]]
+    rows = (await db.execute(
+        select(*columns).where(model.organization_id == organization_id, model.id.in_(list(row_ids)))
+    )).all()
+    documents = {row_id: None for row_id in row_ids}
+    documents.update({row.id: document_chunks(kind, row) for row in rows})
+    return documents
+
+
+@asynccontextmanager
+async def _writing(index: VectorIndex):
+    # The lock is waited for in a thread, so other requests keep running meanwhile
+    await asyncio.to_thread(index.acquire)
+    try:
+        yield index
+    finally:
+        await asyncio.to_thread(index.release)
+
+
+def _log_source(db: AsyncSession) -> str:
+    # Which database's change log the index follows; a tenant move changes it
+    return db.bind.url.render_as_string(hide_password=True)
+
+
+async def _latest_change(db: AsyncSession, organization_id) -> int:
+    return (await db.execute(
+        select(func.max(ChangeLogEntry.seq)).where(ChangeLogEntry.organization_id == organization_id)
+    )).scalar() or 0
+
+
+async def _apply_changes(db: AsyncSession, organization_id, index: VectorIndex) -> Tuple[int, int]:
+    """
+    Replay the change-log entries after the index's offset, re-reading the documents they
+    touched. Returns (added, removed).
+    """
+    added = removed = 0
+    has_more = True
+    while has_more:
+        entries, offset, has_more = await read_changes(db, organization_id, index.log_offset, SYNC_CHUNK_SIZE)
+        touched: Dict[int, set] = {}
+        for entry in entries:
+            kind = LOGGED_KINDS.get(entry["entity"])
+            if kind is not None and changes_document(kind, entry["op"], entry["changes"]):
+                touched.setdefault(kind, set()).add(entry["row_id"])
+        for kind, row_ids in touched.items():
+            documents = await _load_documents(db, organization_id, kind, sorted(row_ids))
+            chunk_added, chunk_removed = await asyncio.to_thread(apply_documents, index, kind, documents)
+            added += chunk_added
+            removed += chunk_removed
+        index.log_offset = offset
+    return added, removed
+
+
+async def _resync(db: AsyncSession, organization_id, index: VectorIndex) -> Tuple[int, int]:
+    # Changes committed while the tables are read are replayed from the log afterwards
+    latest = await _latest_change(db, organization_id)
+    added = removed = 0
+    for kind, model in DOCUMENT_MODELS.items():
+        columns = [model.id] + [getattr(model, name) for name in TEXT_COLUMNS[kind]]
+        present, last_id = [], 0
+        while True:
+            rows = (await db.execute(
+                select(*columns)
+                .where(model.organization_id == organization_id, model.id > last_id)
+                .order_by(model.id)
+                .limit(SYNC_CHUNK_SIZE)
+            )).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            present.extend(row.id for row in rows)
+            chunk_added, chunk_removed = await asyncio.to_thread(
+                apply_documents, index, kind, {row.id: document_chunks(kind, row) for row in rows}
+            )
+            added += chunk_added
+            removed += chunk_removed
+        removed += await asyncio.to_thread(index.remove_missing, kind, present)
+    index.synced, index.log_source, index.log_offset = True, _log_source(db), latest
+    return added, removed
+
+
+async def update_org_index(db: AsyncSession, organization_id, index: VectorIndex, full: bool = False) -> Tuple[int, int]:
+    """
+    Bring the organization's index up to date with its change log: replay the entries it
+    hasn't seen, or resync from the tables if it was never built, `full` is asked for, or the
+    organization's data moved to another database. Whichever worker gets there first does
+    the work, as the index's only writer; the others find it done.
+
+    The offset reached is committed as the `vector_index` consumer's, so pruning keeps the
+    entries the index hasn't seen. Returns (added, removed).
+    """
+    added = removed = 0
+    async with _writing(index):
+        if full or not index.synced or index.log_source != _log_source(db):
+            added, removed = await _resync(db, organization_id, index)
+        elif index.log_offset < await _latest_change(db, organization_id):
+            added, removed = await _apply_changes(db, organization_id, index)
+        await commit_offset(db, organization_id, INDEX_CONSUMER, index.log_offset)
+    return added, removed
+
+
+async def sync_org_index(db: AsyncSession, organization_id) -> Dict:
+    """
+    Reconcile the organization's index with its leads, complaints and articles.
+
+    Used for the first build and as a repair job. Unchanged documents cost a hash
+    comparison; only new or edited ones are embedded.
+    """
+    index = _index_for(organization_id)
+    added, removed = await update_org_index(db, organization_id, index, full=True)
+    return {"added": added, "removed": removed, **index.stats()}
+
+
+async def _update_in_background(organization_id: int):
+    try:
+        sessions = await tenant_sessionmaker(organization_id)
+        async with sessions() as db:
+            await update_org_index(db, organization_id, _index_for(organization_id))
+    except Exception:
+        logger.exception("Updating the vector index of organization %s failed", organization_id)
+    finally:
+        _index_builds.pop(organization_id, None)
+
+
+def _start_update(organization_id: int):
+    # One per organization: queries arriving meanwhile find it running
+    if organization_id not in _index_builds:
+        _index_builds[organization_id] = asyncio.create_task(_update_in_background(organization_id))
+
+
+async def stop_index_updates():
+    """
+    Cancel the background builds and catch-ups still running, at shutdown.
+    """
+    tasks = list(_index_builds.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def retrieve(db: AsyncSession, organization_id: int, query: str, k: Optional[int] = None) -> List[Dict]:
+    """
+    Top-k leads, complaints and article chunks of the organization most similar to `query`.
+
+    A short change-log gap is replayed before searching. An index that was never built, or
+    whose organization moved to another database, is rebuilt in the background and the query
+    gets 503 meanwhile; a longer gap is caught up in the background while the query searches
+    the index as it is.
+    """
+    k = k or settings.RETRIEVAL_TOP_K
+    index = _index_for(organization_id)
+    await asyncio.to_thread(index.refresh)
+    if not index.synced or index.log_source != _log_source(db):
+        _start_update(organization_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The organization's search index is being built; retry shortly",
+            headers={"Retry-After": str(settings.RETRIEVAL_BUILD_RETRY_AFTER)},
+        )
+    behind = await _latest_change(db, organization_id) - index.log_offset
+    if behind > settings.RETRIEVAL_INLINE_CATCHUP_MAX:
+        _start_update(organization_id)
+    elif behind > 0 and organization_id not in _index_builds:
+        await update_org_index(db, organization_id, index)
+
+    query_vector = get_embedding_cache().embed([query])[0]
+    hits = await asyncio.to_thread(index.search, query_vector, k)
+    return await _describe_hits(db, organization_id, hits)
+
+
+async def _describe_hits(db: AsyncSession, organization_id, hits: List[Tuple[int, float]]) -> List[Dict]:
+    decoded = [(decode_key(key), score) for key, score in hits]
+    rows: Dict[Tuple[int, int], object] = {}
+    for kind, model in DOCUMENT_MODELS.items():
+        row_ids = {row_id for (hit_kind, row_id, _), _ in decoded if hit_kind == kind}
+        if row_ids:
+            result = await db.execute(
+                select(model).where(model.organization_id == organization_id, model.id.in_(row_ids))
+            )
+            rows.update({(kind, row.id): row for row in result.scalars()})
+
+    described = []
+    for (kind, row_id, chunk), score in decoded:
+        row = rows.get((kind, row_id))
+        if row is None:
+            continue  # deleted since it was indexed
+        if kind == KIND_LEAD:
+            title = row.name
+            snippet = ", ".join(part for part in (row.email, row.phone, row.status) if part)
+        elif kind == KIND_COMPLAINT:
+            title = row.title
+            snippet = (row.description or "")[:300]
+        else:
+            title = row.title
+            chunks = document_chunks(kind, row)
+            snippet = chunks[chunk].split("\n", 1)[-1][:300] if chunk < len(chunks) else ""
+        described.append({
+            "kind": KIND_NAMES[kind], "id": row_id, "chunk": chunk, "score": round(score, 4),
+            "title": title, "snippet": snippet,
+        })
+    return described
@@ -0,0 +1,95 @@
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, column, func, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.projection import Projection
+from app.models.complaint import Complaint
+from app.models.lead import Lead
+from app.models.search_index import FTS_TABLES
+
+_TERM = re.compile(r"\w+")
+MAX_TERMS = 8
+
+# BM25 column weights, in FTS_TABLES column order; organization_id only scopes the match
+BM25_WEIGHTS = {
+    Lead: (10.0, 5.0, 3.0, 3.0, 0.0),        # name, email, phone, phone_normalized
+    Complaint: (8.0, 2.0, 0.0),              # title, description
+}
+
+
+def build_match(model, organization_id: int, q: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a free-text query: every word must appear (as a prefix) in one
+    of the text columns, and the row must belong to the organization. None if `q` has no
+    searchable words.
+
+    Words are re-quoted, so FTS5 operators or syntax in the input are matched literally.
+    """
+    terms = _TERM.findall(q)[:MAX_TERMS]
+    if not terms:
+        return None
+    _, columns = FTS_TABLES[model.__tablename__]
+    text_columns = " ".join(name for name in columns if name != "organization_id")
+    words = " AND ".join(f'"{term}"*' for term in terms)
+    return f'organization_id : "{int(organization_id)}" AND {{{text_columns}}} : ({words})'
+
+
+async def search_rows(
+    db: AsyncSession, model, organization_id: int, q: str, limit: int, offset: int = 0, projection: Optional[Projection] = None,
+) -> Tuple[List, Optional[int]]:
+    """
+    One page of the organization's leads or complaints matching `q`, best match first.
+    `organization_id` is the integer tenant id; endpoints reject callers without one first.
+
+    Returns (rows, next_offset); next_offset is None on the last page. Ranking happens inside
+    the FTS index, so only the page's rows are loaded from the base table. With a
+    `projection` the rows are its column tuples instead of entities.
+    """
+    selected = projection.columns if projection is not None else [model]
+    match = build_match(model, organization_id, q)
+    if match is None:
+        return [], None
+
+    if db.get_bind().dialect.name == "sqlite":
+        fts_name, _ = FTS_TABLES[model.__tablename__]
+        fts = table(fts_name, column("rowid"))
+        rank = func.bm25(literal_column(fts_name), *BM25_WEIGHTS[model]).label("rank")
+        hits = (
+            select(fts.c.rowid.label("id"), rank)
+            .where(literal_column(fts_name).op("MATCH")(match))
+            .order_by(rank)
+            .limit(limit + 1)
+            .offset(offset)
+            .subquery()
+        )
+        query = (
+            select(*selected)
+            .select_from(model)
+            .join(hits, model.id == hits.c.id)
+            .where(model.organization_id == organization_id)
+            .order_by(hits.c.rank)
+        )
+    else:
+        # No FTS5: every word as a case-insensitive prefix of a word in a text column
+        _, columns = FTS_TABLES[model.__tablename__]
+        text_columns = [getattr(model, name) for name in columns if name != "organization_id"]
+        words = _TERM.findall(q)[:MAX_TERMS]
+        query = (
+            select(*selected)
+            .where(model.organization_id == organization_id)
+            .where(and_(*(
+                or_(*(or_(col.ilike(f"{word}%"), col.ilike(f"% {word}%")) for col in text_columns))
+                for word in words
+            )))
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(limit + 1)
+            .offset(offset)
+        )
+
+    result = await db.execute(query)
+    rows = list(result.all() if projection is not None else result.scalars().all())
+    if len(rows) > limit:
+        return rows[:limit], offset + limit
+    return rows, None
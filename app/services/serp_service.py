@@ -1,52 +1,288 @@
-from typing import List, Dict
-from fastapi import HTTPException, status
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
 import httpx
-from app.models.user import User
-from app.models.organization import SubscriptionTier
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.principal_cache import Principal
 from app.services.subscription_service import SubscriptionService
 
+LookupKey = Tuple[str, str]
+
+
+def normalize_lookup(search_query: str, location: str) -> LookupKey:
+    """
+    Cache key for a lookup: case and whitespace differences don't make a new paid request.
+    """
+    return " ".join(search_query.lower().split()), " ".join(location.lower().split())
+
+
+def extract_leads(data: Dict) -> List[Dict]:
+    return [
+        {"name": item.get("title"), "email": item.get("email"), "phone": item.get("phone")}
+        for item in data.get("organic_results", [])
+    ]
+
+
+class SerpClient:
+    """
+    One pooled `httpx.AsyncClient` shared by every lookup, created on first use and closed
+    on shutdown. `transport` lets tests route requests to a stub without a network.
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.SERPAPI_BASE_URL,
+        api_key: str = settings.SERPAPI_API_KEY,
+        max_connections: int = settings.SERPAPI_MAX_CONNECTIONS,
+        timeout: float = settings.SERPAPI_TIMEOUT_SECONDS,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+            # Lookups past the pool size wait here rather than timing out on the pool
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return self._client
+
+    async def search(self, search_query: str, location: str) -> Dict:
+        client = self._get_client()
+        params = {
+            "q": f"{search_query} in {location}",
+            "engine": "google",
+            "api_key": self.api_key,
+        }
+        async with self._slots:
+            try:
+                response = await client.get(self.base_url, params=params)
+            except httpx.HTTPError:
+                response = None
+        if response is None or response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Failed to fetch leads from SerpAPI"
+            )
+        return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class SerpResponseCache:
+    """
+    In-process TTL + LRU cache of extracted leads keyed by normalized (query, location).
+
+    Also tracks lookups in flight, so concurrent requests for the same key share one
+    upstream call instead of each paying for it.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.SERPAPI_CACHE_TTL_SECONDS,
+        max_entries: int = settings.SERPAPI_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[LookupKey, tuple]" = OrderedDict()  # key -> (leads, expires_at)
+        self._lock = threading.Lock()
+        self.pending: Dict[LookupKey, asyncio.Future] = {}
+
+    def get(self, key: LookupKey) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            leads, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return leads
+
+    def put(self, key: LookupKey, leads: List[Dict]):
+        with self._lock:
+            self._entries[key] = (leads, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TenantQuota:
+    """
+    Per-organization limits on upstream lookups: a daily count (UTC) and a cap on how
+    many can be in flight at once, so one tenant's campaign can't take the whole pool.
+    """
+
+    def __init__(
+        self,
+        daily_limit: int = settings.SERPAPI_TENANT_DAILY_QUOTA,
+        concurrency: int = settings.SERPAPI_TENANT_CONCURRENCY,
+    ):
+        self.daily_limit = daily_limit
+        self.concurrency = concurrency
+        self._used: Dict[str, Tuple[str, int]] = {}  # org -> (day, lookups)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def consume(self, organization_id: str) -> bool:
+        """
+        Count one lookup against today's quota; False (and nothing counted) once it's used up.
+        """
+        today = datetime.utcnow().date().isoformat()
+        with self._lock:
+            day, used = self._used.get(organization_id, (today, 0))
+            if day != today:
+                used = 0
+            if used >= self.daily_limit:
+                return False
+            self._used[organization_id] = (today, used + 1)
+            return True
+
+    def refund(self, organization_id: str):
+        """
+        Give back a lookup that failed upstream.
+        """
+        with self._lock:
+            day, used = self._used.get(organization_id, ("", 0))
+            if used:
+                self._used[organization_id] = (day, used - 1)
+
+    def remaining(self, organization_id: str) -> int:
+        today = datetime.utcnow().date().isoformat()
+        with self._lock:
+            day, used = self._used.get(organization_id, (today, 0))
+            return self.daily_limit - (used if day == today else 0)
+
+    def semaphore(self, organization_id: str) -> asyncio.Semaphore:
+        with self._lock:
+            if organization_id not in self._semaphores:
+                self._semaphores[organization_id] = asyncio.Semaphore(self.concurrency)
+            return self._semaphores[organization_id]
+
+
+serp_client = SerpClient()
+serp_cache = SerpResponseCache()
+serp_quota = TenantQuota()
+
+
 class SerpAPIService:
     """
     Service to generate leads using SerpAPI.
     Only available for premium subscribers.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[SerpClient] = None,
+        cache: Optional[SerpResponseCache] = None,
+        quota: Optional[TenantQuota] = None,
+    ):
         self.subscription_service = SubscriptionService()
-        # You can put your SerpAPI key here or read from env
-        self.api_key = "YOUR_SERPAPI_KEY"
-        self.base_url = "https://serpapi.com/search"
+        self.client = client or serp_client
+        self.cache = cache or serp_cache
+        self.quota = quota or serp_quota
 
-    async def generate_leads(self, user: User, search_query: str, location: str) -> List[Dict]:
-        """
-        Generate leads from SerpAPI if user subscription allows.
-        """
-        # Check subscription access
-        if not self.subscription_service.check_feature_access(user.organization, "ai_scoring"):
+    async def _check_access(self, user: Principal):
+        if not await self.subscription_service.has_feature(user.organization_id, "ai_scoring"):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Lead generation feature is only available for premium subscribers."
             )
 
-        # Example: Call SerpAPI (replace with real API call)
-        params = {
-            "q": f"{search_query} in {location}",
-            "engine": "google",
-            "api_key": self.api_key,
-        }
+    async def lookup(self, organization_id, search_query: str, location: str) -> Tuple[List[Dict], bool]:
+        """
+        Leads for one query/location and whether they came without a paid request (from the
+        cache, or by joining an identical lookup already in flight).
+
+        Raises 429 once the organization's daily quota is used up and 502 if SerpAPI fails;
+        failed lookups don't count against the quota.
+        """
+        key = normalize_lookup(search_query, location)
+        leads = self.cache.get(key)
+        if leads is not None:
+            return leads, True
+        pending = self.cache.pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending), True
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(self.base_url, params=params)
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="Failed to fetch leads from SerpAPI"
-                )
-
-            data = response.json()
-            # Example: extract leads from API response
-            leads = [
-                {"name": item.get("title"), "email": item.get("email"), "phone": item.get("phone")}
-                for item in data.get("organic_results", [])
-            ]
+        organization_id = str(organization_id)
+        if not self.quota.consume(organization_id):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Daily lead generation quota reached for this organization"
+            )
+        future = asyncio.get_running_loop().create_future()
+        self.cache.pending[key] = future
+        try:
+            async with self.quota.semaphore(organization_id):
+                data = await self.client.search(*key)
+            leads = extract_leads(data)
+            self.cache.put(key, leads)
+            future.set_result(leads)
+            return leads, False
+        except BaseException as exc:
+            self.quota.refund(organization_id)
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
+                future.exception()  # retrieved here, so no warning when nobody else was waiting
+            raise
+        finally:
+            self.cache.pending.pop(key, None)
+
+    async def generate_leads(self, user: Principal, search_query: str, location: str) -> List[Dict]:
+        """
+        Generate leads from SerpAPI if user subscription allows.
+        """
+        await self._check_access(user)
+        leads, _ = await self.lookup(user.organization_id, search_query, location)
         return leads
+
+    async def generate_leads_batch(self, user: Principal, lookups: Sequence[Tuple[str, str]]) -> List[Dict]:
+        """
+        Run many query/location lookups concurrently, in input order. Each result carries its
+        own leads or error, so one failed or over-quota lookup doesn't fail the batch.
+        """
+        await self._check_access(user)
+        if len(lookups) > settings.SERPAPI_BATCH_MAX:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"At most {settings.SERPAPI_BATCH_MAX} lookups per batch"
+            )
+
+        async def run(search_query: str, location: str) -> Dict:
+            result = {"query": search_query, "location": location, "leads": [], "cached": False, "error": None}
+            try:
+                result["leads"], result["cached"] = await self.lookup(user.organization_id, search_query, location)
+            except HTTPException as exc:
+                result["error"] = exc.detail
+            return result
+
+        return list(await asyncio.gather(*(run(query, location) for query, location in lookups)))
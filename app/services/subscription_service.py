@@ -1,5 +1,6 @@
 from uuid import UUID
 from sqlalchemy.orm import Session
+from app.core.entitlements import TIER_FEATURES, org_tiers, tier_allows
 from app.models.organization import Organization, SubscriptionTier
 from app.models.database import get_db
 from fastapi import HTTPException, status
@@ -9,19 +10,19 @@ class SubscriptionService:
     Handles subscription tier checks and upgrades for organizations.
     """
 
-    # Example feature mapping per subscription tier
-    FEATURE_MATRIX = {
-        SubscriptionTier.FREE: ["basic_dashboard", "limited_leads"],
-        SubscriptionTier.BASIC: ["basic_dashboard", "limited_leads", "ai_scoring"],
-        SubscriptionTier.PREMIUM: ["basic_dashboard", "limited_leads", "ai_scoring", "priority_support"],
-    }
+    FEATURE_MATRIX = TIER_FEATURES
 
     def check_feature_access(self, org: Organization, feature: str) -> bool:
         """
         Returns True if the organization's subscription tier allows access to the feature.
         """
-        allowed_features = self.FEATURE_MATRIX.get(org.subscription_tier, [])
-        return feature in allowed_features
+        return tier_allows(org.subscription_tier, feature)
+
+    async def has_feature(self, organization_id, feature: str) -> bool:
+        """
+        Same check by organization id, with the tier taken from the entitlement cache.
+        """
+        return tier_allows(await org_tiers.resolve(organization_id), feature)
 
     async def upgrade_subscription(self, org_id: UUID, new_tier: SubscriptionTier, db: Session):
         """
@@ -45,4 +46,5 @@ class SubscriptionService:
         org.subscription_tier = new_tier
         db.commit()
         db.refresh(org)
+        org_tiers.invalidate(org.id)
         return org
@@ -0,0 +1,253 @@
+import re
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import String
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.core.config import settings
+from app.db import DEFAULT_SHARD, shard_directory, tenant_engines
+from app.models.change_log import ChangeConsumer, ChangeLogEntry
+from app.models.complaint import Complaint
+from app.models.database import Base, engine as main_engine
+from app.models.knowledge_article import KnowledgeArticle
+from app.models.lead import Lead
+from app.models.lead_dedupe import LeadLshBucket, LeadMergeSuggestion, LeadSignature
+from app.models.lead_scoring_run import LeadScoringRun
+from app.models.org_aggregate import OrgAggregate
+from app.models.tenant_shard import TenantShard
+from app.models.user import User
+from app.services.analytical_service import rebuild_org_aggregates
+
+# Copied row for row, ids included. Users stay authoritative in the main database (login
+# and authentication read them there); shards get a copy so tenant-local joins still work.
+TENANT_MODELS = (Lead, Complaint, KnowledgeArticle)
+# Derived per-tenant data that is not copied: aggregates are recounted on the target at
+# cutover, and the next scoring and dedupe runs there are full runs. The change log is
+# numbered per database and the copy itself logs nothing: consumers continue on the target
+# from offset 0, and entries they hadn't read on the source are not carried over, so they
+# should rescan the tenant once after a move (see app/services/change_log.py). User entries
+# stay in the main database's log and are relayed into a shard's log as it is read.
+DERIVED_MODELS = (
+    OrgAggregate, LeadScoringRun, LeadSignature, LeadLshBucket, LeadMergeSuggestion, ChangeLogEntry, ChangeConsumer,
+)
+
+SHARD_NAME = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+def shard_engine(shard: str) -> Engine:
+    return main_engine if shard == DEFAULT_SHARD else tenant_engines.get_engine(shard)
+
+
+def current_shard(organization_id: int) -> Tuple[str, bool]:
+    with main_engine.connect() as conn:
+        row = conn.execute(
+            select(TenantShard.shard, TenantShard.frozen).where(TenantShard.organization_id == organization_id)
+        ).first()
+    return (row.shard, row.frozen) if row else (DEFAULT_SHARD, False)
+
+
+def set_shard(organization_id: int, shard: str, frozen: bool, shards: Sequence[str] = ()):
+    """
+    Point the organization at `shard` in one transaction: the atomic flip of a move. The
+    entry is then copied into the tenant_shards table of each shard database in `shards`,
+    the ones holding the organization's data, where their writers' commits check it (see
+    app/db.py's _check_tenant_route).
+    """
+    engines = [main_engine] + [shard_engine(name) for name in shards if name != DEFAULT_SHARD]
+    for engine in engines:
+        with engine.begin() as conn:
+            updated = conn.execute(
+                TenantShard.__table__.update()
+                .where(TenantShard.organization_id == organization_id)
+                .values(shard=shard, frozen=frozen)
+            ).rowcount
+            if not updated:
+                conn.execute(TenantShard.__table__.insert(), [{"organization_id": organization_id, "shard": shard, "frozen": frozen}])
+    shard_directory.invalidate(organization_id)
+
+
+def _org_value(table, organization_id: int):
+    # users.organization_id is a string column
+    return str(organization_id) if isinstance(table.c.organization_id.type, String) else organization_id
+
+
+def _upsert(connection, table, rows):
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    (pk,) = table.primary_key.columns
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[pk.name],
+        set_={column.name: statement.excluded[column.name] for column in table.columns if column is not pk},
+    )
+    connection.execute(statement, rows)
+
+
+def sync_table(source: Engine, target: Engine, table, organization_id: int, batch_size: int) -> Tuple[int, int]:
+    """
+    One pass making the organization's rows of `table` on `target` equal to those on
+    `source`: rows are compared in primary-key ranges of `batch_size` source rows, and new or
+    changed rows upserted and vanished ones deleted, one target transaction per range. The
+    first pass copies everything; later passes only move what changed in the meantime (a
+    content comparison, since bulk jobs such as lead scoring keep updated_at unchanged).
+    Returns (upserted, deleted).
+    """
+    (pk,) = table.primary_key.columns
+    org = _org_value(table, organization_id)
+    upserted = deleted = 0
+    last = None
+    while True:
+        query = select(table).where(table.c.organization_id == org).order_by(pk).limit(batch_size)
+        if last is not None:
+            query = query.where(pk > last)
+        with source.connect() as conn:
+            rows = conn.execute(query).all()
+        upper = rows[-1]._mapping[pk.name] if len(rows) == batch_size else None  # None: to the end
+
+        existing_query = select(table).where(table.c.organization_id == org)
+        if last is not None:
+            existing_query = existing_query.where(pk > last)
+        if upper is not None:
+            existing_query = existing_query.where(pk <= upper)
+        with target.begin() as conn:
+            existing = {row._mapping[pk.name]: tuple(row) for row in conn.execute(existing_query)}
+            changed = [dict(row._mapping) for row in rows if existing.pop(row._mapping[pk.name], None) != tuple(row)]
+            if changed:
+                ids = [row[pk.name] for row in changed]
+                clash = conn.execute(select(pk).where(pk.in_(ids), table.c.organization_id != org).limit(1)).first()
+                if clash:
+                    raise ValueError(
+                        f"{table.name} id {clash[0]} already belongs to another organization on the target shard; "
+                        "move this organization to a shard of its own"
+                    )
+                _upsert(conn, table, changed)
+            if existing:
+                conn.execute(delete(table).where(pk.in_(list(existing))))
+        upserted += len(changed)
+        deleted += len(existing)
+        if upper is None:
+            return upserted, deleted
+        last = upper
+
+
+def sync_tenant(source: Engine, target: Engine, organization_id: int, batch_size: int, copy_users: bool) -> Dict[str, Tuple[int, int]]:
+    changes = {}
+    if copy_users:
+        changes[User.__tablename__] = sync_table(main_engine, target, User.__table__, organization_id, batch_size)
+    for model in TENANT_MODELS:
+        changes[model.__tablename__] = sync_table(source, target, model.__table__, organization_id, batch_size)
+    return changes
+
+
+def purge_tenant(shard: str, organization_id: int, batch_size: int) -> int:
+    """
+    Delete the organization's data from a shard it no longer lives on, `batch_size` rows
+    per transaction so writers of other tenants aren't held up.
+    """
+    engine = shard_engine(shard)
+    models = TENANT_MODELS + DERIVED_MODELS + ((User,) if shard != DEFAULT_SHARD else ())
+    removed = 0
+    for model in models:
+        table = model.__table__
+        org = _org_value(table, organization_id)
+        if len(table.primary_key.columns) > 1:
+            with engine.begin() as conn:
+                removed += conn.execute(delete(table).where(table.c.organization_id == org)).rowcount
+            continue
+        (key,) = table.primary_key.columns
+        while True:
+            with engine.begin() as conn:
+                keys = conn.execute(select(key).where(table.c.organization_id == org).limit(batch_size)).scalars().all()
+                if not keys:
+                    break
+                removed += conn.execute(delete(table).where(table.c.organization_id == org, key.in_(keys))).rowcount
+    return removed
+
+
+def move_tenant(
+    organization_id: int,
+    target: str,
+    batch_size: int = settings.TENANT_MIGRATION_BATCH_SIZE,
+    cutover_rows: int = settings.TENANT_MIGRATION_CUTOVER_ROWS,
+    max_passes: int = 10,
+    propagation_seconds: Optional[float] = None,
+    purge_source: bool = False,
+    log: Callable[[str], None] = print,
+) -> Dict:
+    """
+    Move an organization's data to the shard database `target` while it stays in use.
+
+    1. Copy: passes of sync_tenant() while the tenant keeps reading and writing the source,
+       until a pass changes fewer than `cutover_rows` rows (or `max_passes` ran).
+    2. Cutover: the directory entry is frozen, in the main database and in the source's own
+       tenant_shards table, so new writes get 503 + Retry-After while reads continue from
+       the source, and writers already in flight (an import, a scoring run) get 503 at their
+       next commit. After `propagation_seconds` (the directory cache TTL plus a margin for
+       requests in flight) every worker has seen it, a last pass copies what is left, the
+       target's aggregates are recounted, and the entry is flipped to `target` in one
+       transaction, then in the source's and target's copies. A failure before the flip
+       unfreezes the source instead.
+    3. Optionally, once every worker routes to the target, the source's copy is deleted.
+
+    Row ids are kept, so the target must not have handed the same ids to another
+    organization; the copy stops with ValueError rather than overwrite them. A fresh shard
+    per hot tenant never clashes, moving back into a database that kept growing can.
+    """
+    if target != DEFAULT_SHARD and not SHARD_NAME.match(target):
+        raise ValueError("shard names may only contain letters, digits and underscores")
+    source, frozen = current_shard(organization_id)
+    if frozen:
+        raise ValueError(f"organization {organization_id} is frozen on {source}; another move may be running")
+    if source == target:
+        raise ValueError(f"organization {organization_id} already lives on {target}")
+    if propagation_seconds is None:
+        propagation_seconds = settings.SHARD_DIRECTORY_TTL_SECONDS + 2
+
+    source_engine, target_engine = shard_engine(source), shard_engine(target)
+    if target != DEFAULT_SHARD:
+        Base.metadata.create_all(target_engine)
+    copy_users = target != DEFAULT_SHARD
+
+    def run_pass(label: str) -> int:
+        start = time.perf_counter()
+        changes = sync_tenant(source_engine, target_engine, organization_id, batch_size, copy_users)
+        changed = sum(upserted + deleted for upserted, deleted in changes.values())
+        detail = ", ".join(f"{table} +{upserted}/-{deleted}" for table, (upserted, deleted) in changes.items())
+        log(f"{label}: {changed} rows changed in {time.perf_counter() - start:.1f}s ({detail})")
+        return changed
+
+    passes = 0
+    while True:
+        passes += 1
+        if run_pass(f"pass {passes}") < cutover_rows or passes >= max_passes:
+            break
+
+    cutover_start = time.perf_counter()
+    try:
+        set_shard(organization_id, source, frozen=True, shards=[source])
+        log(f"writes frozen; waiting {propagation_seconds:g}s for every worker to see it")
+        time.sleep(propagation_seconds)
+        final = run_pass("final pass")
+        with target_engine.begin() as conn:
+            rebuild_org_aggregates(conn, organization_id)
+        set_shard(organization_id, target, frozen=False, shards=[source, target])
+    except BaseException:
+        set_shard(organization_id, source, frozen=False, shards=[source])
+        raise
+    frozen_seconds = time.perf_counter() - cutover_start
+    log(f"organization {organization_id} now lives on {target}; writes were frozen for {frozen_seconds:.1f}s")
+
+    removed = 0
+    if purge_source:
+        time.sleep(propagation_seconds)  # readers still routed to the source by a stale cache
+        removed = purge_tenant(source, organization_id, batch_size)
+        log(f"removed {removed} rows from {source}")
+    return {
+        "organization_id": organization_id, "source": source, "target": target, "passes": passes,
+        "final_pass_rows": final, "frozen_seconds": round(frozen_seconds, 2), "purged_rows": removed,
+    }
@@ -0,0 +1,560 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.document_changes import KIND_ARTICLE, KIND_COMPLAINT, KIND_LEAD  # noqa: F401  (re-exported)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+UNASSIGNED = -1  # live vector not yet in an inverted list (index still untrained)
+DELETED = -2
+
+FORMAT = 2
+
+_ARRAYS = {
+    # int8 with a per-vector scale: a quarter of float32's file and page cache, and converting
+    # it for scoring costs far less than converting float16
+    "vectors": np.int8,
+    "scales": np.float32,
+    "keys": np.int64,
+    "lists": np.int32,
+    "hashes": np.int64,
+}
+
+_SCAN_BLOCK = 65536  # vectors converted to float32 at a time
+
+
+def encode_key(kind: int, row_id: int, chunk: int = 0) -> int:
+    return (((row_id << 16) | chunk) << 2) | kind
+
+
+def decode_key(key: int) -> Tuple[int, int, int]:
+    """
+    (kind, row id, chunk number) of an index key.
+    """
+    key = int(key)
+    return key & 3, key >> 18, (key >> 2) & 0xFFFF
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    int8 codes and per-vector scales; codes * scale approximates the vector.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127
+    return np.rint(vectors / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+class VectorIndex:
+    """
+    One organization's embeddings in memory-mapped .npy files, with an IVF (inverted file)
+    layer on top.
+
+    Until VECTOR_INDEX_TRAIN_MIN vectors exist, search is exact. After that, spherical k-means
+    splits the vectors into VECTOR_INDEX_LIST_FACTOR x sqrt(n) lists, and a query only scores
+    the VECTOR_INDEX_NPROBE lists whose centroids are closest. Training rewrites the files in
+    list order, so each probed list is one contiguous slice of the vectors file.
+
+    Any number of processes can search an index; one at a time may change it, inside
+    `writer()` (a lock file in the index directory). The writer appends to the files and
+    flags replaced or deleted vectors in `lists`, which readers can see at any time without
+    harm; everything else (growing the files, training) is written as a new generation of
+    files, named in state.json, which readers switch to when they notice state.json changed.
+    Vectors appended since training are scanned from a tail, grouped by list once it grows.
+    """
+
+    def __init__(self, path: str, dim: int, model: str, train_min: int = settings.VECTOR_INDEX_TRAIN_MIN):
+        self.path = path
+        self.dim = dim
+        self.model = model
+        self.train_min = train_min
+        self._lock = threading.RLock()
+        self._writer_lock = threading.Lock()  # threads of this process; the lock file covers other processes
+        self._lock_file = None
+        os.makedirs(path, exist_ok=True)
+        self._stamp = None
+        self._close_arrays()
+        self.refresh()
+
+    # ---- storage ----
+
+    def _file(self, name: str, generation: int) -> str:
+        return os.path.join(self.path, f"{name}.{generation}.npy")
+
+    @property
+    def _state_path(self) -> str:
+        return os.path.join(self.path, "state.json")
+
+    def _read_state(self) -> Dict:
+        try:
+            with open(self._state_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if state.get("format") != FORMAT or state.get("dim") != self.dim or state.get("model") != self.model:
+            return {}  # new index, an older layout, or the embedding model changed: start over
+        return state
+
+    def _close_arrays(self):
+        self.generation = 0
+        self.count = self.deleted = self.trained_size = 0
+        self.synced = False
+        self.log_source, self.log_offset = None, 0
+        self._arrays: Dict[str, np.ndarray] = {}
+        self.centroids = self._offsets = None
+        self._tail_slots = self._tail_offsets = None
+        self._indexed_upto = 0
+
+    def _load_generation(self, state: Dict):
+        generation = state["generation"]
+        mode = "r+" if self._lock_file is not None else "r"
+        self._arrays = {name: np.load(self._file(name, generation), mmap_mode=mode) for name in _ARRAYS}
+        if state["trained_size"]:
+            self.centroids = np.load(self._file("centroids", generation))
+            self._offsets = np.load(self._file("offsets", generation))
+        else:
+            self.centroids = self._offsets = None
+        self.generation = generation
+        self._tail_slots = self._tail_offsets = None
+        self._indexed_upto = state["trained_size"]
+
+    def refresh(self):
+        """
+        Pick up what the writer (this process or another) saved since the last look.
+        """
+        with self._lock:
+            for _ in range(10):
+                try:
+                    stat = os.stat(self._state_path)
+                    stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                except FileNotFoundError:
+                    stamp = None
+                if stamp == self._stamp:
+                    return
+                state = self._read_state()
+                try:
+                    if not state:
+                        self._close_arrays()
+                    elif state["generation"] != self.generation or not self._arrays:
+                        self._load_generation(state)
+                except FileNotFoundError:
+                    continue  # the writer replaced that generation while we opened it
+                self._stamp = stamp
+                if state:
+                    self.count, self.deleted = state["count"], state["deleted"]
+                    self.trained_size, self.synced = state["trained_size"], state["synced"]
+                    self.log_source, self.log_offset = state.get("log_source"), state.get("log_offset", 0)
+                    self._group_tail()
+                return
+            raise RuntimeError(f"vector index {self.path} keeps changing while it is opened")
+
+    def _create(self, name: str, capacity: int, generation: int):
+        shape = (capacity, self.dim) if name == "vectors" else (capacity,)
+        array = np.lib.format.open_memmap(self._file(name, generation), mode="w+", dtype=_ARRAYS[name], shape=shape)
+        if name == "lists":
+            array[:] = DELETED
+        return array
+
+    @property
+    def capacity(self) -> int:
+        return len(self._arrays["keys"]) if self._arrays else 0
+
+    def _write_generation(self, capacity: int, fill: Callable[[Dict[str, np.ndarray]], None]):
+        """
+        Write a new generation of the arrays (`fill` copies the data in) and make it current.
+        """
+        # Past every generation on disk: a reader may still map the files of an abandoned one
+        on_disk = [name.split(".") for name in os.listdir(self.path) if name.endswith(".npy")]
+        generation = max([self.generation] + [int(parts[-2]) for parts in on_disk if parts[-2].isdigit()]) + 1
+        arrays = {name: self._create(name, capacity, generation) for name in _ARRAYS}
+        fill(arrays)
+        for array in arrays.values():
+            array.flush()
+        if self.centroids is not None:
+            np.save(self._file("centroids", generation), self.centroids)
+            np.save(self._file("offsets", generation), self._offsets)
+        self._arrays, self.generation = arrays, generation
+        self.flush()  # readers switch over once state.json names the new generation
+
+    def _reserve(self, needed: int):
+        if needed <= self.capacity:
+            return
+        count, old = self.count, self._arrays
+
+        def copy(arrays):
+            for name, array in old.items():
+                arrays[name][:count] = array[:count]
+
+        self._write_generation(max(needed, self.capacity * 2, 1024), copy)
+
+    def _remove_old_generations(self):
+        keep = {f"{name}.{self.generation}.npy" for name in list(_ARRAYS) + ["centroids", "offsets"]}
+        for name in os.listdir(self.path):
+            if name.endswith(".npy") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass  # still mapped by a reader on Windows; removed after a later write
+
+    def flush(self):
+        self._check_writer()
+        with self._lock:
+            for array in self._arrays.values():
+                array.flush()
+            state = {
+                "format": FORMAT, "dim": self.dim, "model": self.model, "generation": self.generation,
+                "count": self.count, "deleted": self.deleted, "trained_size": self.trained_size,
+                "synced": self.synced, "log_source": self.log_source, "log_offset": self.log_offset,
+            }
+            temporary = os.path.join(self.path, "state.json.tmp")
+            with open(temporary, "w") as f:
+                json.dump(state, f)
+            os.replace(temporary, self._state_path)
+            stat = os.stat(self._state_path)
+            self._stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._remove_old_generations()
+
+    def close(self):
+        with self._lock:
+            self._close_arrays()
+            self._stamp = None
+
+    # ---- the single writer ----
+
+    def acquire(self):
+        """
+        Become the index's writer, waiting for any other thread or process to finish. Blocks:
+        call from a thread under asyncio.
+        """
+        self._writer_lock.acquire()
+        try:
+            lock_file = open(os.path.join(self.path, "write.lock"), "a+b")
+            lock_file.seek(0)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                else:
+                    while True:
+                        try:
+                            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            continue  # LK_LOCK gives up after ten seconds
+            except BaseException:
+                lock_file.close()
+                raise
+            with self._lock:
+                self._lock_file = lock_file
+                self._stamp = None  # reopen the files writable and catch up with the previous writer
+                self._close_arrays()
+                self.refresh()
+                if not self._arrays:
+                    self.synced = False
+                    self._write_generation(1024, lambda arrays: None)
+        except BaseException:
+            self._release_lock_file()
+            raise
+
+    def release(self):
+        """
+        Save what was written and let the next writer in.
+        """
+        try:
+            if self._arrays:
+                self.flush()
+        finally:
+            self._release_lock_file()
+
+    def _release_lock_file(self):
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is not None:
+            if fcntl is None:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            lock_file.close()  # also drops the flock
+        self._writer_lock.release()
+
+    @contextmanager
+    def writer(self):
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def _check_writer(self):
+        if self._lock_file is None:
+            raise RuntimeError("vector index changes must be made inside writer()")
+
+    # ---- inverted lists ----
+
+    def _group_tail(self):
+        """
+        Group the tail's slots (appended since training) by list: CSR layout, slots + offsets.
+        """
+        self._indexed_upto = self.count
+        if self.centroids is None:
+            self._tail_slots = self._tail_offsets = None
+            return
+        lists = np.asarray(self._arrays["lists"][self.trained_size:self.count])
+        slots = np.nonzero(lists >= 0)[0]
+        order = np.argsort(lists[slots], kind="stable")
+        self._tail_slots = (slots[order] + self.trained_size).astype(np.int64)
+        self._tail_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(lists[slots], minlength=len(self.centroids))))
+        )
+
+    def _dequantized(self, start: int, end: int) -> np.ndarray:
+        vectors = np.asarray(self._arrays["vectors"][start:end], dtype=np.float32)
+        return vectors * self._arrays["scales"][start:end, None]
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        out = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _SCAN_BLOCK):
+            block = np.asarray(vectors[start:start + _SCAN_BLOCK], dtype=np.float32)
+            out[start:start + _SCAN_BLOCK] = np.argmax(block @ self.centroids.T, axis=1)
+        return out
+
+    def train(
+        self,
+        iterations: int = 10,
+        sample_size: int = 65536,
+        seed: int = 0,
+        list_factor: float = settings.VECTOR_INDEX_LIST_FACTOR,
+    ):
+        """
+        Drop deleted slots, fit list_factor x sqrt(n) centroids with spherical k-means on a
+        sample, and rewrite the vectors grouped by their nearest centroid.
+        """
+        self._check_writer()
+        with self._lock:
+            live = np.nonzero(np.asarray(self._arrays["lists"][:self.count]) != DELETED)[0]
+            if len(live) < self.train_min:
+                self.centroids = self._offsets = None
+                order, assignment = live, np.full(len(live), UNASSIGNED, dtype=np.int32)
+            else:
+                rng = np.random.default_rng(seed)
+                n_lists = int(min(16384, max(16, list_factor * np.sqrt(len(live)))))
+                sample = live[np.sort(rng.choice(len(live), size=min(len(live), max(sample_size, n_lists * 32)), replace=False))]
+                data = np.asarray(self._arrays["vectors"][sample], dtype=np.float32) * self._arrays["scales"][sample, None]
+                centroids = data[rng.choice(len(data), size=n_lists, replace=False)]
+                for _ in range(iterations):
+                    assignment = np.argmax(data @ centroids.T, axis=1)
+                    sums = np.zeros_like(centroids)
+                    np.add.at(sums, assignment, data)
+                    empty = np.bincount(assignment, minlength=n_lists) == 0
+                    sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]  # reseed empty lists
+                    centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+                self.centroids = centroids.astype(np.float32)
+                assignment = np.empty(len(live), dtype=np.int32)
+                for start in range(0, len(live), _SCAN_BLOCK):
+                    slots = live[start:start + _SCAN_BLOCK]
+                    block = np.asarray(self._arrays["vectors"][slots], dtype=np.float32) * self._arrays["scales"][slots, None]
+                    assignment[start:start + _SCAN_BLOCK] = np.argmax(block @ self.centroids.T, axis=1)
+                by_list = np.argsort(assignment, kind="stable")
+                order, assignment = live[by_list], assignment[by_list]
+                self._offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=n_lists))))
+            old = self._arrays
+
+            def copy(arrays):
+                for start in range(0, len(order), _SCAN_BLOCK):
+                    slots = order[start:start + _SCAN_BLOCK]
+                    for name in _ARRAYS:
+                        arrays[name][start:start + len(slots)] = old[name][slots]
+                arrays["lists"][:len(order)] = assignment
+
+            self.count, self.deleted = len(order), 0
+            self.trained_size = len(order) if self.centroids is not None else 0
+            self._write_generation(max(1024, len(order) + len(order) // 4), copy)
+            self._group_tail()
+
+    # ---- updates ----
+
+    def _slots_of(self, kind: int, row_ids: Sequence[int]) -> np.ndarray:
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        keys = np.asarray(self._arrays["keys"][:self.count])
+        rows = keys >> 18
+        # Range check first so the set lookup only runs on the few keys that can match
+        slots = np.nonzero(((keys & 3) == kind) & (rows >= row_ids.min()) & (rows <= row_ids.max()))[0]
+        slots = slots[np.isin(rows[slots], row_ids)]
+        return slots[self._arrays["lists"][slots] != DELETED]
+
+    def update_documents(
+        self,
+        kind: int,
+        row_ids: Sequence[int],
+        keys: Sequence[int],
+        hashes: Sequence[int],
+        embed: Callable[[List[int]], np.ndarray],
+    ) -> Tuple[int, int]:
+        """
+        Make the index hold exactly `keys` for the documents `row_ids` of `kind`.
+
+        Entries whose content hash is unchanged are kept as they are. `embed(positions)` is
+        called only for the new or changed entries, and returns their vectors. Returns
+        (added, removed).
+        """
+        self._check_writer()
+        with self._lock:
+            existing = self._slots_of(kind, row_ids) if row_ids else np.zeros(0, dtype=np.int64)
+            current = dict(zip(
+                self._arrays["keys"][existing].tolist(), zip(existing.tolist(), self._arrays["hashes"][existing].tolist())
+            ))
+            keep, changed = set(), []
+            for position, (key, content) in enumerate(zip(keys, hashes)):
+                slot_hash = current.get(key)
+                if slot_hash is not None and slot_hash[1] == content:
+                    keep.add(slot_hash[0])
+                else:
+                    changed.append(position)
+            stale = [slot for slot in existing.tolist() if slot not in keep]
+            if stale:
+                self._arrays["lists"][stale] = DELETED
+                self.deleted += len(stale)
+            if changed:
+                vectors = np.asarray(embed(changed), dtype=np.float32)
+                start, end = self.count, self.count + len(changed)
+                self._reserve(end)
+                codes, scales = quantize(vectors)
+                self._arrays["vectors"][start:end] = codes
+                self._arrays["scales"][start:end] = scales
+                self._arrays["keys"][start:end] = [keys[i] for i in changed]
+                self._arrays["hashes"][start:end] = [hashes[i] for i in changed]
+                self._arrays["lists"][start:end] = self._assign(vectors) if self.centroids is not None else UNASSIGNED
+                self.count = end
+            self._maintain()
+            return len(changed), len(stale)
+
+    def remove_missing(self, kind: int, present_row_ids: Sequence[int]) -> int:
+        """
+        Delete every document of `kind` whose row id is not in `present_row_ids`.
+        """
+        self._check_writer()
+        with self._lock:
+            keys = np.asarray(self._arrays["keys"][:self.count])
+            lists = np.asarray(self._arrays["lists"][:self.count])
+            gone = ((keys & 3) == kind) & (lists != DELETED) & ~np.isin(keys >> 18, np.asarray(present_row_ids, dtype=np.int64))
+            slots = np.nonzero(gone)[0]
+            self._arrays["lists"][slots] = DELETED
+            self.deleted += len(slots)
+            self._maintain()
+            return len(slots)
+
+    def _maintain(self):
+        live = self.count - self.deleted
+        if self.centroids is None:
+            if live >= self.train_min:
+                self.train()
+        elif live > 2 * self.trained_size or self.deleted > live:
+            self.train()  # lists drifted from the data they were fitted on, or the tail outgrew them
+        elif self.count - self._indexed_upto > max(1024, self.count // 20):
+            self._group_tail()
+
+    # ---- search ----
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = settings.VECTOR_INDEX_NPROBE) -> List[Tuple[int, float]]:
+        """
+        Top-k (key, cosine score) for a normalised query vector.
+        """
+        with self._lock:
+            if self._lock_file is None:
+                self.refresh()
+            if self.count == 0:
+                return []
+            query = np.asarray(query, dtype=np.float32)
+            lists, vectors, scales = self._arrays["lists"], self._arrays["vectors"], self._arrays["scales"]
+            found_scores, found_slots = [], []
+
+            def score_range(start: int, end: int):
+                block = np.asarray(vectors[start:end], dtype=np.float32) @ query * scales[start:end]
+                block[lists[start:end] == DELETED] = -np.inf
+                found_scores.append(block)
+                found_slots.append(np.arange(start, end))
+
+            if self.centroids is None:
+                for start in range(0, self.count, _SCAN_BLOCK):
+                    score_range(start, min(start + _SCAN_BLOCK, self.count))
+            else:
+                nprobe = min(nprobe, len(self.centroids))
+                probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+                for i in probed:
+                    if self._offsets[i] < self._offsets[i + 1]:
+                        score_range(self._offsets[i], self._offsets[i + 1])
+                parts = [self._tail_slots[self._tail_offsets[i]:self._tail_offsets[i + 1]] for i in probed]
+                unindexed = np.arange(self._indexed_upto, self.count)
+                parts.append(unindexed[np.isin(lists[self._indexed_upto:self.count], probed)])
+                tail = np.concatenate(parts)
+                tail = tail[lists[tail] >= 0]
+                if len(tail):
+                    found_scores.append(np.asarray(vectors[tail], dtype=np.float32) @ query * scales[tail])
+                    found_slots.append(tail)
+            if not found_scores:
+                return []
+            scores, slots = np.concatenate(found_scores), np.concatenate(found_slots)
+            k = min(k, int(np.isfinite(scores).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            keys = self._arrays["keys"][slots[top]]
+            return [(int(key), float(score)) for key, score in zip(keys, scores[top])]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "vectors": self.count - self.deleted,
+                "deleted": self.deleted,
+                "lists": 0 if self.centroids is None else len(self.centroids),
+                "unindexed_tail": self.count - max(self._indexed_upto, self.trained_size),
+            }
+
+
+class VectorIndexRegistry:
+    """
+    Process-wide LRU of open per-organization indexes. Every worker process has its own;
+    the files, and the lock deciding which of them writes, are shared.
+    """
+
+    def __init__(
+        self,
+        base_dir: str = settings.VECTOR_INDEX_DIR,
+        max_open: int = settings.VECTOR_INDEX_MAX_OPEN,
+    ):
+        self.base_dir = base_dir
+        self.max_open = max_open
+        self._indexes: "OrderedDict[int, VectorIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, organization_id: int, dim: int, model: str) -> VectorIndex:
+        organization_id = int(organization_id)
+        evicted = []
+        with self._lock:
+            index = self._indexes.get(organization_id)
+            if index is None:
+                index = VectorIndex(os.path.join(self.base_dir, f"org_{organization_id}"), dim, model)
+                self._indexes[organization_id] = index
+                while len(self._indexes) > self.max_open:
+                    evicted.append(self._indexes.popitem(last=False)[1])
+            self._indexes.move_to_end(organization_id)
+        for old in evicted:
+            old.close()
+        return index
+
+    def close(self):
+        with self._lock:
+            indexes, self._indexes = list(self._indexes.values()), OrderedDict()
+        for index in indexes:
+            index.close()
+
+
+vector_indexes = VectorIndexRegistry()
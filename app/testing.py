@@ -1,5 +1,5 @@
-from app.models.database import engine, Base
-from app.models.user import User
+from app.core.schema import check_schema, current_revisions
+from app.models.database import engine
 
-Base.metadata.create_all(bind=engine)  # Should create tables in your DB
-print("Database tables created successfully!")
+check_schema(engine)  # raises if the database isn't at the alembic head; creates nothing
+print(f"Database schema is up to date ({', '.join(sorted(current_revisions(engine)))})")
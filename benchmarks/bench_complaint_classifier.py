@@ -0,0 +1,65 @@
+# benchmarks/bench_complaint_classifier.py
+"""
+Complaint classification throughput versus batch size.
+
+Trains a model on synthetic complaints, then classifies `--complaints` descriptions in
+batches of each size and reports complaints per second (batch size 1 is what the
+per-complaint classify endpoint does):
+
+    python -m benchmarks.bench_complaint_classifier --complaints 20000 --batch-sizes 1 100 1000 5000
+"""
+import argparse
+import random
+import time
+
+from app.services.complaint_classifier import ComplaintClassifier
+
+TOPICS = {
+    "billing_issue": ["charged twice", "wrong invoice amount", "refund not received", "billing error on my card"],
+    "service_issue": ["staff were rude", "waited an hour for support", "nobody answered my call", "poor service"],
+    "technical_issue": ["app crashes on login", "error when saving", "the site is down", "sync is broken"],
+}
+FILLER = "please look into this as soon as possible it has happened several times this month".split()
+
+
+def synthetic(n: int, rng: random.Random):
+    labels = list(TOPICS)
+    examples = []
+    for _ in range(n):
+        label = rng.choice(labels)
+        words = rng.choice(TOPICS[label]).split() + rng.sample(FILLER, rng.randint(3, 10))
+        rng.shuffle(words)
+        examples.append((" ".join(words), label))
+    return examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--complaints", type=int, default=20000)
+    parser.add_argument("--train", type=int, default=5000, help="synthetic training examples")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 1000, 5000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts, labels = zip(*synthetic(args.train, rng))
+    start = time.perf_counter()
+    model = ComplaintClassifier.train(texts, labels, epochs=5)
+    print(f"trained on {args.train} complaints in {time.perf_counter() - start:.1f}s")
+
+    workload = synthetic(args.complaints, rng)
+    descriptions = [text for text, _ in workload]
+    print(f"{'batch':>6} {'complaints/s':>13} {'accuracy':>9}")
+    for batch_size in args.batch_sizes:
+        # Batch size 1 is slow; time it on a slice of the workload
+        count = min(len(descriptions), 2000) if batch_size == 1 else len(descriptions)
+        predicted = []
+        start = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            predicted.extend(model.predict(descriptions[offset:offset + batch_size]))
+        elapsed = time.perf_counter() - start
+        accuracy = sum(p == label for p, (_, label) in zip(predicted, workload)) / count
+        print(f"{batch_size:>6} {count / elapsed:>13.0f} {accuracy:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
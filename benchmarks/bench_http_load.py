@@ -0,0 +1,185 @@
+# benchmarks/bench_http_load.py
+"""
+In-process HTTP load test: drives app.main:app through httpx's ASGI transport (no server,
+no sockets) with `--concurrency` concurrent clients for `--duration` seconds, spread over
+the users of the generated organizations, and reports per endpoint the request count,
+errors, requests/s and p50/p95/p99 latency.
+
+The app uses ./smart_crm.db, so run from the directory of a database filled by
+benchmarks/datagen.py, with the repository on PYTHONPATH:
+
+    python -m benchmarks.datagen --orgs 10 --leads 100000 --complaints 20000
+    python -m benchmarks.bench_http_load --concurrency 32 --duration 30 --save baseline.json
+    python -m benchmarks.bench_http_load --concurrency 32 --duration 30 --compare baseline.json
+
+--save writes the results as JSON; --compare prints the change against such a file, so
+runs before and after a change can be compared like for like.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+import httpx
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+
+# name -> (method, path, query params); {term} is filled with a random search word
+ENDPOINTS = {
+    "leads.list": ("GET", "/api/v1/endpoints/lead/leads/", {"limit": 50}),
+    "leads.list_filtered": ("GET", "/api/v1/endpoints/lead/leads/", {"limit": 50, "status": "contacted"}),
+    "leads.search": ("GET", "/api/v1/endpoints/lead/leads/search", {"q": "{term}", "limit": 20}),
+    "complaints.list": ("GET", "/api/v1/endpoints/complaint/complaints/", {"limit": 50}),
+    "complaints.search": ("GET", "/api/v1/endpoints/complaint/complaints/search", {"q": "{term}", "limit": 20}),
+    "dashboard.stats": ("GET", "/api/v1/endpoints/dashboard/stats", {}),
+    "auth.me": ("GET", "/api/v1/endpoints/auth/me", {}),
+}
+SEARCH_TERMS = ("acme", "nova", "chen", "patel", "dental", "refund", "invoice", "login", "delivery", "summit")
+
+
+def tokens_for(max_users: int) -> List[str]:
+    """
+    Access tokens, as the login endpoint issues them, for the org admins and employees in
+    the database.
+    """
+    from app.core.security import create_access_token
+    from app.models.database import SessionLocal
+    from app.models.user import User
+
+    with SessionLocal() as db:
+        users = db.execute(
+            select(User).where(User.organization_id.isnot(None), User.role.in_(["org_admin", "employee"])).limit(max_users)
+        ).scalars().all()
+        return [
+            create_access_token({"sub": str(user.id), "role": user.role, "org": str(user.organization_id), "epoch": user.token_epoch or 0})
+            for user in users
+        ]
+
+
+async def worker(client: httpx.AsyncClient, names: List[str], tokens: List[str], deadline: float, rng: random.Random, samples):
+    while time.perf_counter() < deadline:
+        name = rng.choice(names)
+        method, path, params = ENDPOINTS[name]
+        params = {key: value.format(term=rng.choice(SEARCH_TERMS)) if isinstance(value, str) else value for key, value in params.items()}
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, headers={"Authorization": f"Bearer {rng.choice(tokens)}"})
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        samples[name].append((time.perf_counter() - start, ok))
+
+
+def summarize(samples, elapsed: float) -> Dict[str, Dict]:
+    results = {}
+    for name in sorted(samples):
+        latencies = np.array([latency for latency, _ in samples[name]]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        results[name] = {
+            "requests": len(latencies),
+            "errors": sum(1 for _, ok in samples[name] if not ok),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2),
+        }
+    return results
+
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict] = None):
+    print(f"{'endpoint':<22} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in results.items():
+        print(f"{name:<22} {row['requests']:>8} {row['errors']:>6} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+        old = (baseline or {}).get(name)
+        if old:
+            change = lambda key: f"{(row[key] - old[key]) / old[key] * 100:+.0f}%" if old[key] else "n/a"
+            print(f"{'  vs baseline':<22} {'':>8} {'':>6} {change('rps'):>8} {change('p50_ms'):>8} {change('p95_ms'):>8} {change('p99_ms'):>8}")
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> Dict:
+    if not args.rate_limit:
+        settings.RATE_LIMIT_ENABLED = False  # every client would otherwise be throttled as one tenant
+    from app.main import app
+
+    tokens = tokens_for(args.users)
+    if not tokens:
+        raise SystemExit("no org users in ./smart_crm.db; fill it with benchmarks/datagen.py first")
+    names = args.endpoints or list(ENDPOINTS)
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if args.warmup:
+                warm = defaultdict(list)
+                await asyncio.gather(*(
+                    worker(client, names, tokens, time.perf_counter() + args.warmup, random.Random(-i), warm)
+                    for i in range(args.concurrency)
+                ))
+            samples = defaultdict(list)
+            start = time.perf_counter()
+            deadline = start + args.duration
+            await asyncio.gather(*(
+                worker(client, names, tokens, deadline, random.Random(i), samples) for i in range(args.concurrency)
+            ))
+            elapsed = time.perf_counter() - start
+    finally:
+        await app.router.shutdown()
+
+    results = summarize(samples, elapsed)
+    total = sum(row["requests"] for row in results.values())
+    return {
+        "meta": {
+            "revision": _git_revision(), "at": datetime.utcnow().isoformat(timespec="seconds"),
+            "concurrency": args.concurrency, "duration": round(elapsed, 2), "users": len(tokens),
+            "requests": total, "rps": round(total / elapsed, 2),
+        },
+        "endpoints": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of unmeasured load first")
+    parser.add_argument("--users", type=int, default=200, help="distinct users to spread requests over")
+    parser.add_argument("--endpoints", nargs="+", choices=list(ENDPOINTS), help="default: all")
+    parser.add_argument("--rate-limit", action="store_true", help="keep the rate limiter on")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"baseline: {baseline['meta']}")
+    meta = report["meta"]
+    print(f"{meta['requests']} requests in {meta['duration']}s at concurrency {meta['concurrency']}: {meta['rps']} req/s")
+    print_results(report["endpoints"], baseline["endpoints"] if baseline else None)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
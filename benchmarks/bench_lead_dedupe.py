@@ -0,0 +1,116 @@
+# benchmarks/bench_lead_dedupe.py
+"""
+Duplicate-lead detection: MinHash/LSH time, recall and precision on synthetic leads.
+
+Generates `--leads` leads of which `--duplicate-rate` are near-duplicates of another lead
+(typos, company suffixes, reformatted phones, re-cased emails), runs the same signing and
+banding the app uses, and compares the pairs found with the planted ones. The all-pairs
+cost is measured on a sample and extrapolated:
+
+    python -m benchmarks.bench_lead_dedupe --leads 100000 1000000
+"""
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.lead_dedupe import band_keys, candidate_pairs, lead_features, signatures, similarity
+
+SUFFIXES = ["", " Inc", " Inc.", " LLC", " Ltd", " Corp", ", Inc."]
+SYLLABLES = ("ka lo mi re su ta ven dor bri sol mar tek nex qua zen pro fin lux cor del "
+             "gra hel ion jet kin lim mod nov orb pix ros syn tri umb val wex yor zap").split()
+
+
+def company(rng: random.Random) -> str:
+    words = ["".join(rng.choices(SYLLABLES, k=rng.randint(2, 3))) for _ in range(rng.randint(2, 3))]
+    return " ".join(words).title()
+
+
+def typo(text: str, rng: random.Random) -> str:
+    position = rng.randrange(len(text))
+    return text[:position] + rng.choice(string.ascii_lowercase) + text[position + 1:]
+
+
+def synthetic(n: int, duplicate_rate: float, seed: int = 0):
+    rng = random.Random(seed)
+    leads, planted = [], []
+    while len(leads) < n:
+        if leads and rng.random() < duplicate_rate:
+            original = rng.randrange(len(leads))
+            name, email, phone = leads[original]
+            name = typo(name, rng) if rng.random() < 0.5 else name + rng.choice(SUFFIXES)
+            email = email.upper() if email and rng.random() < 0.5 else email
+            digits = "".join(ch for ch in phone if ch.isdigit())[-10:]
+            phone = rng.choice([f"+1 ({digits[:3]}) {digits[3:6]}-{digits[6:]}", digits, f"1{digits}"])
+            planted.append((original, len(leads)))
+        else:
+            name = company(rng) + rng.choice(SUFFIXES)
+            slug = name.split()[0].lower()
+            email = f"{rng.choice(['info', 'sales', 'hello'])}@{slug}{rng.randrange(10000)}.com" if rng.random() < 0.8 else None
+            phone = f"+1 {rng.randrange(200, 999)} {rng.randrange(100, 999)} {rng.randrange(1000, 9999)}"
+        leads.append((name, email, phone))
+    return leads, planted
+
+
+def run(n: int, duplicate_rate: float, chunk: int, sample: int):
+    leads, planted = synthetic(n, duplicate_rate)
+    print(f"\n{n} leads, {len(planted)} planted duplicates")
+
+    start = time.perf_counter()
+    sigs = np.concatenate([
+        signatures([lead_features(*lead) for lead in leads[offset:offset + chunk]])
+        for offset in range(0, n, chunk)
+    ])
+    signed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pairs = candidate_pairs(band_keys(sigs))
+    banded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = np.concatenate([
+        similarity(sigs[pairs[offset:offset + 1_000_000, 0]], sigs[pairs[offset:offset + 1_000_000, 1]])
+        for offset in range(0, max(len(pairs), 1), 1_000_000)
+    ])
+    found = pairs[scores >= settings.DEDUPE_SIMILARITY_THRESHOLD]
+    verified = time.perf_counter() - start
+
+    # Copies of copies belong to the original's group; any pair inside a group is a true duplicate
+    group = np.arange(n)
+    for original, copy in planted:
+        group[copy] = group[original]
+    truth = {(min(a, b), max(a, b)) for a, b in planted}
+    found_set = set(map(tuple, found.tolist()))
+    recall = len(truth & found_set) / max(len(truth), 1)
+    precision = float((group[found[:, 0]] == group[found[:, 1]]).mean()) if len(found) else 1.0
+
+    # All-pairs comparison of the same signatures on a sample, extrapolated to n
+    m = min(sample, n)
+    start = time.perf_counter()
+    for row in range(m):
+        similarity(np.broadcast_to(sigs[row], (m - row - 1, sigs.shape[1])), sigs[row + 1:m])
+    all_pairs = (time.perf_counter() - start) * (n / m) ** 2
+
+    print(f"  sign      {signed:8.2f}s  ({n / signed:,.0f} leads/s)")
+    print(f"  band      {banded:8.2f}s  {len(pairs):,} candidate pairs")
+    print(f"  verify    {verified:8.2f}s  {len(found):,} pairs >= {settings.DEDUPE_SIMILARITY_THRESHOLD}")
+    print(f"  recall    {recall:8.3f}   precision {precision:.3f}")
+    print(f"  all-pairs ~{all_pairs:,.0f}s estimated from a {m}-lead sample")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--chunk", type=int, default=settings.DEDUPE_CHUNK_SIZE * 4)
+    parser.add_argument("--sample", type=int, default=3000, help="leads compared all-pairs for the estimate")
+    args = parser.parse_args()
+    for n in args.leads:
+        run(n, args.duplicate_rate, args.chunk, args.sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_list_serialization.py
+"""
+Lead list serialization: ORM entities validated through the response model versus the
+column projection rendered straight to orjson.
+
+Fills a temporary SQLite database with `--leads` leads, then builds response bodies for
+pages of each `--page` size both ways, timing the query, the Python-side conversion and the
+JSON rendering, and reports rows per second:
+
+    python -m benchmarks.bench_list_serialization --leads 20000 --page 50 200 1000 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import keyset_paginate
+from app.core.responses import ORJSONResponse
+from app.models.lead import Lead
+from app.schemas.lead import LeadPage
+from app.services.lead_service import LEAD_RESPONSE_PROJECTION, filter_leads
+
+
+def fill(path: str, n: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Lead.__table__.create(engine)
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Lead.__table__.insert(), [
+            {
+                "name": f"Lead {i}", "email": f"lead{i}@example.com", "phone": f"+1 555 {i:07d}",
+                "organization_id": 1, "status": rng.choice(["new", "contacted", "converted"]),
+                "lead_score": rng.randrange(100), "created_at": start + timedelta(seconds=i),
+                "updated_at": start + timedelta(seconds=i),
+            }
+            for i in range(n)
+        ])
+    engine.dispose()
+
+
+async def current_path(db: AsyncSession, field, limit: int) -> bytes:
+    leads, next_cursor = await keyset_paginate(db, filter_leads(1), Lead, None, limit)
+    content = await serialize_response(field=field, response_content={"items": leads, "next_cursor": next_cursor})
+    return JSONResponse(content).body
+
+
+async def projected_path(db: AsyncSession, limit: int) -> bytes:
+    rows, next_cursor = await keyset_paginate(db, LEAD_RESPONSE_PROJECTION.select(filter_leads(1)), Lead, None, limit, as_rows=True)
+    return ORJSONResponse({"items": LEAD_RESPONSE_PROJECTION.dicts(rows), "next_cursor": next_cursor}).body
+
+
+async def measure(session_factory, build, limit: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        async with session_factory() as db:
+            start = time.perf_counter()
+            await build(db)
+            best = min(best, time.perf_counter() - start)
+    return limit / best
+
+
+async def run(path: str, pages, repeat: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    field = create_response_field(name="response", type_=LeadPage)
+
+    async with session_factory() as db:
+        old = await current_path(db, field, 20)
+        new = await projected_path(db, 20)
+    assert json.loads(old) == json.loads(new), "both paths render the same page"
+
+    print(f"{'page':>6} {'current rows/s':>15} {'projected rows/s':>17} {'speedup':>8}")
+    for limit in pages:
+        before = await measure(session_factory, lambda db: current_path(db, field, limit), limit, repeat)
+        after = await measure(session_factory, lambda db: projected_path(db, limit), limit, repeat)
+        print(f"{limit:>6} {before:>15,.0f} {after:>17,.0f} {after / before:>7.1f}x")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=20000)
+    parser.add_argument("--page", type=int, nargs="+", default=[50, 200, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5, help="best of this many runs per page size")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        fill(path, args.leads)
+        asyncio.run(run(path, args.page, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
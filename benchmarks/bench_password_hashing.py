@@ -0,0 +1,47 @@
+# benchmarks/bench_password_hashing.py
+"""
+Login throughput versus password-hashing pool size.
+
+Fires `--logins` concurrent verify_and_update calls (what /auth/login does) at a
+PasswordHasher for each pool size and reports logins per second and peak queue depth:
+
+    python -m benchmarks.bench_password_hashing --rounds 10 --logins 64 --pool-sizes 1 2 4 8
+"""
+import argparse
+import asyncio
+import time
+
+from passlib.context import CryptContext
+
+from app.services.password_service import PasswordHasher
+
+
+async def run(pool_size: int, context: CryptContext, hashed: str, logins: int):
+    hasher = PasswordHasher(context=context, max_workers=pool_size, max_queue=logins)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(hasher.verify_and_update("password123", hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    assert all(valid for valid, _ in results)
+    return logins / elapsed, hasher.metrics()["peak_queue_depth"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="bcrypt cost factor")
+    parser.add_argument("--logins", type=int, default=64, help="concurrent logins per pool size")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=args.rounds, bcrypt__min_rounds=args.rounds)
+    hashed = context.hash("password123")
+
+    print(f"bcrypt rounds={args.rounds}, {args.logins} concurrent logins")
+    print(f"{'pool':>6} {'logins/s':>10} {'peak queue':>11}")
+    for pool_size in args.pool_sizes:
+        rate, peak = asyncio.run(run(pool_size, context, hashed, args.logins))
+        print(f"{pool_size:>6} {rate:>10.1f} {peak:>11}")
+
+
+if __name__ == "__main__":
+    main()
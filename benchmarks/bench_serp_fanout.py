@@ -0,0 +1,91 @@
+# benchmarks/bench_serp_fanout.py
+"""
+SerpAPI lead generation: one client per sequential lookup versus the shared client's
+concurrent batch, against the local stub server (benchmarks/serpapi_stub.py).
+
+Runs `--lookups` distinct query/location pairs (plus `--repeat` re-cased duplicates) three
+ways and reports wall time, upstream requests and TCP connections:
+
+    python -m benchmarks.bench_serp_fanout --lookups 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+
+from app.services.serp_service import SerpAPIService, SerpClient, SerpResponseCache, TenantQuota, extract_leads
+from benchmarks.serpapi_stub import StubServer
+
+CITIES = ["Austin", "Boston", "Chicago", "Denver", "Miami", "Seattle", "Portland", "Atlanta"]
+TRADES = ["plumbers", "roofers", "dentists", "accountants", "bakeries", "gyms", "florists", "electricians"]
+
+
+def lookups(n: int, repeat: int):
+    pairs = [(TRADES[i % len(TRADES)] + f" {i // len(TRADES)}", CITIES[i % len(CITIES)]) for i in range(n)]
+    return pairs + [(query.upper(), f"  {location} ") for query, location in pairs[:repeat]]
+
+
+async def per_call_clients(url: str, pairs):
+    # What generate_leads did before: a fresh client (and connection) for every lookup, one at a time
+    for query, location in pairs:
+        async with httpx.AsyncClient() as client:
+            response = await client.get(url, params={"q": f"{query} in {location}", "engine": "google"})
+            extract_leads(response.json())
+
+
+async def batched(service: SerpAPIService, user, pairs):
+    return await service.generate_leads_batch(user, pairs)
+
+
+def measure(server: StubServer, label: str, coroutine):
+    server.reset()
+    start = time.perf_counter()
+    result = asyncio.run(coroutine)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:7.2f}s  {server.requests:4d} requests  {server.connections:4d} connections")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=10, help="duplicate lookups differing only in case/spacing")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per search")
+    parser.add_argument("--tenant-concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", 0), latency=args.latency).start()
+    pairs = lookups(args.lookups, args.repeat)
+    print(f"{len(pairs)} lookups ({args.repeat} duplicates), stub latency {args.latency}s")
+
+    measure(server, "client per call, sequential", per_call_clients(server.url, pairs))
+
+    service = SerpAPIService(
+        client=SerpClient(base_url=server.url, api_key="stub"),
+        cache=SerpResponseCache(),
+        quota=TenantQuota(daily_limit=10 * len(pairs), concurrency=args.tenant_concurrency),
+    )
+
+    async def allow(user):
+        pass
+    service._check_access = allow
+    user = SimpleNamespace(organization_id=1)
+
+    async def twice():
+        first = await batched(service, user, pairs)
+        second_start = time.perf_counter()
+        second = await batched(service, user, pairs)
+        return first, second, time.perf_counter() - second_start
+
+    first, second, cached_time = measure(server, "shared client, batch + rerun", twice())
+    print(f"  {'rerun (all cached)':<28} {cached_time:7.3f}s")
+    errors = sum(1 for result in first if result["error"])
+    print(f"  first batch: {sum(r['cached'] for r in first)} shared/cached, {errors} errors; "
+          f"rerun: {sum(r['cached'] for r in second)}/{len(second)} cached")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
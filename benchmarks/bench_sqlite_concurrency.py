@@ -0,0 +1,156 @@
+# benchmarks/bench_sqlite_concurrency.py
+"""
+Read throughput while writes are in flight, with SQLite's defaults against the storage
+profile of app/models/database.py.
+
+    python -m benchmarks.bench_sqlite_concurrency --leads 100000 --readers 16 --writers 2 --duration 10
+
+Both runs use a copy of the same temporary database filled with --leads leads. --readers
+tasks page through one organization's leads (the GET /leads query) while --writers tasks
+insert and update leads in small transactions, for --duration seconds each:
+
+  default  rollback journal, default pragmas, one pool shared by readers and writers
+  profile  WAL and the configured pragmas, a small write pool and a query-only read pool
+
+Reported are reads/s, writes/s, read latency percentiles, and operations that failed
+(typically "database is locked").
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.models.database import apply_storage_profile
+from app.models.lead import Lead
+
+ORGS = 10
+
+
+def seed(path: str, leads: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Lead.__table__.create(engine)
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Lead {i}", "email": f"lead{i}@example.com", "phone": f"+1 555 {i:07d}",
+            "organization_id": i % ORGS + 1, "status": rng.choice(("new", "contacted", "qualified")),
+            "lead_score": rng.randrange(101), "created_at": now, "updated_at": now,
+        }
+        for i in range(leads)
+    ]
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 10000):
+            conn.execute(Lead.__table__.insert(), rows[start:start + 10000])
+    engine.dispose()
+
+
+def engines(path: str, profile: bool):
+    url = f"sqlite+aiosqlite:///{path}"
+    if not profile:
+        engine = create_async_engine(url)
+        return engine, engine
+    writer = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=settings.DB_WRITE_POOL_SIZE, max_overflow=settings.DB_WRITE_POOL_MAX_OVERFLOW)
+    apply_storage_profile(writer.sync_engine)
+    reader = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, pool_size=settings.DB_READ_POOL_SIZE, max_overflow=settings.DB_READ_POOL_MAX_OVERFLOW)
+    apply_storage_profile(reader.sync_engine, read_only=True)
+    return writer, reader
+
+
+async def read_loop(engine, deadline: float, rng: random.Random, stats):
+    while time.perf_counter() < deadline:
+        org = rng.randrange(ORGS) + 1
+        after = rng.randrange(stats["max_id"])
+        query = (
+            select(Lead.id, Lead.name, Lead.email, Lead.status, Lead.lead_score)
+            .where(Lead.organization_id == org, Lead.id > after)
+            .order_by(Lead.id).limit(50)
+        )
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                (await conn.execute(query)).all()
+            stats["read_latency"].append(time.perf_counter() - start)
+        except OperationalError:
+            stats["read_errors"] += 1
+
+
+async def write_loop(engine, deadline: float, rng: random.Random, stats):
+    now = datetime.utcnow()
+    while time.perf_counter() < deadline:
+        org = rng.randrange(ORGS) + 1
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(Lead.__table__.insert(), [
+                    {"name": f"New lead {rng.random()}", "organization_id": org, "status": "new", "created_at": now, "updated_at": now}
+                    for _ in range(5)
+                ])
+                await conn.execute(
+                    update(Lead).where(Lead.id == rng.randrange(stats["max_id"]) + 1).values(status="contacted", updated_at=now)
+                )
+            stats["writes"] += 1
+        except OperationalError:
+            stats["write_errors"] += 1
+
+
+async def measure(path: str, profile: bool, args) -> dict:
+    writer, reader = engines(path, profile)
+    async with writer.connect() as conn:
+        max_id = (await conn.execute(select(func.max(Lead.id)))).scalar()
+    stats = {"max_id": max_id, "read_latency": [], "read_errors": 0, "writes": 0, "write_errors": 0}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(
+        *(write_loop(writer, deadline, random.Random(-i - 1), stats) for i in range(args.writers)),
+        *(read_loop(reader, deadline, random.Random(i), stats) for i in range(args.readers)),
+    )
+    elapsed = time.perf_counter() - start
+    await writer.dispose()
+    await reader.dispose()
+
+    latencies = np.array(stats["read_latency"] or [0.0]) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "reads/s": len(stats["read_latency"]) / elapsed, "writes/s": stats["writes"] / elapsed,
+        "p50_ms": p50, "p95_ms": p95, "p99_ms": p99,
+        "read_errors": stats["read_errors"], "write_errors": stats["write_errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=100000)
+    parser.add_argument("--readers", type=int, default=16, help="concurrent reading tasks")
+    parser.add_argument("--writers", type=int, default=2, help="concurrent writing tasks")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_sqlite_")
+    try:
+        seeded = os.path.join(workdir, "seed.db")
+        seed(seeded, args.leads)
+        print(f"{args.leads:,} leads; {args.readers} readers and {args.writers} writers for {args.duration:g}s per run")
+        print(f"{'run':<8} {'reads/s':>9} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'read err':>8} {'write err':>9}")
+        for name, profile in (("default", False), ("profile", True)):
+            path = os.path.join(workdir, f"{name}.db")
+            shutil.copyfile(seeded, path)  # journal_mode=WAL persists in the file, so each run gets its own
+            row = asyncio.run(measure(path, profile, args))
+            print(f"{name:<8} {row['reads/s']:>9.0f} {row['writes/s']:>9.0f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                  f"{row['p99_ms']:>8.1f} {row['read_errors']:>8} {row['write_errors']:>9}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_startup.py
+"""
+Cold start of one API worker: what an autoscaled worker spends before it can answer.
+
+    python -m benchmarks.bench_startup --runs 15
+
+Every run is a fresh interpreter (as a new uvicorn worker is) started in a temporary
+directory holding a development database built by `python -m app.init_db`. Each run times
+three phases:
+
+  import   `import app.main`: routers, models, middleware
+  startup  the startup hooks: schema check, password-cost calibration, email outbox
+  first    the first request, GET /
+
+Two variants are run:
+
+  previous  the AI, SerpAPI, chatbot, scoring and dedupe services imported up front and
+            Base.metadata.create_all run at import, as app/main.py used to
+  current   app/main.py as it is: services loaded by the first request using them and a
+            read-only check of the alembic revision instead of DDL
+
+Reported are the median and p95 of each phase and the heavy modules loaded by the end of
+the run.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("numpy", "httpx", "alembic", "app.services.retrieval", "app.services.serp_service")
+
+# Runs in the child interpreter; the variant name is argv[1]
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+if sys.argv[1] == "previous":
+    import app.services.AI_service, app.services.chatbot_service, app.services.serp_service
+    import app.services.lead_scoring, app.services.lead_dedupe
+    from app.models.database import Base, engine
+    Base.metadata.create_all(bind=engine)
+from app.main import app
+imported = time.perf_counter()
+
+async def get_root():
+    # A bare ASGI call, so no HTTP client library is loaded by the benchmark itself
+    sent = []
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": "/", "raw_path": b"/",
+        "root_path": "", "query_string": b"", "headers": [], "server": ("bench", 80), "client": ("bench", 1),
+    }
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        sent.append(message)
+    await app(scope, receive, send)
+    assert sent[0]["status"] == 200
+
+async def main():
+    await app.router.startup()
+    started = time.perf_counter()
+    await get_root()
+    answered = time.perf_counter()
+    await app.router.shutdown()
+    return started, answered
+
+started, answered = asyncio.run(main())
+print(json.dumps({
+    "import": imported - start, "startup": started - imported, "first": answered - started,
+    "total": answered - start, "modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_child(workdir: str, variant: str, env) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, variant], cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=15, help="cold starts per variant")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    env.setdefault("EMAIL_OUTBOX_ENABLED", "false")
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        subprocess.run([sys.executable, "-m", "app.init_db"], cwd=workdir, env=env, check=True, capture_output=True)
+        print(f"{args.runs} cold starts per variant")
+        print(f"{'variant':<9} {'import ms':>15} {'startup ms':>15} {'first ms':>13} {'total ms':>15}  heavy modules loaded")
+        print(f"{'':<9} {'p50':>7} {'p95':>7} {'p50':>7} {'p95':>7} {'p50':>6} {'p95':>6} {'p50':>7} {'p95':>7}")
+        for variant in ("previous", "current"):
+            child = run_child(workdir, variant, env)  # warm the OS file cache and .pyc files
+            runs = [run_child(workdir, variant, env) for _ in range(args.runs)]
+            cells = []
+            for phase, width in (("import", 7), ("startup", 7), ("first", 6), ("total", 7)):
+                p50, p95 = np.percentile([run[phase] * 1000 for run in runs], [50, 95])
+                cells.append(f"{p50:>{width}.0f} {p95:>{width}.0f}")
+            print(f"{variant:<9} {' '.join(cells)}  {', '.join(child['modules']) or '-'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
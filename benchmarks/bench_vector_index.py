@@ -0,0 +1,86 @@
+# benchmarks/bench_vector_index.py
+"""
+Vector index search latency and recall versus nprobe.
+
+Builds an index of `--vectors` synthetic clustered embeddings in a temporary directory
+(the same memory-mapped files the app uses), then runs `--queries` searches per nprobe
+value and reports p50/p99 latency and recall@k against exact brute-force search:
+
+    python -m benchmarks.bench_vector_index --vectors 1000000 --nprobe 1 4 8 16 32
+
+`--list-factor` sets the number of inverted lists (factor x sqrt(vectors)), the other
+default besides nprobe that trades latency for recall.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.vector_index import KIND_LEAD, VectorIndex, encode_key
+
+
+def clustered(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIM)
+    parser.add_argument("--clusters", type=int, default=2000, help="topics in the synthetic data")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--batch", type=int, default=50000, help="vectors per update_documents call")
+    parser.add_argument("--list-factor", type=float, default=settings.VECTOR_INDEX_LIST_FACTOR)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as path:
+        index = VectorIndex(path, args.dim, "synthetic", train_min=args.vectors + 1)  # train once, below
+        index.acquire()
+        start = time.perf_counter()
+        for offset in range(0, args.vectors, args.batch):
+            batch = clustered(min(args.batch, args.vectors - offset), args.dim, args.clusters, np.random.default_rng(offset))
+            row_ids = list(range(offset + 1, offset + 1 + len(batch)))
+            index.update_documents(
+                KIND_LEAD, row_ids, [encode_key(KIND_LEAD, row_id) for row_id in row_ids], row_ids,
+                lambda positions: batch[positions],
+            )
+        index.train_min = settings.VECTOR_INDEX_TRAIN_MIN
+        index.train(list_factor=args.list_factor)
+        index.release()
+        print(f"built {args.vectors} vectors in {time.perf_counter() - start:.1f}s: {index.stats()}")
+
+        # Exact top-k over the same (int8) vectors the index scores
+        stored = index._dequantized(0, index.count)
+        keys = np.asarray(index._arrays["keys"][:index.count])
+        queries = clustered(args.queries, args.dim, args.clusters, rng)
+        exact = []
+        start = time.perf_counter()
+        for query in queries:
+            scores = stored @ query
+            exact.append(set(keys[np.argpartition(-scores, args.k - 1)[:args.k]].tolist()))
+        brute_ms = (time.perf_counter() - start) * 1000 / args.queries
+        del stored
+        print(f"brute force: {brute_ms:.2f} ms/query")
+
+        print(f"{'nprobe':>6} {'p50 ms':>8} {'p99 ms':>8} {'recall@' + str(args.k):>10}")
+        for nprobe in args.nprobe:
+            latencies, found = [], 0
+            for query, truth in zip(queries, exact):
+                start = time.perf_counter()
+                hits = index.search(query, args.k, nprobe=nprobe)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found += len(truth & {key for key, _ in hits})
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"{nprobe:>6} {p50:>8.2f} {p99:>8.2f} {found / (args.k * args.queries):>10.3f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# benchmarks/datagen.py
+"""
+Bulk synthetic tenant data: N organizations x U users x M leads x K complaints.
+
+Rows are built in batches and written with one executemany per batch and table (no ORM
+objects), and the dashboard aggregates are maintained the way lead imports maintain them.
+On SQLite the full-text index triggers are dropped for the load and the indexes rebuilt
+once at the end. Everything is deterministic for a given --seed, and new ids start after
+the existing ones, so runs can be stacked on an existing database:
+
+    python -m benchmarks.datagen --url sqlite:///./smart_crm.db --orgs 20 --users 10 --leads 50000 --complaints 10000
+
+Counts are per organization. Every user's password is --password; the first user of each
+organization is its org_admin, the rest are employees.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy import Integer, cast, create_engine, event, func, inspect, select, text
+
+from app.core.normalize import normalize_email, normalize_phone
+from app.core.security import pwd_context
+from app.models.complaint import Complaint
+from app.models.lead import Lead
+from app.models.org_aggregate import apply_deltas, insert_deltas
+from app.models.organization import Organization, SubscriptionTier
+from app.models.search_index import FTS_TABLES, fts_ddl
+from app.models.user import User
+
+FIRST = ("Ada Ben Cleo Dev Eli Fay Gus Hana Ivan Jo Kai Lena Milo Nia Omar Pia Quinn Rosa Sam Tara "
+         "Uma Vic Wes Xena Yuri Zoe").split()
+LAST = ("Adams Brooks Chen Diaz Evans Fox Garcia Hughes Ito Jensen Khan Lopez Moreau Novak Okafor "
+        "Patel Quist Rossi Silva Tanaka Ueda Vargas Weber Xu Young Zimmer").split()
+COMPANY = ("Acme Apex Blue Bright Cedar Delta Echo Fusion Granite Harbor Iris Juniper Keystone Lumen "
+           "Meridian Nova Orbit Pioneer Quantum Ridge Summit Terra Unity Vertex Willow Zenith").split()
+KIND = "Labs Logistics Dental Bakery Fitness Roofing Plumbing Consulting Media Foods Motors Health".split()
+LEAD_STATUSES = ("new", "new", "contacted", "qualified", "converted", "closed")
+CATEGORIES = (None, None, "hot", "warm", "cold")
+ISSUES = ("Invoice charged twice", "App crashes on login", "Delivery arrived late", "Refund not received",
+          "Cannot reset password", "Wrong item shipped", "Slow support response", "Export fails with error")
+COMPLAINT_STATUSES = ("open", "open", "in_progress", "closed")
+PRIORITIES = ("low", "medium", "medium", "high")
+TYPES = ("billing", "technical", "general", None)
+TIERS = (SubscriptionTier.FREE, SubscriptionTier.BASIC, SubscriptionTier.PREMIUM)
+
+
+def _next_id(conn, column) -> int:
+    return (conn.execute(select(func.coalesce(func.max(column), 0))).scalar() or 0) + 1
+
+
+def _timestamps(rng: random.Random, now: datetime, days: int):
+    created = now - timedelta(seconds=rng.randrange(days * 86400))
+    return created, created + timedelta(seconds=rng.randrange(86400 * 3))
+
+
+def lead_rows(rng: random.Random, org_id: int, user_ids: List[int], count: int, now: datetime, days: int) -> Iterator[Dict]:
+    for _ in range(count):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        company = f"{rng.choice(COMPANY)} {rng.choice(KIND)}"
+        domain = company.lower().replace(" ", "") + ".example"
+        email = f"{first.lower()}.{last.lower()}{rng.randrange(1000)}@{domain}" if rng.random() < 0.9 else None
+        phone = f"+1 {rng.randrange(200, 999)} {rng.randrange(100, 999)} {rng.randrange(1000, 9999)}"
+        created, updated = _timestamps(rng, now, days)
+        yield {
+            "name": f"{first} {last} ({company})", "email": email, "phone": phone,
+            "email_normalized": normalize_email(email), "phone_normalized": normalize_phone(phone),
+            "organization_id": org_id,
+            "assigned_to_id": rng.choice(user_ids) if rng.random() < 0.6 else None,
+            "status": rng.choice(LEAD_STATUSES), "lead_score": rng.randrange(101),
+            "category": rng.choice(CATEGORIES), "created_at": created, "updated_at": updated,
+        }
+
+
+def complaint_rows(rng: random.Random, org_id: int, user_ids: List[int], count: int, now: datetime, days: int) -> Iterator[Dict]:
+    for _ in range(count):
+        issue = rng.choice(ISSUES)
+        created, updated = _timestamps(rng, now, days)
+        yield {
+            "title": issue, "description": f"{issue}. Order #{rng.randrange(10**6):06d}, reported by {rng.choice(FIRST)}.",
+            "status": rng.choice(COMPLAINT_STATUSES), "priority": rng.choice(PRIORITIES), "type": rng.choice(TYPES),
+            "organization_id": org_id, "created_by_id": rng.choice(user_ids),
+            "assigned_to_id": rng.choice(user_ids) if rng.random() < 0.5 else None,
+            "created_at": created, "updated_at": updated,
+        }
+
+
+def insert_batches(engine, model, rows: Iterator[Dict], batch_size: int) -> int:
+    """
+    executemany `rows` into `model`'s table `batch_size` at a time, one transaction per batch,
+    counting them into the dashboard aggregates as they go.
+    """
+    written = 0
+    while True:
+        batch = [row for _, row in zip(range(batch_size), rows)]
+        if not batch:
+            return written
+        with engine.begin() as conn:
+            conn.execute(model.__table__.insert(), batch)
+            apply_deltas(conn, insert_deltas(model, batch))
+        written += len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite:///./smart_crm.db", help="database to fill (schema must exist)")
+    parser.add_argument("--orgs", type=int, default=10)
+    parser.add_argument("--users", type=int, default=5, help="users per organization")
+    parser.add_argument("--leads", type=int, default=10000, help="leads per organization")
+    parser.add_argument("--complaints", type=int, default=2000, help="complaints per organization")
+    parser.add_argument("--days", type=int, default=365, help="spread created_at over this many days")
+    parser.add_argument("--batch", type=int, default=10000, help="rows per executemany")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    hashed_password = pwd_context.hash(args.password)  # one hash shared by every generated user
+    sqlite = engine.dialect.name == "sqlite"
+    fts_tables = [table for table in FTS_TABLES if sqlite and inspect(engine).has_table(FTS_TABLES[table][0])]
+
+    if sqlite:
+        @event.listens_for(engine, "connect")
+        def _fast_load(dbapi_connection, _):
+            dbapi_connection.execute("PRAGMA synchronous=OFF")
+            dbapi_connection.execute("PRAGMA journal_mode=WAL")
+    with engine.begin() as conn:
+        for table in fts_tables:
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLES[table][0]}_{suffix}"))
+
+    start = time.perf_counter()
+    totals = Counter()
+    try:
+        with engine.begin() as conn:
+            first_org = _next_id(conn, Organization.id)
+            # users.id is TEXT in older databases
+            first_user = _next_id(conn, cast(User.id, Integer))
+        user_id = first_user
+        for org_id in range(first_org, first_org + args.orgs):
+            user_ids = list(range(user_id, user_id + args.users))
+            user_id += args.users
+            with engine.begin() as conn:
+                conn.execute(Organization.__table__.insert(), [{
+                    "id": org_id, "name": f"Bench Org {org_id}", "subscription_tier": TIERS[org_id % len(TIERS)],
+                }])
+                conn.execute(User.__table__.insert(), [
+                    {
+                        "id": uid, "email": f"user{uid}@org{org_id}.bench", "hashed_password": hashed_password,
+                        "role": "org_admin" if index == 0 else "employee", "organization_id": str(org_id),
+                        "first_name": rng.choice(FIRST), "last_name": rng.choice(LAST), "is_active": True,
+                        "token_epoch": 0, "created_at": now,
+                    }
+                    for index, uid in enumerate(user_ids)
+                ])
+            totals["organizations"] += 1
+            totals["users"] += len(user_ids)
+            totals["leads"] += insert_batches(engine, Lead, lead_rows(rng, org_id, user_ids, args.leads, now, args.days), args.batch)
+            totals["complaints"] += insert_batches(
+                engine, Complaint, complaint_rows(rng, org_id, user_ids, args.complaints, now, args.days), args.batch
+            )
+            elapsed = time.perf_counter() - start
+            print(f"org {org_id}: {sum(totals.values()):,} rows in {elapsed:.1f}s ({sum(totals.values()) / elapsed:,.0f} rows/s)")
+    finally:
+        if fts_tables:
+            rebuild = time.perf_counter()
+            with engine.begin() as conn:
+                for table in fts_tables:
+                    for statement in fts_ddl(table):
+                        conn.execute(text(statement))
+                    fts = FTS_TABLES[table][0]
+                    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            print(f"rebuilt full-text indexes in {time.perf_counter() - rebuild:.1f}s")
+
+    elapsed = time.perf_counter() - start
+    print(f"done: {dict(totals)} in {elapsed:.1f}s; users can log in as user<id>@org<org>.bench / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/serpapi_stub.py
+"""
+Local stand-in for the SerpAPI search endpoint, for tests and benchmarks.
+
+Answers GET /search with `--results` deterministic organic results for the query after
+`--latency` seconds, keeps connections alive, and counts the requests it served (GET
+/stats). Point the app at it with SERPAPI_BASE_URL:
+
+    python -m benchmarks.serpapi_stub --port 8765 --latency 0.2
+    SERPAPI_BASE_URL=http://127.0.0.1:8765/search uvicorn app.main:app
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.2, results: int = 10, fail_every: int = 0):
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.results = results
+        self.fail_every = fail_every   # >0: every Nth request gets a 500
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def reset(self):
+        with self._lock:
+            self.requests = self.connections = 0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            return self._send(200, {"requests": self.server.requests, "connections": self.server.connections})
+        with self.server._lock:
+            self.server.requests += 1
+            number = self.server.requests
+        time.sleep(self.server.latency)
+        if self.server.fail_every and number % self.server.fail_every == 0:
+            return self._send(500, {"error": "stub failure"})
+        query = parse_qs(url.query).get("q", [""])[0]
+        slug = "".join(ch for ch in query.lower() if ch.isalnum())[:20] or "lead"
+        self._send(200, {"organic_results": [
+            {"title": f"{query} #{rank}", "email": f"info{rank}@{slug}.example", "phone": f"+1 555 {rank:04d}"}
+            for rank in range(1, self.server.results + 1)
+        ]})
+
+    def _send(self, code: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per search")
+    parser.add_argument("--results", type=int, default=10)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+    server = StubServer((args.host, args.port), args.latency, args.results, args.fail_every)
+    print(f"SerpAPI stub on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
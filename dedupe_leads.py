@@ -0,0 +1,59 @@
+# dedupe_leads.py
+"""
+Nightly duplicate-lead detection.
+
+Signs the leads of every organization (or just the ones given) and records merge
+suggestions for likely duplicates, reviewed through GET /leads/duplicates. After an
+organization's first run only leads changed since the previous run are signed and matched;
+pass --full after changing the DEDUPE_* signature settings:
+
+    python dedupe_leads.py            # all organizations, incremental
+    python dedupe_leads.py --full 3   # re-sign every lead of organization 3
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from sqlalchemy import select
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.db import shard_engines, tenant_sessionmaker
+from app.models.database import AsyncSessionLocal, async_engine, async_read_engine
+from app.models.organization import Organization
+from app.services.lead_dedupe import run_lead_dedupe
+
+
+async def run(org_ids, full: bool):
+    try:
+        if not org_ids:
+            async with AsyncSessionLocal() as db:
+                org_ids = (await db.execute(select(Organization.id).order_by(Organization.id))).scalars().all()
+        for org_id in org_ids:
+            sessions = await tenant_sessionmaker(org_id)  # the organization's shard
+            async with sessions() as db:
+                start = time.perf_counter()
+                result = await run_lead_dedupe(db, org_id, full=full)
+                print(
+                    f"organization {org_id}: signed {result['processed']} leads "
+                    f"({'full' if result['full'] else 'incremental'}), compared {result['compared']} pairs, "
+                    f"{result['suggested']} new suggestions in {time.perf_counter() - start:.2f}s"
+                )
+    finally:
+        # pooled connections would keep the process alive
+        await async_engine.dispose()
+        await async_read_engine.dispose()
+        await shard_engines.aclose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("org_ids", type=int, nargs="*")
+    parser.add_argument("--full", action="store_true", help="re-sign every lead")
+    args = parser.parse_args()
+    asyncio.run(run(args.org_ids, args.full))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# migrate_tenant.py
+"""
+Move an organization's data to another database file without taking it offline.
+
+Copies the organization's leads, complaints and knowledge articles (plus a copy of its
+users) to ./<shard>.db in batches while it stays in use, repeats passes until
+little is left to catch up, then freezes writes for a few seconds, copies the rest and
+flips the shard directory (tenant_shards) in one transaction. See
+app/services/tenant_migration.py.
+
+    python migrate_tenant.py 7 shard_acme            # isolate organization 7
+    python migrate_tenant.py 7 shard_acme --purge    # and delete its rows from the old database
+    python migrate_tenant.py 7 default               # move it back to the main database
+    python migrate_tenant.py --list                  # organizations not on the main database
+    python migrate_tenant.py --create-tables         # add tables new since the shards were created
+"""
+import argparse
+import sys
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db import DEFAULT_SHARD
+from app.models.database import Base, engine
+from app.models.tenant_shard import TenantShard
+from app.services.tenant_migration import move_tenant, shard_engine
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("org_id", type=int, nargs="?")
+    parser.add_argument("shard", nargs="?", help='target shard name, or "default" for the main database')
+    parser.add_argument("--batch", type=int, default=settings.TENANT_MIGRATION_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--cutover-rows", type=int, default=settings.TENANT_MIGRATION_CUTOVER_ROWS,
+                        help="cut over once a catch-up pass changes fewer rows than this")
+    parser.add_argument("--purge", action="store_true", help="delete the organization's rows from the old database")
+    parser.add_argument("--list", action="store_true", help="print the shard directory and exit")
+    parser.add_argument("--create-tables", action="store_true",
+                        help="create missing tables on every shard (shards are built from the models, not migrated)")
+    args = parser.parse_args()
+
+    if args.list:
+        with engine.connect() as conn:
+            for row in conn.execute(select(TenantShard).order_by(TenantShard.organization_id)):
+                print(f"organization {row.organization_id}: {row.shard}{' (frozen)' if row.frozen else ''}, since {row.updated_at}")
+        return 0
+    if args.create_tables:
+        with engine.connect() as conn:
+            shards = sorted(set(conn.execute(select(TenantShard.shard)).scalars()) - {DEFAULT_SHARD})
+        for shard in shards:
+            Base.metadata.create_all(shard_engine(shard))  # only adds what's missing; new columns need a migration
+            print(f"{shard}: tables up to date")
+        return 0
+    if args.org_id is None or args.shard is None:
+        parser.error("org_id and shard are required")
+    try:
+        result = move_tenant(args.org_id, args.shard, batch_size=args.batch, cutover_rows=args.cutover_rows, purge_source=args.purge)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,10 @@
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
-from sqlalchemy import pool
-from app.models.database import Base
-from app.models import user, organization, lead  # import all models
-from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import create_engine, pool
 from alembic import context
 
-from app.models.database import Base
-from app.models.organization import Organization
-from app.models.user import User
-from app.models.lead import Lead
-
-# this is the target metadata for 'autogenerate'
-target_metadata = Base.metadata
-
-
-from alembic import context
+from app.core.config import settings
+from app.models import Base  # registers every model on Base.metadata
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -40,6 +27,17 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def database_url() -> str:
+    # The database the app runs on, unless another (e.g. a tenant shard) is named with
+    # `alembic -x url=sqlite:///./shards/x.db upgrade head`
+    return context.get_x_argument(as_dictionary=True).get("url") or settings.DATABASE_URL
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # FTS5 search tables (and their shadow tables) are created by raw SQL; see app/models/search_index.py
+    return not (type_ == "table" and reflected and compare_to is None and "_fts" in name)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -52,10 +50,10 @@ def run_migrations_offline() -> None:
     script output.
 
     """
-    url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url,
+        url=database_url(),
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -71,15 +69,11 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,54 @@
+"""Add org aggregates
+
+Revision ID: 1b7e4c9a2d63
+Revises: f0c6b8e3a514
+Create Date: 2026-10-18 17:35:12.418306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7e4c9a2d63'
+down_revision: Union[str, Sequence[str], None] = 'f0c6b8e3a514'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (entity, table, counted columns) as tracked when this revision was written
+TRACKED = [
+    ('lead', 'leads', ['status', 'category']),
+    ('complaint', 'complaints', ['status', 'priority', 'type']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('org_aggregates',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('dimension', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('organization_id', 'entity', 'dimension', 'value')
+    )
+
+    # Backfill from the existing rows
+    for entity, table, columns in TRACKED:
+        op.execute(
+            f"INSERT INTO org_aggregates (organization_id, entity, dimension, value, count) "
+            f"SELECT organization_id, '{entity}', 'total', '', COUNT(*) FROM {table} GROUP BY organization_id"
+        )
+        for column in columns:
+            op.execute(
+                f"INSERT INTO org_aggregates (organization_id, entity, dimension, value, count) "
+                f"SELECT organization_id, '{entity}', '{column}', COALESCE(CAST({column} AS VARCHAR), ''), COUNT(*) "
+                f"FROM {table} GROUP BY organization_id, COALESCE(CAST({column} AS VARCHAR), '')"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('org_aggregates')
@@ -0,0 +1,147 @@
+"""Align the initial tables with the models
+
+Revision ID: 2f8b6d4e9a17
+Revises: 3e7fbbc62ad4
+Create Date: 2026-10-18 14:40:12.503817
+
+The initial migration was generated from an earlier draft of the models (UUID keys,
+leads.org_id, complaints tied to leads). This brings its tables to the integer-keyed
+schema the app has always run on, the one every later migration builds on. SQLite can't
+alter or drop columns in place (3e7fbbc62ad4 tried to, and is skipped there), so tables
+are changed in batch mode: each is rebuilt under a temporary name, its rows copied across,
+and renamed back.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f8b6d4e9a17'
+down_revision: Union[str, Sequence[str], None] = '3e7fbbc62ad4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # complaints pointed at leads rather than at their author; nothing could have used it
+    op.drop_table('complaints')
+
+    with op.batch_alter_table('organizations') as batch_op:
+        batch_op.alter_column('id', existing_type=sa.UUID(), type_=sa.Integer(), existing_nullable=False)
+        batch_op.drop_column('domain')
+        batch_op.drop_column('subscription_tier')  # added back by d7b3a1f6e820
+        batch_op.drop_column('is_active')
+        batch_op.drop_column('created_at')
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('id', existing_type=sa.UUID(), type_=sa.Integer(), existing_nullable=False)
+        batch_op.alter_column('role', existing_type=sa.Enum('SYSTEM_ADMIN', 'ORG_ADMIN', 'EMPLOYEE', 'CUSTOMER', name='userrole'),
+                              type_=sa.String(), existing_nullable=False)
+        batch_op.alter_column('organization_id', existing_type=sa.UUID(), type_=sa.String(length=36), existing_nullable=True)
+        batch_op.alter_column('first_name', existing_type=sa.String(), nullable=True)
+        batch_op.alter_column('last_name', existing_type=sa.String(), nullable=True)
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_users_id'), ['id'], unique=False)
+
+    with op.batch_alter_table('leads') as batch_op:
+        batch_op.drop_index('ix_leads_email')
+        batch_op.alter_column('id', existing_type=sa.UUID(), type_=sa.Integer(), existing_nullable=False)
+        batch_op.alter_column('email', existing_type=sa.String(), nullable=True)
+        batch_op.alter_column('org_id', new_column_name='organization_id', existing_type=sa.UUID(), type_=sa.Integer(),
+                              existing_nullable=False)
+        batch_op.alter_column('score', new_column_name='lead_score', existing_type=sa.Integer(), existing_nullable=True)
+        batch_op.add_column(sa.Column('assigned_to_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('category', sa.String(), nullable=True))
+        batch_op.create_foreign_key('fk_leads_assigned_to_id_users', 'users', ['assigned_to_id'], ['id'])
+        batch_op.create_index(batch_op.f('ix_leads_id'), ['id'], unique=False)
+
+    op.create_table('complaints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('priority', sa.String(), nullable=True),
+    sa.Column('type', sa.String(), nullable=True),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('created_by_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_to_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_complaints_id'), 'complaints', ['id'], unique=False)
+    for table in ('customers', 'employees'):
+        op.create_table(table,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('organization_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+        )
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('employees', 'customers'):
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+        op.drop_table(table)
+    op.drop_index(op.f('ix_complaints_id'), table_name='complaints')
+    op.drop_table('complaints')
+
+    with op.batch_alter_table('leads') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_leads_id'))
+        batch_op.drop_constraint('fk_leads_assigned_to_id_users', type_='foreignkey')
+        batch_op.drop_column('category')
+        batch_op.drop_column('status')
+        batch_op.drop_column('assigned_to_id')
+        batch_op.alter_column('lead_score', new_column_name='score', existing_type=sa.Integer(), existing_nullable=True)
+        batch_op.alter_column('organization_id', new_column_name='org_id', existing_type=sa.Integer(), type_=sa.UUID(),
+                              existing_nullable=False)
+        batch_op.alter_column('email', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('id', existing_type=sa.Integer(), type_=sa.UUID(), existing_nullable=False)
+        batch_op.create_index(batch_op.f('ix_leads_email'), ['email'], unique=True)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+        batch_op.alter_column('last_name', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('first_name', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('organization_id', existing_type=sa.String(length=36), type_=sa.UUID(), existing_nullable=True)
+        batch_op.alter_column('role', existing_type=sa.String(),
+                              type_=sa.Enum('SYSTEM_ADMIN', 'ORG_ADMIN', 'EMPLOYEE', 'CUSTOMER', name='userrole'),
+                              existing_nullable=False)
+        batch_op.alter_column('id', existing_type=sa.Integer(), type_=sa.UUID(), existing_nullable=False)
+
+    with op.batch_alter_table('organizations') as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('is_active', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('subscription_tier', sa.Enum('FREE', 'BASIC', 'PREMIUM', name='subscriptiontier'), nullable=True))
+        batch_op.add_column(sa.Column('domain', sa.String(), server_default='', nullable=False))
+        batch_op.alter_column('id', existing_type=sa.Integer(), type_=sa.UUID(), existing_nullable=False)
+        batch_op.create_unique_constraint('uq_organizations_domain', ['domain'])
+
+    op.create_table('complaints',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('org_id', sa.UUID(), nullable=False),
+    sa.Column('lead_id', sa.UUID(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('classification', sa.String(), nullable=True),
+    sa.Column('priority', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
@@ -0,0 +1,35 @@
+"""Add tenant shard directory
+
+Revision ID: 4b9d2e7c1a58
+Revises: d8e2f4a6b190
+Create Date: 2026-10-19 09:12:44.518206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b9d2e7c1a58'
+down_revision: Union[str, Sequence[str], None] = 'd8e2f4a6b190'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tenant_shards',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(), nullable=False),
+    sa.Column('frozen', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tenant_shards')
@@ -0,0 +1,42 @@
+"""Keep merged lead suggestions: snapshot the duplicate, SET NULL on its deletion
+
+Revision ID: 5c9e3b7a1d42
+Revises: 8d4a2f6c1e93
+Create Date: 2026-10-21 15:40:18.503126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c9e3b7a1d42'
+down_revision: Union[str, Sequence[str], None] = '8d4a2f6c1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The foreign keys were created unnamed; batch mode finds them by these names on SQLite
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+DUPLICATE_FK = 'fk_lead_merge_suggestions_duplicate_id_leads'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('lead_merge_suggestions', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.add_column(sa.Column('duplicate_snapshot', sa.Text(), nullable=True))
+        batch_op.alter_column('duplicate_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.drop_constraint(DUPLICATE_FK, type_='foreignkey')
+        batch_op.create_foreign_key(DUPLICATE_FK, 'leads', ['duplicate_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Merged suggestions whose duplicate is gone can't point at it any more
+    op.execute("DELETE FROM lead_merge_suggestions WHERE duplicate_id IS NULL")
+    with op.batch_alter_table('lead_merge_suggestions', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(DUPLICATE_FK, type_='foreignkey')
+        batch_op.create_foreign_key(DUPLICATE_FK, 'leads', ['duplicate_id'], ['id'], ondelete='CASCADE')
+        batch_op.alter_column('duplicate_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('duplicate_snapshot')
@@ -0,0 +1,48 @@
+"""Add change-data-capture log and consumer offsets
+
+Revision ID: 6f1c3a9e2d75
+Revises: 4b9d2e7c1a58
+Create Date: 2026-10-20 10:03:27.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f1c3a9e2d75'
+down_revision: Union[str, Sequence[str], None] = '4b9d2e7c1a58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_log',
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=True),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('row_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('changes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq'),
+    sqlite_autoincrement=True
+    )
+    op.create_index('ix_change_log_org_seq', 'change_log', ['organization_id', 'seq'], unique=False)
+    op.create_table('change_consumers',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name', 'organization_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_consumers')
+    op.drop_index('ix_change_log_org_seq', table_name='change_log')
+    op.drop_table('change_log')
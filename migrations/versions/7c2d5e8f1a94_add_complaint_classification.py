@@ -0,0 +1,43 @@
+"""Add complaint classification
+
+Revision ID: 7c2d5e8f1a94
+Revises: 1b7e4c9a2d63
+Create Date: 2026-10-18 18:12:40.205117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d5e8f1a94'
+down_revision: Union[str, Sequence[str], None] = '1b7e4c9a2d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recount_complaints_by(column: str) -> None:
+    op.execute("DELETE FROM org_aggregates WHERE entity = 'complaint' AND dimension IN ('type', 'classification')")
+    op.execute(
+        f"INSERT INTO org_aggregates (organization_id, entity, dimension, value, count) "
+        f"SELECT organization_id, 'complaint', '{column}', COALESCE(CAST({column} AS VARCHAR), ''), COUNT(*) "
+        f"FROM complaints GROUP BY organization_id, COALESCE(CAST({column} AS VARCHAR), '')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('complaints', sa.Column('classification', sa.String(), nullable=True))
+    op.create_index('ix_complaints_org_classification', 'complaints', ['organization_id', 'classification'], unique=False)
+    # Dashboard counts complaints by classification now instead of by type
+    _recount_complaints_by('classification')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recount_complaints_by('type')
+    op.drop_index('ix_complaints_org_classification', table_name='complaints')
+    with op.batch_alter_table('complaints') as batch_op:
+        batch_op.drop_column('classification')
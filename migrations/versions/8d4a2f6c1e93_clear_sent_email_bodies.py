@@ -0,0 +1,33 @@
+"""Clear the bodies of sent and failed outbox emails
+
+Revision ID: 8d4a2f6c1e93
+Revises: 6f1c3a9e2d75
+Create Date: 2026-10-21 09:12:40.215837
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4a2f6c1e93'
+down_revision: Union[str, Sequence[str], None] = '6f1c3a9e2d75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('email_outbox') as batch_op:
+        batch_op.alter_column('body', existing_type=sa.Text(), nullable=True)
+    # Welcome emails carry temporary passwords; keep a body only until it is sent
+    op.execute("UPDATE email_outbox SET body = NULL WHERE status IN ('sent', 'failed')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE email_outbox SET body = '' WHERE body IS NULL")
+    with op.batch_alter_table('email_outbox') as batch_op:
+        batch_op.alter_column('body', existing_type=sa.Text(), nullable=False)
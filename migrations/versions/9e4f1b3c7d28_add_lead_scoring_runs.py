@@ -0,0 +1,46 @@
+"""Add lead scoring runs
+
+Revision ID: 9e4f1b3c7d28
+Revises: 7c2d5e8f1a94
+Create Date: 2026-10-18 18:54:27.630981
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4f1b3c7d28'
+down_revision: Union[str, Sequence[str], None] = '7c2d5e8f1a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lead_scoring_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('full', sa.Boolean(), nullable=False),
+    sa.Column('high_water_mark', sa.DateTime(), nullable=True),
+    sa.Column('scored', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_lead_scoring_runs_id'), 'lead_scoring_runs', ['id'], unique=False)
+    op.create_index('ix_lead_scoring_runs_org_finished', 'lead_scoring_runs', ['organization_id', 'finished_at'], unique=False)
+    op.create_index('ix_leads_org_updated_id', 'leads', ['organization_id', 'updated_at', 'id'], unique=False)
+    # Incremental scoring tracks leads by updated_at, so every lead needs one
+    op.execute("UPDATE leads SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leads_org_updated_id', table_name='leads')
+    op.drop_index('ix_lead_scoring_runs_org_finished', table_name='lead_scoring_runs')
+    op.drop_index(op.f('ix_lead_scoring_runs_id'), table_name='lead_scoring_runs')
+    op.drop_table('lead_scoring_runs')
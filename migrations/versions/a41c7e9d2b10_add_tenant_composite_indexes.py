@@ -0,0 +1,40 @@
+"""Add tenant composite indexes
+
+Revision ID: a41c7e9d2b10
+Revises: 2f8b6d4e9a17
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e9d2b10'
+down_revision: Union[str, Sequence[str], None] = '2f8b6d4e9a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_leads_org_created_id', 'leads', ['organization_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_leads_org_status_created', 'leads', ['organization_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_leads_org_assigned_created', 'leads', ['organization_id', 'assigned_to_id', 'created_at'], unique=False)
+    op.create_index('ix_complaints_org_created_id', 'complaints', ['organization_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_complaints_org_status_created', 'complaints', ['organization_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_complaints_org_priority_created', 'complaints', ['organization_id', 'priority', 'created_at'], unique=False)
+    op.create_index('ix_complaints_org_assigned_created', 'complaints', ['organization_id', 'assigned_to_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_complaints_org_assigned_created', table_name='complaints')
+    op.drop_index('ix_complaints_org_priority_created', table_name='complaints')
+    op.drop_index('ix_complaints_org_status_created', table_name='complaints')
+    op.drop_index('ix_complaints_org_created_id', table_name='complaints')
+    op.drop_index('ix_leads_org_assigned_created', table_name='leads')
+    op.drop_index('ix_leads_org_status_created', table_name='leads')
+    op.drop_index('ix_leads_org_created_id', table_name='leads')
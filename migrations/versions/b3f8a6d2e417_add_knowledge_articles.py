@@ -0,0 +1,41 @@
+"""Add knowledge articles
+
+Revision ID: b3f8a6d2e417
+Revises: 9e4f1b3c7d28
+Create Date: 2026-10-18 19:40:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8a6d2e417'
+down_revision: Union[str, Sequence[str], None] = '9e4f1b3c7d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('knowledge_articles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_knowledge_articles_id'), 'knowledge_articles', ['id'], unique=False)
+    op.create_index('ix_knowledge_articles_org_id', 'knowledge_articles', ['organization_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_knowledge_articles_org_id', table_name='knowledge_articles')
+    op.drop_index(op.f('ix_knowledge_articles_id'), table_name='knowledge_articles')
+    op.drop_table('knowledge_articles')
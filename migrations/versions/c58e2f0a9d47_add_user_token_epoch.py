@@ -0,0 +1,29 @@
+"""Add user token epoch
+
+Revision ID: c58e2f0a9d47
+Revises: a41c7e9d2b10
+Create Date: 2026-10-18 11:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c58e2f0a9d47'
+down_revision: Union[str, Sequence[str], None] = 'a41c7e9d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_epoch', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('token_epoch')
@@ -0,0 +1,61 @@
+"""Add FTS5 search indexes for leads and complaints
+
+Revision ID: c5a1d7e3f902
+Revises: b3f8a6d2e417
+Create Date: 2026-10-18 21:02:44.510238
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a1d7e3f902'
+down_revision: Union[str, Sequence[str], None] = 'b3f8a6d2e417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app/models/search_index.py at this revision
+FTS_TABLES = {
+    'leads': ('leads_fts', ('name', 'email', 'phone', 'phone_normalized', 'organization_id')),
+    'complaints': ('complaints_fts', ('title', 'description', 'organization_id')),
+}
+
+
+def _statements(table):
+    fts, columns = FTS_TABLES[table]
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{name}' for name in columns)
+    old = ', '.join(f'old.{name}' for name in columns)
+    delete = f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return  # search falls back to ILIKE elsewhere
+    for table, (fts, _) in FTS_TABLES.items():
+        for statement in _statements(table):
+            op.execute(statement)
+        # Index the rows that already exist
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table, (fts, _) in FTS_TABLES.items():
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,34 @@
+"""Add organization subscription tier
+
+Revision ID: d7b3a1f6e820
+Revises: c58e2f0a9d47
+Create Date: 2026-10-18 13:41:09.337215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b3a1f6e820'
+down_revision: Union[str, Sequence[str], None] = 'c58e2f0a9d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('organizations', sa.Column(
+        'subscription_tier',
+        sa.Enum('FREE', 'BASIC', 'PREMIUM', name='subscriptiontier'),
+        server_default='FREE',
+        nullable=False,
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('organizations') as batch_op:
+        batch_op.drop_column('subscription_tier')
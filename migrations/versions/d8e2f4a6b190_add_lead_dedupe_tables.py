@@ -0,0 +1,68 @@
+"""Add lead dedupe tables
+
+Revision ID: d8e2f4a6b190
+Revises: c5a1d7e3f902
+Create Date: 2026-10-18 22:15:09.377412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2f4a6b190'
+down_revision: Union[str, Sequence[str], None] = 'c5a1d7e3f902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('lead_signatures',
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('lead_updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('lead_id')
+    )
+    op.create_index('ix_lead_signatures_org_updated', 'lead_signatures', ['organization_id', 'lead_updated_at'], unique=False)
+    op.create_table('lead_lsh_buckets',
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('organization_id', 'bucket', 'lead_id')
+    )
+    op.create_index('ix_lead_lsh_buckets_lead_id', 'lead_lsh_buckets', ['lead_id'], unique=False)
+    op.create_table('lead_merge_suggestions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('lead_id', sa.Integer(), nullable=False),
+    sa.Column('duplicate_id', sa.Integer(), nullable=False),
+    sa.Column('similarity', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['duplicate_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['lead_id'], ['leads.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organization_id', 'lead_id', 'duplicate_id', name='uq_lead_merge_suggestions_pair')
+    )
+    op.create_index(op.f('ix_lead_merge_suggestions_id'), 'lead_merge_suggestions', ['id'], unique=False)
+    op.create_index('ix_lead_merge_suggestions_org_status_similarity', 'lead_merge_suggestions', ['organization_id', 'status', 'similarity'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_lead_merge_suggestions_org_status_similarity', table_name='lead_merge_suggestions')
+    op.drop_index(op.f('ix_lead_merge_suggestions_id'), table_name='lead_merge_suggestions')
+    op.drop_table('lead_merge_suggestions')
+    op.drop_index('ix_lead_lsh_buckets_lead_id', table_name='lead_lsh_buckets')
+    op.drop_table('lead_lsh_buckets')
+    op.drop_index('ix_lead_signatures_org_updated', table_name='lead_signatures')
+    op.drop_table('lead_signatures')
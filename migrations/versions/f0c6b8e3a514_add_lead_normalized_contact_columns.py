@@ -0,0 +1,60 @@
+"""Add lead normalized contact columns
+
+Revision ID: f0c6b8e3a514
+Revises: e2a9c4d81f35
+Create Date: 2026-10-18 16:48:03.771940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.normalize import normalize_email, normalize_phone
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0c6b8e3a514'
+down_revision: Union[str, Sequence[str], None] = 'e2a9c4d81f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('leads', sa.Column('email_normalized', sa.String(), nullable=True))
+    op.add_column('leads', sa.Column('phone_normalized', sa.String(), nullable=True))
+
+    # Backfill in id order, one batch at a time
+    bind = op.get_bind()
+    leads = sa.table('leads', sa.column('id'), sa.column('email'), sa.column('phone'),
+                     sa.column('email_normalized'), sa.column('phone_normalized'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(leads.c.id, leads.c.email, leads.c.phone)
+            .where(leads.c.id > last_id).order_by(leads.c.id).limit(BACKFILL_BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            leads.update().where(leads.c.id == sa.bindparam('_id')).values(
+                email_normalized=sa.bindparam('_email'), phone_normalized=sa.bindparam('_phone')
+            ),
+            [{'_id': r.id, '_email': normalize_email(r.email), '_phone': normalize_phone(r.phone)} for r in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index('ix_leads_org_email_normalized', 'leads', ['organization_id', 'email_normalized'], unique=False)
+    op.create_index('ix_leads_org_phone_normalized', 'leads', ['organization_id', 'phone_normalized'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_leads_org_phone_normalized', table_name='leads')
+    op.drop_index('ix_leads_org_email_normalized', table_name='leads')
+    with op.batch_alter_table('leads') as batch_op:
+        batch_op.drop_column('phone_normalized')
+        batch_op.drop_column('email_normalized')
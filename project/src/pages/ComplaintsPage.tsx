@@ -7,6 +7,8 @@ import EmptyState from '../components/common/EmptyState';
 import ComplaintForm from '../components/complaints/ComplaintForm';
 import { AlertCircle, Plus, Clock, User, Filter, Search } from 'lucide-react';
 
+type PageParams = Record<string, string | number>;
+
 const ComplaintsPage: React.FC = () => {
   const { user } = useAuth();
   const [complaints, setComplaints] = useState<Complaint[]>([]);
@@ -17,12 +19,30 @@ const ComplaintsPage: React.FC = () => {
   const [showForm, setShowForm] = useState(false);
   const [editingComplaint, setEditingComplaint] = useState<Complaint | undefined>();
   const [formLoading, setFormLoading] = useState(false);
+  const [nextPage, setNextPage] = useState<PageParams | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // One page at a time: the list continues from a cursor, search results from an offset
+  const fetchPage = async (after: PageParams = {}) => {
+    const term = searchTerm.trim();
+    if (term) {
+      const page = await complaintsApi.search(term, after);
+      return { items: page.items, next: page.next_offset != null ? { offset: page.next_offset } : null };
+    }
+    const params: PageParams = { ...after };
+    if (statusFilter !== 'all') params.status = statusFilter;
+    if (priorityFilter !== 'all') params.priority = priorityFilter;
+    const page = await complaintsApi.getPage(params);
+    return { items: page.items, next: page.next_cursor ? { cursor: page.next_cursor } : null };
+  };
 
+  // Searching happens on the server (full-text index); debounce so typing sends one request
   useEffect(() => {
     const fetchComplaints = async () => {
       try {
-        const data = await complaintsApi.getAll();
-        setComplaints(data);
+        const page = await fetchPage();
+        setComplaints(page.items);
+        setNextPage(page.next);
       } catch (error) {
         console.error('Failed to fetch complaints:', error);
       } finally {
@@ -30,17 +50,29 @@ const ComplaintsPage: React.FC = () => {
       }
     };
 
-    fetchComplaints();
-  }, []);
+    const timer = setTimeout(fetchComplaints, searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, statusFilter, priorityFilter]);
+
+  const handleLoadMore = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextPage);
+      setComplaints(prev => [...prev, ...page.items]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error('Failed to fetch more complaints:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const filteredComplaints = complaints.filter(complaint => {
-    const matchesSearch = complaint.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         complaint.description.toLowerCase().includes(searchTerm.toLowerCase());
-    
     const matchesStatus = statusFilter === 'all' || complaint.status === statusFilter;
     const matchesPriority = priorityFilter === 'all' || complaint.priority === priorityFilter;
     
-    return matchesSearch && matchesStatus && matchesPriority;
+    return matchesStatus && matchesPriority;
   });
 
   const getStatusColor = (status: string) => {
@@ -258,6 +290,17 @@ const ComplaintsPage: React.FC = () => {
               </div>
             ))}
           </div>
+          {nextPage && (
+            <div className="px-6 py-4 flex justify-center">
+              <button
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="px-4 py-2 border border-gray-300 rounded-lg text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
 
@@ -7,6 +7,8 @@ import EmptyState from '../components/common/EmptyState';
 import LeadForm from '../components/leads/LeadForm';
 import { UserPlus, Search, Filter, Plus, Phone, Mail, Building, Star } from 'lucide-react';
 
+type PageParams = Record<string, string | number>;
+
 const LeadsPage: React.FC = () => {
   const { user } = useAuth();
   const [leads, setLeads] = useState<Lead[]>([]);
@@ -16,12 +18,29 @@ const LeadsPage: React.FC = () => {
   const [showForm, setShowForm] = useState(false);
   const [editingLead, setEditingLead] = useState<Lead | undefined>();
   const [formLoading, setFormLoading] = useState(false);
+  const [nextPage, setNextPage] = useState<PageParams | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
+  // One page at a time: the list continues from a cursor, search results from an offset
+  const fetchPage = async (after: PageParams = {}) => {
+    const term = searchTerm.trim();
+    if (term) {
+      const page = await leadsApi.search(term, after);
+      return { items: page.items, next: page.next_offset != null ? { offset: page.next_offset } : null };
+    }
+    const params: PageParams = { ...after };
+    if (statusFilter !== 'all') params.status = statusFilter;
+    const page = await leadsApi.getPage(params);
+    return { items: page.items, next: page.next_cursor ? { cursor: page.next_cursor } : null };
+  };
+
+  // Searching happens on the server (full-text index); debounce so typing sends one request
   useEffect(() => {
     const fetchLeads = async () => {
       try {
-        const data = await leadsApi.getAll();
-        setLeads(data);
+        const page = await fetchPage();
+        setLeads(page.items);
+        setNextPage(page.next);
       } catch (error) {
         console.error('Failed to fetch leads:', error);
       } finally {
@@ -29,19 +48,25 @@ const LeadsPage: React.FC = () => {
       }
     };
 
-    fetchLeads();
-  }, []);
+    const timer = setTimeout(fetchLeads, searchTerm ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [searchTerm, statusFilter]);
+
+  const handleLoadMore = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextPage);
+      setLeads(prev => [...prev, ...page.items]);
+      setNextPage(page.next);
+    } catch (error) {
+      console.error('Failed to fetch more leads:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
-  const filteredLeads = leads.filter(lead => {
-    const matchesSearch = lead.firstName.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         lead.lastName.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         lead.email.toLowerCase().includes(searchTerm.toLowerCase()) ||
-                         lead.company?.toLowerCase().includes(searchTerm.toLowerCase());
-    
-    const matchesStatus = statusFilter === 'all' || lead.status === statusFilter;
-    
-    return matchesSearch && matchesStatus;
-  });
+  const filteredLeads = leads.filter(lead => statusFilter === 'all' || lead.status === statusFilter);
 
   const getStatusColor = (status: string) => {
     const colors = {
@@ -248,6 +273,17 @@ const LeadsPage: React.FC = () => {
               </div>
             ))}
           </div>
+          {nextPage && (
+            <div className="px-6 pb-6 flex justify-center">
+              <button
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="px-4 py-2 border border-gray-300 rounded-lg text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
 
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { Lead, Complaint, DashboardStats } from '../types';
+import { Lead, Complaint, DashboardStats, Page, SearchPage } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
@@ -20,9 +20,14 @@ api.interceptors.request.use((config) => {
 });
 
 // ------------------ Leads API ------------------
+// Lists come a page at a time: pass the previous page's next_cursor as `cursor` for the next one
 export const leadsApi = {
-  getAll: async (): Promise<Lead[]> => {
-    const res = await api.get('/v1/leads/');
+  getPage: async (params: Record<string, string | number> = {}): Promise<Page<Lead>> => {
+    const res = await api.get('/v1/leads/', { params });
+    return res.data;
+  },
+  search: async (q: string, params: Record<string, string | number> = {}): Promise<SearchPage<Lead>> => {
+    const res = await api.get('/v1/leads/search', { params: { q, ...params } });
     return res.data;
   },
   getById: async (id: string): Promise<Lead> => {
@@ -44,8 +49,12 @@ export const leadsApi = {
 
 // ------------------ Complaints API ------------------
 export const complaintsApi = {
-  getAll: async (): Promise<Complaint[]> => {
-    const res = await api.get('/v1/complaints/');
+  getPage: async (params: Record<string, string | number> = {}): Promise<Page<Complaint>> => {
+    const res = await api.get('/v1/complaints/', { params });
+    return res.data;
+  },
+  search: async (q: string, params: Record<string, string | number> = {}): Promise<SearchPage<Complaint>> => {
+    const res = await api.get('/v1/complaints/search', { params: { q, ...params } });
     return res.data;
   },
   create: async (complaint: Omit<Complaint, 'id' | 'createdAt' | 'updatedAt'>): Promise<Complaint> => {
@@ -67,7 +76,16 @@ export const dashboardApi = {
   getStats: async (): Promise<DashboardStats> => {
     try {
       const res = await api.get('/v1/dashboard/stats');
-      return res.data;
+      const { total_leads, leads, complaints } = res.data;
+      const converted = leads.by_status.converted ?? 0;
+      return {
+        totalLeads: total_leads,
+        activeComplaints: complaints.total - (complaints.by_status.closed ?? 0),
+        conversionRate: total_leads ? Math.round((converted / total_leads) * 100) : 0,
+        avgResponseTime: 0,
+        monthlyLeads: Array(12).fill(0),
+        recentActivities: []
+      };
     } catch (err) {
       console.error('Dashboard stats fetch error:', err);
       return {
@@ -50,6 +50,16 @@ export interface Complaint {
   updatedAt: string;
 }
 
+export interface Page<T> {
+  items: T[];
+  next_cursor?: string | null;
+}
+
+export interface SearchPage<T> {
+  items: T[];
+  next_offset?: number | null;
+}
+
 export interface ChatMessage {
   id: string;
   message: string;
@@ -0,0 +1,45 @@
+# prune_change_log.py
+"""
+Retention job for the change-data-capture log (`change_log`).
+
+Deletes entries older than CHANGE_LOG_RETENTION_DAYS that every consumer of their
+organization has already committed past, in the main database and every shard:
+
+    python prune_change_log.py              # CHANGE_LOG_RETENTION_DAYS
+    python prune_change_log.py --days 7
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.core.config import settings
+from app.db import DEFAULT_SHARD, tenant_engines
+from app.models.database import engine
+from app.models.tenant_shard import TenantShard
+from app.services.change_log import prune_changes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=settings.CHANGE_LOG_RETENTION_DAYS, help="keep entries this many days")
+    parser.add_argument("--batch", type=int, default=settings.CHANGE_LOG_PRUNE_BATCH_SIZE, help="entries deleted per transaction")
+    args = parser.parse_args()
+
+    older_than = datetime.utcnow() - timedelta(days=args.days)
+    with engine.connect() as connection:
+        shards = connection.execute(select(TenantShard.shard).distinct()).scalars().all()
+    databases = [(DEFAULT_SHARD, engine)] + [(shard, tenant_engines.get_engine(shard)) for shard in sorted(set(shards) - {DEFAULT_SHARD})]
+    try:
+        for name, database in databases:
+            with database.connect() as connection:
+                print(f"{name}: removed {prune_changes(connection, older_than, args.batch)} entries")
+    finally:
+        tenant_engines.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# rebuild_aggregates.py
+"""
+Repair job for the dashboard counts in `org_aggregates`.
+
+Recounts leads and complaints from scratch, in one transaction, for every organization or
+just the ones given. Use it after writes that bypassed the ORM session (raw SQL, manual
+fixes) or if the counts are ever suspected to have drifted:
+
+    python rebuild_aggregates.py          # all organizations
+    python rebuild_aggregates.py 3 7      # organizations 3 and 7
+"""
+import sys
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.models.database import engine
+from app.services.analytical_service import rebuild_org_aggregates
+
+
+def main(argv) -> int:
+    org_ids = [int(arg) for arg in argv] or [None]
+    with engine.begin() as connection:
+        for org_id in org_ids:
+            written = rebuild_org_aggregates(connection, org_id)
+            print(f"{'all organizations' if org_id is None else f'organization {org_id}'}: {written} aggregate rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,77 @@
+# train_complaint_classifier.py
+"""
+Offline training for the complaint classifier.
+
+Fits hashed TF-IDF + softmax regression on labeled complaints and saves it where the API
+loads it from (COMPLAINT_CLASSIFIER_PATH). Labels come from complaints that already have a
+classification, or from a CSV with `description` and `classification` columns:
+
+    python train_complaint_classifier.py
+    python train_complaint_classifier.py --csv labeled_complaints.csv --epochs 30
+
+A fifth of the examples is held out to report accuracy before saving.
+"""
+import argparse
+import csv
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import select
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.core.config import settings
+from app.models.complaint import Complaint
+from app.models.database import SessionLocal
+from app.services.complaint_classifier import UNCLASSIFIED, ComplaintClassifier
+
+
+def load_examples(csv_path):
+    if csv_path:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = [(row["description"], row["classification"]) for row in csv.DictReader(f)]
+    else:
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(Complaint.description, Complaint.classification).where(Complaint.classification.isnot(None))
+            ).all()
+        finally:
+            db.close()
+    return [(text or "", label) for text, label in rows if label and label != UNCLASSIFIED]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="labeled examples instead of the complaints table")
+    parser.add_argument("--output", default=settings.COMPLAINT_CLASSIFIER_PATH)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--features", type=int, default=18, help="log2 of the hashed feature count")
+    args = parser.parse_args()
+
+    examples = load_examples(args.csv)
+    if len({label for _, label in examples}) < 2:
+        print("Need labeled examples of at least two classifications")
+        return 1
+
+    order = np.random.default_rng(0).permutation(len(examples))
+    held_out = set(order[: len(examples) // 5].tolist())
+    train = [examples[i] for i in range(len(examples)) if i not in held_out]
+    test = [examples[i] for i in sorted(held_out)]
+
+    start = time.perf_counter()
+    texts, labels = zip(*train)
+    model = ComplaintClassifier.train(texts, labels, n_features=2 ** args.features, epochs=args.epochs)
+    print(f"trained on {len(train)} complaints in {time.perf_counter() - start:.1f}s, labels: {', '.join(model.labels)}")
+    if test:
+        predicted = model.predict([text for text, _ in test])
+        accuracy = np.mean([p == label for p, (_, label) in zip(predicted, test)])
+        print(f"held-out accuracy: {accuracy:.3f} on {len(test)} complaints")
+
+    model.save(args.output)
+    print(f"saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())